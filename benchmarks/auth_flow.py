@@ -0,0 +1,269 @@
+"""Repeatable load test for signup, login, refresh and /me.
+
+Starts ``benchmarks.server`` (SQLite, in-memory Redis, no mail) unless --url is
+given, seeds verified users, drives a weighted mix of requests from concurrent
+clients and reports throughput and p50/p95/p99 per endpoint. With --url the
+seeded users cannot be marked verified, so /me is expected to answer 403.
+
+    python -m benchmarks.auth_flow --out bench/auth-<commit>.json
+    python -m benchmarks.auth_flow --compare bench/auth-baseline.json
+    python -m benchmarks.auth_flow --scenario login-storm
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+API = "/api/v1/auth"
+PASSWORD = "benchmark-password"
+DEFAULT_MIX = {"signup": 2, "login": 15, "refresh": 8, "me": 75}
+
+
+class Recorder:
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(self, name: str, request) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+    def summary(self, duration: float) -> dict:
+        result = {}
+        for name, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            result[name] = {
+                "requests": len(ordered),
+                "errors": self.errors.get(name, 0),
+                "throughput_rps": len(ordered) / duration,
+                "mean_ms": statistics.fmean(ordered) * 1000,
+                "p50_ms": percentile(ordered, 0.50) * 1000,
+                "p95_ms": percentile(ordered, 0.95) * 1000,
+                "p99_ms": percentile(ordered, 0.99) * 1000,
+            }
+        return result
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def start_server(port: int, db_path: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.server", "--port", str(port), "--db", db_path],
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+
+
+async def wait_for(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("benchmark server did not become healthy")
+
+
+def signup_payload() -> dict:
+    suffix = uuid.uuid4().hex[:12]
+    return {
+        "email": f"bench-{suffix}@example.com",
+        "username": f"bench{suffix}",
+        "first_name": "Bench",
+        "last_name": "User",
+        "password": PASSWORD,
+    }
+
+
+async def seed_users(client: httpx.AsyncClient, count: int, db_path: str | None) -> list[dict]:
+    payloads = [signup_payload() for _ in range(count)]
+    semaphore = asyncio.Semaphore(16)
+
+    async def signup(payload):
+        async with semaphore:
+            response = await client.post(f"{API}/signup", json=payload)
+            response.raise_for_status()
+
+    await asyncio.gather(*(signup(payload) for payload in payloads))
+
+    if db_path:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE users SET is_verified = 1")
+
+    users = []
+    for payload in payloads:
+        response = await client.post(f"{API}/login", json={"email": payload["email"], "password": PASSWORD})
+        response.raise_for_status()
+        users.append({**payload, **response.json()})
+    return users
+
+
+async def mixed_workload(client, users, recorder, duration, concurrency, mix) -> None:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            op = random.choices(names, weights)[0]
+            user = random.choice(users)
+            if op == "signup":
+                await recorder.call(op, client.post(f"{API}/signup", json=signup_payload()))
+            elif op == "login":
+                await recorder.call(op, client.post(
+                    f"{API}/login", json={"email": user["email"], "password": PASSWORD}
+                ))
+            elif op == "refresh":
+                await recorder.call(op, client.get(
+                    f"{API}/refresh_token", headers={"Authorization": f"Bearer {user['refresh_token']}"}
+                ))
+            else:
+                await recorder.call(op, client.get(
+                    f"{API}/me", headers={"Authorization": f"Bearer {user['access_token']}"}
+                ))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def login_storm(client, users, recorder, duration, concurrency) -> None:
+    """Measure /health alone, then again while every other client hammers /login."""
+    async def probe(name, until):
+        while time.monotonic() < until:
+            await recorder.call(name, client.get("/health"))
+            await asyncio.sleep(0.01)
+
+    await probe("health_idle", time.monotonic() + min(duration, 5.0))
+
+    deadline = time.monotonic() + duration
+
+    async def stormer():
+        while time.monotonic() < deadline:
+            user = random.choice(users)
+            await recorder.call("login", client.post(
+                f"{API}/login", json={"email": user["email"], "password": PASSWORD}
+            ))
+
+    await asyncio.gather(probe("health_under_login_storm", deadline), *(stormer() for _ in range(concurrency)))
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, stats in current["endpoints"].items():
+        base = baseline["endpoints"].get(name)
+        if base is None:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[key] and stats[key] > base[key] * (1 + threshold):
+                regressions.append(f"{name} {key}: {base[key]:.1f} -> {stats[key]:.1f}")
+        if base["throughput_rps"] and stats["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name} throughput_rps: {base['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f}"
+            )
+    return regressions
+
+
+def print_table(endpoints: dict) -> None:
+    print(f"{'endpoint':<26}{'reqs':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, stats in endpoints.items():
+        print(
+            f"{name:<26}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>9.1f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+        )
+
+
+async def run(args: argparse.Namespace) -> int:
+    server = None
+    db_path = None
+    base_url = args.url
+    if base_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="flower-bench-"), "bench.db")
+        server = start_server(args.port, db_path)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            await wait_for(client)
+            users = await seed_users(client, args.users, db_path)
+
+            recorder = Recorder()
+            started = time.monotonic()
+            if args.scenario == "login-storm":
+                await login_storm(client, users, recorder, args.duration, args.concurrency)
+            else:
+                await mixed_workload(client, users, recorder, args.duration, args.concurrency, DEFAULT_MIX)
+            elapsed = time.monotonic() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    result = {
+        "commit": git_commit(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "duration_s": elapsed,
+        "endpoints": recorder.summary(elapsed),
+    }
+    print_table(result["endpoints"])
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(result, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(result, baseline, args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.auth_flow")
+    parser.add_argument("--url", help="benchmark an already running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scenario", choices=["mixed", "login-storm"], default="mixed")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,91 @@
+"""Time the vectorized demand forecast on synthetic subscriptions.
+
+Generates --subscriptions active subscriptions spread over --bouquets bouquets
+(an even mix of frequencies, next deliveries from two weeks overdue to two
+months out, start days of month 1-31), times ``forecast_demand`` over --weeks weeks, and checks it
+against a plain loop over ``advance_delivery`` on a --sample of them.
+
+    python -m benchmarks.forecast --subscriptions 1000000 --weeks 8
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.db.models import Frequency
+from src.subscriptions.forecast import FREQUENCIES, SubscriptionArrays, forecast_demand
+from src.subscriptions.scheduler import advance_delivery
+
+
+def synthetic_subscriptions(count: int, bouquets: int, start: datetime, seed: int) -> SubscriptionArrays:
+    rng = np.random.default_rng(seed)
+    offsets = rng.integers(-14 * 86400, 60 * 86400, count).astype("timedelta64[s]")
+    return SubscriptionArrays(
+        rng.integers(0, bouquets, count, dtype=np.int32),
+        rng.integers(0, len(FREQUENCIES), count, dtype=np.int8),
+        np.datetime64(start, "s") + offsets,
+        rng.integers(1, 32, count, dtype=np.int8),
+    )
+
+
+def reference_forecast(subscriptions: SubscriptionArrays, bouquets: int, start: datetime, days: int) -> np.ndarray:
+    """The per-object loop the forecast replaces."""
+    counts = np.zeros((days, bouquets), dtype=np.int64)
+    end = start + timedelta(days=days)
+    for bouquet, code, next_delivery, anchor_day in zip(
+        subscriptions.bouquet.tolist(),
+        subscriptions.frequency.tolist(),
+        subscriptions.next_delivery.astype(datetime).tolist(),
+        subscriptions.anchor_day.tolist(),
+    ):
+        frequency: Frequency = FREQUENCIES[code]
+        while next_delivery < end:
+            counts[max((next_delivery - start).days, 0), bouquet] += 1
+            next_delivery = advance_delivery(next_delivery, frequency, anchor_day)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.forecast")
+    parser.add_argument("--subscriptions", type=int, default=1_000_000)
+    parser.add_argument("--bouquets", type=int, default=200)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--sample", type=int, default=20_000, help="subscriptions to check against the plain loop")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = datetime(2025, 1, 1)
+    days = args.weeks * 7
+    subscriptions = synthetic_subscriptions(args.subscriptions, args.bouquets, start, args.seed)
+
+    timings = []
+    for _ in range(args.runs):
+        began = time.perf_counter()
+        counts = forecast_demand(subscriptions, args.bouquets, np.datetime64(start, "D"), days)
+        timings.append(time.perf_counter() - began)
+    best = min(timings)
+    print(
+        f"forecast_demand: {args.subscriptions} subscriptions, {args.bouquets} bouquets, {days} days: "
+        f"best {best * 1000:.1f} ms, median {sorted(timings)[len(timings) // 2] * 1000:.1f} ms "
+        f"({counts.sum()} deliveries)"
+    )
+
+    sample = SubscriptionArrays(*(column[:args.sample] for column in subscriptions))
+    began = time.perf_counter()
+    expected = reference_forecast(sample, args.bouquets, start, days)
+    loop_seconds = time.perf_counter() - began
+    actual = forecast_demand(sample, args.bouquets, np.datetime64(start, "D"), days)
+    if not np.array_equal(actual, expected):
+        raise SystemExit("vectorized forecast disagrees with advance_delivery on the sample")
+
+    projected = loop_seconds * args.subscriptions / max(len(sample.bouquet), 1)
+    print(
+        f"plain loop: {loop_seconds * 1000:.1f} ms for {len(sample.bouquet)} subscriptions, "
+        f"~{projected:.1f} s projected for {args.subscriptions} ({projected / best:.0f}x slower); results match"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Cold-start check for ``main`` against a recorded baseline.
+
+    python -m benchmarks.import_time              # compare with the baseline
+    python -m benchmarks.import_time --record     # accept the current numbers
+
+The import runs in a fresh interpreter under ``-X importtime`` with no app
+settings in the environment, so it also fails if anything reads ``Config`` or
+opens a connection while being imported. Two things are compared with
+``import_time_baseline.json``: the best-of-N import time, which may grow by
+at most ``--tolerance``, and the set of third-party packages imported, which
+may not grow at all (a new entry usually means a heavy client lost its lazy
+import). Both depend on the machine, so the baseline is only meaningful where
+it was recorded. ``LAZY_PACKAGES`` does not: those clients must never be
+imported by ``main``, on any machine. ``tests/test_import_time.py`` always
+checks that, and runs the baseline comparison only with IMPORT_TIME_CHECK=1.
+The slowest modules are listed to show what to defer next.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_time_baseline.json")
+DEFAULT_TOLERANCE = 0.5
+
+
+def measure(module: str) -> tuple[int, list[tuple[int, str]]]:
+    """Return the total import time in microseconds and (cumulative_us, module) for every import."""
+    env = {"PATH": os.environ.get("PATH", "")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    total = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        cumulative_us = int(cumulative)
+        modules.append((cumulative_us, name.strip()))
+        # top-level imports are not indented; their cumulative times add up to the whole import
+        if not name.startswith("  "):
+            total += cumulative_us
+    return total, modules
+
+
+def best_of(module: str, runs: int) -> tuple[int, list[tuple[int, str]]]:
+    # the first run also warms the bytecode cache, so the best run is the one a deployed worker sees
+    return min((measure(module) for _ in range(runs)), key=lambda run: run[0])
+
+
+# the app itself, and the interpreter's site hook, which varies between machines
+NOT_THIRD_PARTY = {"src", "main", "sitecustomize"}
+
+
+def third_party(modules: list[tuple[int, str]]) -> list[str]:
+    packages = {name.split(".")[0] for _, name in modules}
+    return sorted(
+        package for package in packages - NOT_THIRD_PARTY
+        if package not in sys.stdlib_module_names and not package.startswith("_")
+    )
+
+
+# heavy clients the app only imports on first use
+LAZY_PACKAGES = frozenset({
+    "aiomysql", "aiosmtplib", "boto3", "botocore", "celery", "confluent_kafka", "fastapi_mail",
+    "jinja2", "kombu", "numpy", "PIL", "pymongo", "pymysql", "redis", "requests",
+})
+
+
+def eager_imports(modules: list[tuple[int, str]]) -> list[str]:
+    return sorted(set(third_party(modules)) & LAZY_PACKAGES)
+
+
+def load_baseline() -> dict:
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def compare(module: str, total_us: int, modules: list[tuple[int, str]], tolerance: float) -> list[str]:
+    """Return what got worse than the baseline; empty when the import is within it."""
+    baseline = load_baseline()[module]
+    problems = []
+    limit_ms = baseline["total_ms"] * (1 + tolerance)
+    if total_us / 1000 > limit_ms:
+        problems.append(
+            f"import {module} took {total_us / 1000:.1f} ms, over {limit_ms:.0f} ms "
+            f"(baseline {baseline['total_ms']:.0f} ms + {tolerance:.0%})"
+        )
+    added = sorted(set(third_party(modules)) - set(baseline["packages"]))
+    if added:
+        problems.append(f"import {module} now also imports {', '.join(added)}")
+    return problems
+
+
+def record(module: str, total_us: int, modules: list[tuple[int, str]]) -> None:
+    try:
+        baselines = load_baseline()
+    except FileNotFoundError:
+        baselines = {}
+    baselines[module] = {"total_ms": round(total_us / 1000, 1), "packages": third_party(modules)}
+    with open(BASELINE_PATH, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.import_time")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5, help="best of N cold imports")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown, 0.5 = 50%%")
+    parser.add_argument("--record", action="store_true", help="write the current numbers as the new baseline")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    total, modules = best_of(args.module, args.runs)
+    print(f"import {args.module}: {total / 1000:.1f} ms (best of {args.runs})")
+    for cumulative_us, name in sorted(modules, reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    if args.record:
+        record(args.module, total, modules)
+        print(f"recorded as the baseline in {os.path.relpath(BASELINE_PATH, ROOT)}")
+        return
+
+    problems = [f"import {args.module} imports {package} eagerly" for package in eager_imports(modules)]
+    problems += compare(args.module, total, modules, args.tolerance)
+    for problem in problems:
+        print("FAIL", problem)
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
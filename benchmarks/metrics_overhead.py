@@ -0,0 +1,99 @@
+"""Measure what the metrics middleware adds to each request.
+
+Sends --requests sequential requests to a trivial route in-process (httpx
+over ASGI, no sockets) on two apps that differ only in ``register_middleware``:
+one with it, one with just the CORS middleware it also installs. The
+per-request difference is the cost of timing, the in-flight gauge and the
+histogram update. Also times ``MetricsRegistry.observe_request`` and
+``time_stage`` on their own, and one ``/metrics`` render once every route has
+been observed.
+
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from benchmarks.server import configure
+from src.metrics import MetricsRegistry, metrics
+from src.middleware import register_middleware
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        register_middleware(app)
+    else:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=["*"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+    return app
+
+
+async def per_request_seconds(app: FastAPI, requests: int, rounds: int) -> list[float]:
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(200):
+            await client.get(f"/items/{i}")
+        for _ in range(rounds):
+            began = time.perf_counter()
+            for i in range(requests):
+                await client.get(f"/items/{i}")
+            results.append((time.perf_counter() - began) / requests)
+    return results
+
+
+def per_call_seconds(call, calls: int) -> float:
+    began = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - began) / calls
+
+
+async def run(args: argparse.Namespace) -> None:
+    bare, instrumented = [], []
+    # interleave the rounds so drift in machine load hits both apps alike
+    for _ in range(args.rounds):
+        bare += await per_request_seconds(build_app(False), args.requests, 1)
+        instrumented += await per_request_seconds(build_app(True), args.requests, 1)
+    bare_us = statistics.median(bare) * 1e6
+    instrumented_us = statistics.median(instrumented) * 1e6
+    print(f"without metrics middleware: {bare_us:7.1f} us/request (median of {args.rounds} rounds of {args.requests})")
+    print(f"with metrics middleware:    {instrumented_us:7.1f} us/request")
+    print(f"overhead:                   {instrumented_us - bare_us:7.1f} us/request ({(instrumented_us / bare_us - 1) * 100:.1f}%)")
+
+    registry = MetricsRegistry()
+    observe = per_call_seconds(lambda: registry.observe_request("GET", "/api/v1/auth/me", 200, 0.012), 200_000)
+
+    def timed_stage():
+        with registry.time_stage("jwt_decode"):
+            pass
+
+    stage = per_call_seconds(timed_stage, 200_000)
+    print(f"observe_request: {observe * 1e9:.0f} ns/call, time_stage: {stage * 1e9:.0f} ns/call")
+
+    began = time.perf_counter()
+    body = metrics.render()
+    print(f"/metrics render: {(time.perf_counter() - began) * 1000:.2f} ms for {body.count(chr(10))} lines")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.metrics_overhead")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    configure(":memory:")
+    asyncio.run(run(parser.parse_args()))
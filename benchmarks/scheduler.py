@@ -0,0 +1,149 @@
+"""Drive the delivery scheduler on a simulated clock over a seeded SQLite database.
+
+Seeds --subscriptions active subscriptions (an even mix of frequencies, start
+days spread over the month, next deliveries spread over the first
+--spread-hours of the run), then ticks ``DeliveryScheduler`` on a fake clock
+every --step seconds for --hours simulated hours. Reports per-tick latency and
+delivery throughput, and checks that every delivery that fell due was
+dispatched exactly once and that nothing is left overdue. --restart-every
+replaces the scheduler with a fresh one every N ticks, as a worker restart
+would.
+
+    python -m benchmarks.scheduler --subscriptions 200000 --hours 24 --step 60
+
+Requires ``aiosqlite`` in addition to the app's own dependencies.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.db.migrations import migrate
+from src.db.models import Frequency, Subscription
+from src.subscriptions.scheduler import DeliveryScheduler, DueDelivery, advance_delivery
+
+FREQUENCIES = list(Frequency)
+
+
+def synthetic_rows(count: int, start: datetime, spread: timedelta, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    spread_seconds = int(spread.total_seconds())
+    rows = []
+    for _ in range(count):
+        started_at = datetime(start.year, start.month, 1) - timedelta(days=rng.randrange(0, 400))
+        rows.append({
+            "id": str(uuid.uuid4()),
+            # SQLite does not enforce the foreign keys, so no users or bouquets are needed
+            "user_id": str(uuid.uuid4()),
+            "bouquet_id": str(uuid.uuid4()),
+            "frequency": rng.choice(FREQUENCIES),
+            "next_delivery": start + timedelta(seconds=rng.randrange(spread_seconds)),
+            "active": True,
+            "started_at": started_at,
+        })
+    return rows
+
+
+def expected_deliveries(rows: list[dict], end: datetime) -> Counter:
+    expected = Counter()
+    for row in rows:
+        delivery_at = row["next_delivery"]
+        while delivery_at <= end:
+            expected[row["id"]] += 1
+            delivery_at = advance_delivery(delivery_at, row["frequency"], row["started_at"].day)
+    return expected
+
+
+async def run(args: argparse.Namespace) -> int:
+    db_path = os.path.join(tempfile.mkdtemp(prefix="flower-scheduler-"), "scheduler.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    await migrate(engine)
+
+    start = datetime(2025, 1, 1)
+    end = start + timedelta(hours=args.hours)
+    rows = synthetic_rows(args.subscriptions, start, timedelta(hours=args.spread_hours), args.seed)
+    async with engine.begin() as conn:
+        for i in range(0, len(rows), 10_000):
+            await conn.execute(insert(Subscription.__table__), rows[i:i + 10_000])
+    expected = expected_deliveries(rows, end)
+
+    now = start
+    dispatched: Counter = Counter()
+
+    async def dispatch(deliveries: list[DueDelivery]) -> None:
+        dispatched.update(delivery.subscription_id for delivery in deliveries)
+
+    def new_scheduler() -> DeliveryScheduler:
+        return DeliveryScheduler(
+            engine,
+            dispatch,
+            batch_size=args.batch_size,
+            lookahead=timedelta(seconds=args.lookahead),
+            clock=lambda: now,
+        )
+
+    scheduler = new_scheduler()
+    timings = []
+    ticks = 0
+    while now <= end:
+        began = time.perf_counter()
+        await scheduler.tick()
+        timings.append(time.perf_counter() - began)
+        ticks += 1
+        if args.restart_every and ticks % args.restart_every == 0:
+            scheduler = new_scheduler()
+        now += timedelta(seconds=args.step)
+
+    async with engine.connect() as conn:
+        overdue = (await conn.execute(
+            select(func.count()).select_from(Subscription.__table__).where(
+                Subscription.active == True, Subscription.next_delivery <= end
+            )
+        )).scalar_one()
+    await engine.dispose()
+
+    total = sum(dispatched.values())
+    ordered = sorted(timings)
+    print(
+        f"{args.subscriptions} subscriptions, {ticks} ticks of {args.step}s over {args.hours}h simulated: "
+        f"{total} deliveries in {sum(timings):.1f} s ({total / sum(timings):.0f}/s)"
+    )
+    print(
+        f"tick latency: median {statistics.median(ordered) * 1000:.1f} ms, "
+        f"p95 {ordered[int(0.95 * (len(ordered) - 1))] * 1000:.1f} ms, max {ordered[-1] * 1000:.1f} ms"
+    )
+
+    problems = []
+    if dispatched != expected:
+        missing = sum((expected - dispatched).values())
+        duplicated = sum((dispatched - expected).values())
+        problems.append(f"{missing} deliveries missed, {duplicated} dispatched more than once")
+    if overdue:
+        problems.append(f"{overdue} subscriptions still overdue at the end of the run")
+    for problem in problems:
+        print("FAIL", problem)
+    if not problems:
+        print("every due delivery dispatched exactly once; nothing left overdue")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scheduler")
+    parser.add_argument("--subscriptions", type=int, default=200_000)
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--spread-hours", type=float, default=24.0, help="first deliveries fall within this window")
+    parser.add_argument("--step", type=int, default=60, help="simulated seconds between ticks")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--lookahead", type=int, default=300, help="scheduler lookahead in seconds")
+    parser.add_argument("--restart-every", type=int, default=0, help="replace the scheduler every N ticks")
+    parser.add_argument("--seed", type=int, default=42)
+    raise SystemExit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,53 @@
+"""Run main.py's app against local stand-ins: SQLite (aiosqlite), in-memory Redis, no outbound mail.
+
+    python -m benchmarks.server --port 8765 --db /tmp/bench.db
+
+Requires ``aiosqlite`` in addition to the app's own dependencies.
+"""
+import argparse
+import os
+
+BENCH_ENV = {
+    "JWT_SECRET": "benchmark-secret-benchmark-secret-0",
+    "JWT_ALGORITHM": "HS256",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "MAIL_USERNAME": "bench",
+    "MAIL_PASSWORD": "bench",
+    "MAIL_FROM": "bench@example.com",
+    "MAIL_PORT": "2525",
+    "MAIL_SERVER": "localhost",
+    "MAIL_FROM_NAME": "Bench",
+    "APP_NAME": "Flower",
+    "DOMAIN": "localhost",
+    "CELERY_BROKER_URL": "memory://",
+    "CELERY_RESULT_BACKEND": "cache+memory://",
+    "OUTBOX_RELAY_ENABLED": "false",
+    "DELIVERY_SCHEDULER_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    "AUDIT_LOG_ENABLED": "false",
+}
+
+
+def configure(db_path: str) -> None:
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="bench.db")
+    args = parser.parse_args()
+
+    configure(args.db)
+
+    from benchmarks import standins
+    standins.install()
+
+    import uvicorn
+    from main import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,164 @@
+"""In-process stand-ins for the services the app talks to, used by the benchmark server."""
+import asyncio
+import fnmatch
+import time
+
+
+class InMemoryPubSub:
+
+    def __init__(self, redis: "InMemoryRedis") -> None:
+        self.redis = redis
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.channels: set[str] = set()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self.channels.add(channel)
+            self.redis._subscribers.setdefault(channel, set()).add(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self) -> None:
+        for channel in self.channels:
+            self.redis._subscribers.get(channel, set()).discard(self)
+
+
+class InMemoryPipeline:
+    """Queues commands and runs them in order on ``execute``; nothing else touches the loop in between."""
+
+    def __init__(self, redis: "InMemoryRedis") -> None:
+        self.redis = redis
+        self.commands: list[tuple[str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "InMemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.commands = []
+
+    def __getattr__(self, command: str):
+        def queue(*args, **kwargs) -> "InMemoryPipeline":
+            self.commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        commands, self.commands = self.commands, []
+        return [await getattr(self.redis, command)(*args, **kwargs) for command, args, kwargs in commands]
+
+
+class InMemoryRedis:
+    """Implements the subset of ``redis.asyncio.Redis`` the app uses."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._values: dict[str, tuple[bytes, float | None]] = {}
+        self._zsets: dict[str, dict[str, float]] = {}
+        self._subscribers: dict[str, set[InMemoryPubSub]] = {}
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    @staticmethod
+    def _name(name) -> str:
+        return name.decode() if isinstance(name, bytes) else name
+
+    async def get(self, name: str):
+        name = self._name(name)
+        value = self._values.get(name)
+        if value is None:
+            return None
+        data, expires_at = value
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[name]
+            return None
+        return data
+
+    async def set(self, name: str, value, ex: int | None = None, **kwargs) -> bool:
+        self._values[name] = (self._encode(value), time.monotonic() + ex if ex else None)
+        return True
+
+    async def delete(self, *names: str) -> int:
+        return sum(self._values.pop(name, None) is not None for name in names)
+
+    async def incr(self, name: str, amount: int = 1) -> int:
+        value = int(await self.get(name) or 0) + amount
+        await self.set(name, value)
+        return value
+
+    async def expire(self, name: str, seconds: int) -> bool:
+        if name in self._values:
+            self._values[name] = (self._values[name][0], time.monotonic() + seconds)
+        return True
+
+    async def ttl(self, name: str) -> int:
+        name = self._name(name)
+        if await self.get(name) is None:
+            return -2
+        expires_at = self._values[name][1]
+        return -1 if expires_at is None else max(int(expires_at - time.monotonic()), 0)
+
+    async def keys(self, pattern: str = "*") -> list[bytes]:
+        return [key.encode() for key in self._values if fnmatch.fnmatch(key, pattern)]
+
+    async def scan_iter(self, match: str = "*", count: int | None = None):
+        for key in await self.keys(match):
+            yield key
+
+    async def zadd(self, name: str, mapping: dict) -> int:
+        zset = self._zsets.setdefault(name, {})
+        added = sum(member not in zset for member in mapping)
+        zset.update({str(member): float(score) for member, score in mapping.items()})
+        return added
+
+    async def zrangebyscore(self, name: str, min, max) -> list[bytes]:
+        low, high = float(min), float(max)
+        zset = self._zsets.get(name, {})
+        return [m.encode() for m, s in sorted(zset.items(), key=lambda item: item[1]) if low <= s <= high]
+
+    async def zremrangebyscore(self, name: str, min, max) -> int:
+        low, high = float(min), float(max)
+        zset = self._zsets.get(name, {})
+        doomed = [m for m, s in zset.items() if low <= s <= high]
+        for member in doomed:
+            del zset[member]
+        return len(doomed)
+
+    async def zcard(self, name: str) -> int:
+        return len(self._zsets.get(name, {}))
+
+    async def zrange(self, name: str, start: int, end: int, withscores: bool = False) -> list:
+        ordered = sorted(self._zsets.get(name, {}).items(), key=lambda item: item[1])
+        window = ordered[start:None if end == -1 else end + 1]
+        if withscores:
+            return [(member.encode(), score) for member, score in window]
+        return [member.encode() for member, _ in window]
+
+    async def zrem(self, name: str, *members) -> int:
+        zset = self._zsets.get(name, {})
+        return sum(zset.pop(self._name(member), None) is not None for member in members)
+
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
+
+    async def publish(self, channel: str, message) -> int:
+        subscribers = self._subscribers.get(channel, set())
+        for pubsub in subscribers:
+            pubsub.queue.put_nowait({"type": "message", "channel": channel.encode(), "data": self._encode(message)})
+        return len(subscribers)
+
+    def pubsub(self) -> InMemoryPubSub:
+        return InMemoryPubSub(self)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def install() -> None:
+    """Make every ``redis.asyncio`` client created from now on an in-memory one."""
+    import redis.asyncio
+
+    redis.asyncio.Redis = InMemoryRedis
+    redis.asyncio.StrictRedis = InMemoryRedis
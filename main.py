@@ -1,24 +1,109 @@
-from fastapi import FastAPI, Header, status, Request
+import asyncio
+from fastapi import FastAPI, Header, HTTPException, status, Request
+from fastapi.responses import PlainTextResponse
 from typing import Optional
 from contextlib import asynccontextmanager
 from  src.db.main import initdb
+from src.auth.hashing import password_hasher
+from src.db.blocklist import revoked_tokens
+from src.db.broadcast import broadcaster
+from src.subscriptions.scheduler import delivery_scheduler
+from src.outbox import outbox_relay
+from src.mail import mail_dispatcher
+from src.email_templates import email_templates
+from src.config import Config, load_settings
+from src.metrics import metrics
+from src.db.main import db_router, query_profiler
+from src.middleware import register_middleware
+from src.errors import register_all_errors
+from src.auth.token_cache import token_cache
+from src.auth.user_cache import user_cache
+from src.auth.hash_costs import hash_cost_counts, track_hash_costs
+from src.auth.routes import auth_router
+from src.catalog.routes import catalog_router
+from src.bulk.routes import bulk_router
+from src.avatars.routes import avatar_router
+from src.subscriptions.routes import subscriptions_router
+from src.catalog.inventory import inventory_consumer
+from src.avatars.services import avatar_service
+from src.audit import audit_log
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize database"""
     print("Starting server... initializing database")
+    load_settings()
     await initdb()
+    email_templates.load_all()
+    await broadcaster.start()
+    await revoked_tokens.start()
+    await audit_log.start()
+    if Config.INVENTORY_CONSUMER_ENABLED:
+        await inventory_consumer.start()
+
+    background_tasks = []
+    if Config.DATABASE_REPLICA_URLS:
+        background_tasks.append(asyncio.create_task(db_router.run(Config.REPLICA_LAG_CHECK_SECONDS)))
+    if Config.DELIVERY_SCHEDULER_ENABLED:
+        background_tasks.append(asyncio.create_task(
+            delivery_scheduler.run(Config.DELIVERY_SCHEDULER_POLL_SECONDS)
+        ))
+    if Config.OUTBOX_RELAY_ENABLED:
+        background_tasks.append(asyncio.create_task(outbox_relay.run()))
+    background_tasks.append(asyncio.create_task(track_hash_costs(Config.HASH_COST_REFRESH_SECONDS)))
+
     yield
     print("Server is stopping...")
+    for task in background_tasks:
+        task.cancel()
+    await audit_log.stop()
+    await inventory_consumer.stop()
+    await mail_dispatcher.stop()
+    await broadcaster.stop()
+    await revoked_tokens.stop()
+    password_hasher.shutdown()
+    avatar_service.shutdown()
 
 
 app= FastAPI(
     lifespan=lifespan
 )
 
+register_all_errors(app)
+register_middleware(app)
+app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(catalog_router, prefix="/api/v1/catalog", tags=["catalog"])
+app.include_router(bulk_router, prefix="/api/v1/bulk", tags=["bulk"])
+app.include_router(avatar_router, prefix="/api/v1/avatars", tags=["avatars"])
+app.include_router(subscriptions_router, prefix="/api/v1/subscriptions", tags=["subscriptions"])
+
+metrics.register_gauge("token_cache", "Verified token cache size and hit/miss counts.", lambda: token_cache.stats())
+metrics.register_gauge("user_cache", "Current-user cache size and hit/miss counts.", lambda: user_cache.stats())
+metrics.register_gauge("password_hash_pending", "Password hash jobs running or queued.", lambda: password_hasher.pending)
+metrics.register_gauge("db_replica_lag_seconds", "Replication lag per read replica, -1 when unknown.", lambda: db_router.lag_by_replica(), label="replica")
+metrics.register_gauge("db_routing", "Replica count, healthy replicas and reads routed.", lambda: db_router.stats())
+metrics.register_gauge("avatar_thumbnails_pending", "Avatar thumbnail jobs running or queued.", lambda: avatar_service.pending)
+metrics.register_gauge("audit_log", "Audit events buffered, written, and dropped (buffer full or Mongo failing).", lambda: audit_log.stats())
+metrics.register_gauge("inventory_consumer_lag", "Inventory topic messages not yet consumed, per partition.", lambda: inventory_consumer.lag, label="partition")
+metrics.register_gauge("inventory_consumer", "Inventory batches, bouquet updates applied, malformed events, unknown bouquets and dead-lettered events.", lambda: inventory_consumer.stats())
+metrics.register_gauge("password_hash_cost_users", "Stored password hashes at each bcrypt cost.", lambda: dict(hash_cost_counts), label="cost")
+
 
 @app.get("/health")
 def health_check():
     return{
         "status":"healthy"
-    }
\ No newline at end of file
+    }
+
+
+# async so the registry is read on the event loop thread, like every writer
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/sql", include_in_schema=False)
+async def sql_profile_summary():
+    if not Config.SQL_PROFILER_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SQL profiler is disabled")
+    return query_profiler.summary()
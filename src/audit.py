@@ -0,0 +1,269 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from src.config import Config
+from src.lazy import LazyObject
+
+
+class AuditLog:
+    """Write-behind audit trail: events are queued in memory and bulk-inserted into MongoDB.
+
+    ``record()`` only appends to a bounded queue, so auth calls never wait on
+    Mongo. A single writer flushes with ``insert_many`` once ``batch_size``
+    events are waiting or ``flush_interval`` seconds after the oldest arrived.
+    When the queue is full (Mongo slow or down), ``record()`` drops the event
+    and counts it in ``dropped`` rather than stall the request. Every event
+    gets its ``_id`` before the first insert attempt, so a retried or
+    interrupted batch cannot insert duplicates. Mongo is never waited on for
+    long: server selection gives up after ``server_selection_timeout``, indexes
+    are created in the background, and ``stop()`` flushes for at most
+    ``stop_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        database: str,
+        collection: str,
+        enabled: bool = True,
+        max_buffer: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        retention_days: int = 0,
+        max_retries: int = 3,
+        server_selection_timeout: float = 2.0,
+        stop_timeout: float = 10.0,
+    ) -> None:
+        self.url = url
+        self.database = database
+        self.collection_name = collection
+        self.enabled = enabled
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.max_retries = max_retries
+        self.server_selection_timeout = server_selection_timeout
+        self.stop_timeout = stop_timeout
+
+        self._client = None
+        self._queue: asyncio.Queue | None = None
+        self._inflight: list[dict] = []
+        self._task: asyncio.Task | None = None
+        self._index_task: asyncio.Task | None = None
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def collection(self):
+        if self._client is None:
+            from pymongo import AsyncMongoClient
+
+            self._client = AsyncMongoClient(
+                self.url,
+                tz_aware=True,
+                serverSelectionTimeoutMS=int(self.server_selection_timeout * 1000),
+            )
+        return self._client[self.database][self.collection_name]
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_buffer)
+        return self._queue
+
+    def record(
+        self,
+        event_type: str,
+        user_id: str | None = None,
+        ip: str | None = None,
+        **data,
+    ) -> None:
+        if not self.enabled:
+            return
+
+        event = {
+            "type": event_type,
+            "user_id": user_id,
+            "at": datetime.now(timezone.utc),
+            "ip": ip,
+            "data": data,
+        }
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            # one line per thousand drops; a Mongo outage would otherwise log every request
+            if self.dropped % 1000 == 1:
+                logging.warning("Audit buffer full, dropped %d events so far (latest %s)", self.dropped, event_type)
+
+    async def ensure_indexes(self) -> None:
+        from pymongo import ASCENDING, DESCENDING
+
+        collection = self.collection
+        await collection.create_index([("user_id", ASCENDING), ("at", DESCENDING)])
+        await collection.create_index([("type", ASCENDING), ("at", DESCENDING)])
+        if self.retention_days:
+            await collection.create_index("at", expireAfterSeconds=self.retention_days * 86400)
+        else:
+            await collection.create_index([("at", DESCENDING)])
+
+    async def _create_indexes(self) -> None:
+        try:
+            await self.ensure_indexes()
+        except Exception:
+            logging.exception("Could not create audit log indexes")
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        # startup does not wait on Mongo; events are buffered until it answers
+        self._index_task = asyncio.create_task(self._create_indexes())
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and give buffered events up to ``stop_timeout`` seconds to be written."""
+        for task in (self._index_task, self._task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._index_task = self._task = None
+
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self.flush(), self.stop_timeout)
+            except TimeoutError:
+                logging.warning("Audit log flush did not finish within %.0f s", self.stop_timeout)
+            except Exception:
+                logging.exception("Audit log flush failed")
+            lost = len(self._inflight) + self._queue.qsize()
+            if lost:
+                logging.warning("Audit log stopped with %d event(s) unwritten", lost)
+                self.dropped += lost
+                self._inflight = []
+                self._queue = None
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def flush(self) -> None:
+        while self._inflight or not self.queue.empty():
+            if not self._inflight:
+                self._take(self.batch_size)
+            await self._write()
+
+    def _take(self, limit: int) -> None:
+        while len(self._inflight) < limit and not self.queue.empty():
+            self._inflight.append(self.queue.get_nowait())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if not self._inflight:
+                    self._inflight.append(await self.queue.get())
+                deadline = loop.time() + self.flush_interval
+                while True:
+                    self._take(self.batch_size)
+                    remaining = deadline - loop.time()
+                    if len(self._inflight) >= self.batch_size or remaining <= 0:
+                        break
+                    try:
+                        self._inflight.append(await asyncio.wait_for(self.queue.get(), remaining))
+                    except TimeoutError:
+                        break
+                await self._write()
+            except Exception:
+                # e.g. an event bson cannot encode; retrying the batch would fail forever
+                logging.exception("Audit log writer failed, dropping %d event(s)", len(self._inflight))
+                self.dropped += len(self._inflight)
+                self._inflight = []
+                await asyncio.sleep(1)
+
+    async def _write(self) -> None:
+        from bson import ObjectId
+        from pymongo.errors import BulkWriteError, PyMongoError
+
+        batch = self._inflight
+        for event in batch:
+            event.setdefault("_id", ObjectId())
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                break
+            except BulkWriteError as exc:
+                # duplicate keys mean an earlier attempt got those events in
+                errors = [error for error in exc.details.get("writeErrors", []) if error.get("code") != 11000]
+                if not errors:
+                    break
+                if attempt == self.max_retries:
+                    logging.error("Dropping %d audit events after %d attempts", len(errors), attempt)
+                    self.dropped += len(errors)
+                    self.written += len(batch) - len(errors)
+                    self._inflight = []
+                    return
+            except PyMongoError:
+                if attempt == self.max_retries:
+                    logging.exception("Dropping %d audit events after %d attempts", len(batch), attempt)
+                    self.dropped += len(batch)
+                    self._inflight = []
+                    return
+            await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+        self.written += len(batch)
+        self._inflight = []
+
+    async def query(
+        self,
+        user_id: str | None = None,
+        event_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Newest events first; filters map onto the (user_id, at) and (type, at) indexes."""
+        criteria: dict = {}
+        if user_id is not None:
+            criteria["user_id"] = user_id
+        if event_type is not None:
+            criteria["type"] = event_type
+        if since is not None or until is not None:
+            criteria["at"] = {}
+            if since is not None:
+                criteria["at"]["$gte"] = since
+            if until is not None:
+                criteria["at"]["$lt"] = until
+
+        cursor = self.collection.find(criteria).sort("at", -1).limit(limit)
+        events = []
+        async for event in cursor:
+            event["id"] = str(event.pop("_id"))
+            events.append(event)
+        return events
+
+    def stats(self) -> dict:
+        return {
+            "buffered": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+def _create_audit_log() -> AuditLog:
+    return AuditLog(
+        Config.MONGODB_URL,
+        Config.AUDIT_DATABASE,
+        Config.AUDIT_COLLECTION,
+        enabled=Config.AUDIT_LOG_ENABLED,
+        max_buffer=Config.AUDIT_BUFFER_SIZE,
+        batch_size=Config.AUDIT_BATCH_SIZE,
+        flush_interval=Config.AUDIT_FLUSH_SECONDS,
+        retention_days=Config.AUDIT_RETENTION_DAYS,
+        server_selection_timeout=Config.AUDIT_SERVER_SELECTION_SECONDS,
+        stop_timeout=Config.AUDIT_STOP_TIMEOUT_SECONDS,
+    )
+
+
+audit_log = LazyObject(_create_audit_log)
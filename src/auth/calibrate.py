@@ -0,0 +1,49 @@
+"""Pick the bcrypt cost that fits a target verify latency on this host.
+
+    python -m src.auth.calibrate --target-ms 250
+
+Prints the timings per cost and a ``BCRYPT_ROUNDS=<n>`` line for the env file.
+Logins re-hash older passwords at the new cost in the background.
+"""
+import argparse
+import statistics
+import time
+
+from src.auth.utils import generate_password_hash, verify_password
+
+SAMPLE_PASSWORD = "calibration-password"
+
+
+def time_verify(rounds: int, samples: int) -> float:
+    hashed = generate_password_hash(SAMPLE_PASSWORD, rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        verify_password(SAMPLE_PASSWORD, hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(target: float, min_rounds: int = 10, max_rounds: int = 16, samples: int = 5) -> tuple[int, dict[int, float]]:
+    timings = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = time_verify(rounds, samples)
+        if timings[rounds] > target:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m src.auth.calibrate")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    rounds, timings = calibrate(args.target_ms / 1000, args.min_rounds, args.max_rounds, args.samples)
+    for cost, seconds in timings.items():
+        print(f"cost {cost:>2}: {seconds * 1000:8.1f} ms")
+    print(f"BCRYPT_ROUNDS={rounds}")
@@ -6,9 +6,12 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.db.main import get_session
 from src.db.models import User
-from src.db.redis import token_in_blocklist
+from src.db.blocklist import revoked_tokens
 from src.auth.services import UserService
 from src.auth.utils import decode_token
+from src.auth.token_cache import token_cache
+from src.auth.user_cache import user_cache
+from src.metrics import metrics
 from src.errors import (
     InvalidToken,
     RefreshTokenRequired,
@@ -33,15 +36,24 @@ class TokenBearer(HTTPBearer):
             raise InvalidToken("Authorization token missing")
 
         token = creds.credentials
-        token_data = decode_token(token)
+        token_data = token_cache.get(token)
+        if token_data is not None:
+            self.verify_token_data(token_data)
+            return token_data
+
+        with metrics.time_stage("jwt_decode"):
+            token_data = decode_token(token)
 
         if not token_data:
             raise InvalidToken("Could not decode token or token is malformed")
 
-        if await token_in_blocklist(token_data.get("jti")):
+        with metrics.time_stage("blocklist_check"):
+            revoked = await revoked_tokens.is_revoked(token_data.get("jti"))
+        if revoked:
             raise InvalidToken("Token has been revoked or is invalid")
 
         self.verify_token_data(token_data)
+        token_cache.put(token, token_data)
         return token_data
 
     def verify_token_data(self, token_data: dict) -> None:
@@ -68,10 +80,19 @@ async def get_current_user(
 ) -> User:
     user_email = token_details["user"]["email"]
 
-    user = await user_service.get_user_by_email(user_email, session)
+    with metrics.time_stage("user_load"):
+        user = user_cache.get_by_email(user_email)
+        if user is None:
+            # from the primary: a lagging replica would put a pre-write copy in the cache for its whole TTL
+            user = await user_service.get_user_by_email(user_email, session, primary=True)
+            if user is not None:
+                user_cache.put(user)
+
     if not user:
         raise UserNotFound(f"User with email {user_email} not found")
 
+    # lets the replica router keep this user on the primary just after they write
+    session.info["user_id"] = user.id
     return user
 
 
@@ -0,0 +1,30 @@
+import asyncio
+import logging
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.main import engine
+from .services import UserService
+
+user_service = UserService()
+
+# cost -> number of stored hashes, refreshed by track_hash_costs
+hash_cost_counts: dict[int, int] = {}
+
+
+async def refresh_hash_cost_counts() -> None:
+    async with AsyncSession(engine) as session:
+        counts = await user_service.count_password_hash_costs(session)
+    hash_cost_counts.clear()
+    hash_cost_counts.update(counts)
+
+
+async def track_hash_costs(interval: float) -> None:
+    while True:
+        try:
+            await refresh_hash_cost_counts()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Could not count password hash costs")
+        await asyncio.sleep(interval)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+
+from src.config import Config
+from src.lazy import LazyObject
+from .utils import generate_password_hash, verify_password
+
+
+def _hash_batch(passwords: list[str]) -> list[str]:
+    return [generate_password_hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a bounded process or thread pool."""
+
+    def __init__(
+        self,
+        kind: str = "process",
+        workers: int = 2,
+        queue_limit: int = 64,
+        bulk_batch_size: int = 8,
+        bulk_retry_delay: float = 1.0,
+        bulk_workers: int | None = None,
+    ) -> None:
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown password hash executor: {kind!r}")
+        self.kind = kind
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.bulk_batch_size = bulk_batch_size
+        self.bulk_retry_delay = bulk_retry_delay
+        # leave one worker free for logins unless told otherwise (the offline CLI)
+        self.bulk_workers = bulk_workers or max(workers - 1, 1)
+        self._executor: Executor | None = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="passwd-hash"
+                )
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.workers + self.queue_limit:
+            logging.warning("Password hash queue full (%d pending), rejecting request", self._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            logging.exception("Password hash worker died, recreating pool")
+            self._executor = None
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(generate_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, password, hashed_password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hash a batch for bulk jobs without crowding out logins.
+
+        Passwords go through the same bounded queue as requests in batches of
+        ``bulk_batch_size``, with at most ``bulk_workers`` batches in flight, so a
+        bulk job leaves a worker free for logins. When the queue is full a batch
+        waits instead of failing.
+        """
+        slots = asyncio.Semaphore(self.bulk_workers)
+
+        async def hash_batch(batch: list[str]) -> list[str]:
+            async with slots:
+                while True:
+                    try:
+                        return await self._submit(_hash_batch, batch)
+                    except HTTPException as exc:
+                        if exc.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                            raise
+                        await asyncio.sleep(self.bulk_retry_delay)
+
+        batches = [passwords[i:i + self.bulk_batch_size] for i in range(0, len(passwords), self.bulk_batch_size)]
+        results = await asyncio.gather(*(hash_batch(batch) for batch in batches))
+        return [hashed for batch in results for hashed in batch]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _create_password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        kind=Config.PASSWORD_HASH_EXECUTOR,
+        workers=Config.PASSWORD_HASH_WORKERS,
+        queue_limit=Config.PASSWORD_HASH_QUEUE_LIMIT,
+        bulk_batch_size=Config.PASSWORD_HASH_BULK_BATCH_SIZE,
+    )
+
+
+password_hasher = LazyObject(_create_password_hasher)
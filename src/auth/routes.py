@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, status, HTTPException, Query, Request
+from typing import Literal, Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import datetime, timedelta, timezone
 
-from src.db.main import get_session
-from src.db.redis import add_jti_to_blocklist
-from .schemas import PasswordResetConfirmModel, PasswordResetRequestModel, UserCreateModel, UserLoginModel, UserModel, UserBooksModel
+from src.db.main import engine, get_session
+from src.db.blocklist import revoked_tokens
+from .schemas import PasswordResetConfirmModel, PasswordResetRequestModel, UserCreateModel, UserLoginModel, UserModel, UserPageModel, UserProfileViewModel, UserRoleModel
 from .services import UserService
-from .utils import verify_password, create_access_token, generate_password_hash
-from src.celery import send_email  
+from .utils import create_access_token, password_needs_rehash
+from .hashing import password_hasher
+from src.outbox import enqueue_email
+from src.email_templates import email_templates
+from src.ratelimit import RateLimiter, login_limiter, password_reset_limiter
+from src.audit import audit_log
 from src.auth.schemas import SignupResponseModel
 from src.errors import UserNotFound, UserAlreadyExists
 from src.config import Config
@@ -17,9 +23,11 @@ from src.config import Config
 from src.auth.utils import (
     create_url_safe_token,
     decode_url_safe_token,
+    encode_cursor,
+    decode_cursor,
 )
 
-from .dependencies import (
+from .dependecies import (
     AccessTokenBearer,
     RefreshTokenBearer,
     RoleChecker,
@@ -32,12 +40,26 @@ auth_router = APIRouter()
 user_service = UserService()
 
 REFRESH_TOKEN_EXPIRY_DAYS = 7  
+USERS_STREAM_CHUNK_SIZE = 500
 
 refresh_token_bearer = RefreshTokenBearer()
 access_token_bearer = AccessTokenBearer()
 
 
 
+async def rehash_password(user_id: str, password: str) -> None:
+    """Re-hash a password at the current bcrypt cost after a successful login."""
+    try:
+        passwd_hash = await password_hasher.hash(password)
+        async with AsyncSession(engine) as session:
+            user = await user_service.get_user_by_id(user_id, session)
+            if user is not None:
+                await user_service.update_user(user, {"password_hash": passwd_hash}, session)
+    except Exception:
+        logging.exception("Could not rehash password for user %s", user_id)
+
+
+
 @auth_router.post("/signup", response_model=SignupResponseModel, status_code=status.HTTP_201_CREATED)
 async def create_user_account(
     user_data: UserCreateModel,
@@ -48,19 +70,12 @@ async def create_user_account(
     if await user_service.user_exists(email, session):
         raise UserAlreadyExists()
 
-    new_user = await user_service.create_user(user_data, session)
-
     token = create_url_safe_token({"email": email})
     link = f"http://{Config.DOMAIN}/api/v1/auth/verify/{token}"
-    html = f"""
-    <h1>Welcome to {Config.APP_NAME}</h1>
-    <p>Hi {new_user.username},</p>
-    <p>Thank you for registering at {Config.APP_NAME}.</p>
-    <p>Click the link below to verify your email:</p>
-    <p>Please click this <a href="{link}">link</a> to verify your email</p>
-    <p>If you did not sign up, you can safely ignore this email.</p>
-    """
-    send_email.delay([email], "Verify Your Email", html)
+    html = email_templates.render("verify_email.html", username=user_data.username, link=link)
+    # committed together with the new user by create_user
+    enqueue_email(session, [email], "Verify Your Email", html)
+    new_user = await user_service.create_user(user_data, session)
 
     return {
         "message": "Account created.Check your email to verify your account.",
@@ -72,23 +87,33 @@ async def create_user_account(
 @auth_router.post("/login", status_code=status.HTTP_200_OK)
 async def login_users(
     login_data: UserLoginModel, 
+    request: Request,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)
 ):
     email = login_data.email.lower()
     password = login_data.password
+    await login_limiter.check(request, email)
 
     user = await user_service.get_user_by_email(email, session)
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await password_hasher.verify(password, user.password_hash):
+        audit_log.record(
+            "login_failed", user.id if user else None, RateLimiter.client_ip(request), email=email
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
+    if password_needs_rehash(user.password_hash):
+        background_tasks.add_task(rehash_password, user.id, password)
+    audit_log.record("login", user.id, RateLimiter.client_ip(request))
+
     access_token = create_access_token(
-        user_data={"email": user.email, "user_uid": str(user.uid)}
+        user_data={"email": user.email, "user_uid": str(user.id)}
     )
     refresh_token = create_access_token(
-        user_data={"email": user.email, "user_uid": str(user.uid)},
+        user_data={"email": user.email, "user_uid": str(user.id)},
         refresh=True,
         expiry=timedelta(days=REFRESH_TOKEN_EXPIRY_DAYS),
     )
@@ -99,16 +124,24 @@ async def login_users(
             "message": "Login successful",
             "access_token": access_token,
             "refresh_token": refresh_token,
-            "user": {"email": user.email, "uid": str(user.uid)},
+            "user": {"email": user.email, "uid": str(user.id)},
         }
     )
 
 
 
+@auth_router.get("/refresh_token")
+async def get_new_access_token(token_details: dict = Depends(refresh_token_bearer)):
+    new_access_token = create_access_token(user_data=token_details["user"])
+    return JSONResponse(content={"access_token": new_access_token})
+
+
+
 @auth_router.post("/logout", status_code=status.HTTP_200_OK)
-async def logout(token_data: dict = Depends(access_token_bearer)):
+async def logout(request: Request, token_data: dict = Depends(access_token_bearer)):
     jti = token_data['jti']
-    await add_jti_to_blocklist(jti)
+    await revoked_tokens.revoke(jti, token_data["exp"])
+    audit_log.record("logout", token_data["user"].get("user_uid"), RateLimiter.client_ip(request))
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={"message": "Logged out successfully"}
@@ -116,20 +149,24 @@ async def logout(token_data: dict = Depends(access_token_bearer)):
 
 
 @auth_router.post("/password-reset-request")
-async def password_reset_request(email_data: PasswordResetRequestModel):
+async def password_reset_request(
+    email_data: PasswordResetRequestModel,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+):
     email = email_data.email
+    await password_reset_limiter.check(request, email)
 
     token = create_url_safe_token({"email": email})
 
     link = f"http://{Config.DOMAIN}/api/v1/auth/password-reset-confirm/{token}"
 
-    html_message = f"""
-    <h1>Reset Your Password</h1>
-    <p>Please click this <a href="{link}">link</a> to Reset Your Password</p>
-    """
+    html_message = email_templates.render("password_reset.html", link=link)
     subject = "Reset Your Password"
 
-    send_email.delay([email], subject, html_message)
+    enqueue_email(session, [email], subject, html_message)
+    await session.commit()
+    audit_log.record("password_reset_requested", None, RateLimiter.client_ip(request), email=email)
     return JSONResponse(
         content={
             "message": "Please check your email for instructions to reset your password",
@@ -143,6 +180,7 @@ async def password_reset_request(email_data: PasswordResetRequestModel):
 async def reset_account_password(
     token: str,
     passwords: PasswordResetConfirmModel,
+    request: Request,
     session: AsyncSession = Depends(get_session),
 ):
     new_password = passwords.new_password
@@ -162,8 +200,9 @@ async def reset_account_password(
         if not user:
             raise UserNotFound()
 
-        passwd_hash = generate_password_hash(new_password)
+        passwd_hash = await password_hasher.hash(new_password)
         await user_service.update_user(user, {"password_hash": passwd_hash}, session)
+        audit_log.record("password_reset", user.id, RateLimiter.client_ip(request))
 
         return JSONResponse(
             content={"message": "Password reset Successfully"},
@@ -175,14 +214,58 @@ async def reset_account_password(
     )
 
 
-@auth_router.get("/all-users", response_model=list[UserModel])
+@auth_router.get("/all-users", response_model=UserPageModel)
 async def get_all_users(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     _: bool = Depends(admin_checker), 
     session: AsyncSession = Depends(get_session)
 ):
-    users = await user_service.get_all_users(session)
-    return users or []
+    after = decode_cursor(cursor) if cursor else None
+    users = await user_service.get_users_page(session, limit + 1, after)
 
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+
+    return {"users": users, "next_cursor": next_cursor}
+
+
+@auth_router.get("/all-users/stream")
+async def stream_all_users(
+    format: Literal["ndjson", "json"] = "ndjson",
+    _: bool = Depends(admin_checker), 
+    session: AsyncSession = Depends(get_session)
+):
+    async def ndjson_rows():
+        async for user in user_service.stream_users(session, USERS_STREAM_CHUNK_SIZE):
+            yield UserModel.model_validate(user, from_attributes=True).model_dump_json() + "\n"
+
+    async def json_array():
+        separator = "["
+        async for user in user_service.stream_users(session, USERS_STREAM_CHUNK_SIZE):
+            yield separator + UserModel.model_validate(user, from_attributes=True).model_dump_json()
+            separator = ","
+        yield "[]" if separator == "[" else "]"
+
+    if format == "json":
+        return StreamingResponse(json_array(), media_type="application/json")
+    return StreamingResponse(ndjson_rows(), media_type="application/x-ndjson")
+
+
+
+@auth_router.get("/audit-events")
+async def get_audit_events(
+    user_id: Optional[str] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    _: bool = Depends(admin_checker),
+):
+    events = await audit_log.query(user_id, event_type, since, until, limit)
+    return {"events": events}
 
 
 @auth_router.delete("/user/{user_uid}", status_code=status.HTTP_204_NO_CONTENT)
@@ -197,8 +280,23 @@ async def delete_user(
     return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content={})
 
 
-@auth_router.get("/me", response_model=UserBooksModel)
+@auth_router.patch("/user/{user_uid}/role", response_model=UserModel)
+async def set_user_role(
+    user_uid: str,
+    role_data: UserRoleModel,
+    _: bool = Depends(admin_checker),
+    session: AsyncSession = Depends(get_session)
+):
+    user = await user_service.get_user_by_id(user_uid, session)
+    if not user:
+        raise UserNotFound()
+    return await user_service.update_user(user, {"role": role_data.role}, session)
+
+
+@auth_router.get("/me", response_model=UserProfileViewModel)
 async def me(
-    user=Depends(get_current_user), _: bool = Depends(role_checker)
+    user=Depends(get_current_user),
+    _: bool = Depends(role_checker),
+    session: AsyncSession = Depends(get_session),
 ):
-    return user
+    return await user_service.get_user_profile_view(user, session)
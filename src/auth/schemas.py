@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 import uuid
 
@@ -10,7 +10,6 @@ class UserCreateModel(BaseModel):
     first_name: str
     last_name: str
     password: str
-    role: Optional[str] = "user"
 
     model_config = {
         "json_schema_extra": {
@@ -19,18 +18,30 @@ class UserCreateModel(BaseModel):
                 "last_name": "Doe",
                 "username": "johndoe",
                 "email": "johndoe123@co.com",
-                "password": "testpass123",
-                "role": "user"
+                "password": "testpass123"
             }
         }
     }
 
 
+class UserRoleModel(BaseModel):
+    role: Literal["user", "admin"]
+
+
 class UserLoginModel(BaseModel):
     email: EmailStr
     password: str
 
 
+class PasswordResetRequestModel(BaseModel):
+    email: EmailStr
+
+
+class PasswordResetConfirmModel(BaseModel):
+    new_password: str
+    confirm_new_password: str
+
+
 
 
 class UserModel(BaseModel):
@@ -47,3 +58,68 @@ class UserModel(BaseModel):
     model_config={
         "form_attributes": True
     }
+
+
+class SignupResponseModel(BaseModel):
+    message: str
+    user: UserModel
+
+
+class UserPageModel(BaseModel):
+    users: List[UserModel]
+    next_cursor: Optional[str] = None
+
+
+class BouquetModel(BaseModel):
+    id: uuid.UUID
+    name: str
+    description: str
+    price: float
+    subscription_fee: float
+    image_url: Optional[str] = None
+    is_available: bool
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class SubscriptionModel(BaseModel):
+    id: uuid.UUID
+    frequency: str
+    next_delivery: datetime
+    active: bool
+    started_at: datetime
+    bouquet: BouquetModel
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class ProfileModel(BaseModel):
+    avatar_url: Optional[str] = None
+    avatar_thumbnails: Optional[dict[str, str]] = None
+    bio: Optional[str] = None
+    phone_number: Optional[str] = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class UserProfileViewModel(BaseModel):
+    id: uuid.UUID
+    username: str
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    is_verified: bool
+    created_at: datetime
+    profile: Optional[ProfileModel] = None
+    subscriptions: List[SubscriptionModel] = []
+
+    model_config = {
+        "from_attributes": True
+    }
+
@@ -1,15 +1,22 @@
-from src.db.models import User
-from .schemas import UserCreateModel
-from .utils import generate_password_hash
+from src.db.models import User, UserProfile, Subscription
+from .schemas import ProfileModel, SubscriptionModel, UserCreateModel, UserProfileViewModel
+from .hashing import password_hasher
+from .user_cache import user_cache
+from src.audit import audit_log
+from src.db.replicas import from_primary
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
+from sqlmodel import select, or_, and_, func
+from sqlalchemy.orm import joinedload
+from typing import AsyncIterator
 import uuid
 from datetime import datetime, timezone
 
 
 class UserService:
-    async def get_user_by_email(self, email: str, session: AsyncSession) -> User | None:
+    async def get_user_by_email(self, email: str, session: AsyncSession, primary: bool = False) -> User | None:
         statement = select(User).where(User.email == email)
+        if primary:
+            statement = from_primary(statement)
         result = await session.exec(statement)
         return result.first()
     async def user_exists(self, email: str, session: AsyncSession) -> bool:
@@ -21,20 +28,116 @@ class UserService:
         users = result.scalars().all()
         return users
 
+    async def get_users_page(
+        self,
+        session: AsyncSession,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[User]:
+        statement = select(User).order_by(User.created_at, User.id).limit(limit)
+        if after is not None:
+            created_at, user_id = after
+            statement = statement.where(
+                or_(
+                    User.created_at > created_at,
+                    and_(User.created_at == created_at, User.id > user_id),
+                )
+            )
+        result = await session.exec(statement)
+        return list(result.all())
+
+    async def stream_users(self, session: AsyncSession, chunk_size: int = 500) -> AsyncIterator[User]:
+        statement = (
+            select(User)
+            .order_by(User.created_at, User.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await session.stream_scalars(statement)
+        async for partition in result.partitions():
+            for user in partition:
+                yield user
+            # not expunge_all(): the open result keeps loading into this identity map
+            for user in partition:
+                session.expunge(user)
+
+    async def get_user_by_id(self, user_id: str, session: AsyncSession) -> User | None:
+        return await session.get(User, user_id)
+
+    async def count_password_hash_costs(self, session: AsyncSession) -> dict[int, int]:
+        cost = func.substr(User.password_hash, 5, 2)
+        result = await session.exec(select(cost, func.count()).group_by(cost))
+        return {int(value): count for value, count in result.all() if value and value.isdigit()}
+
+    async def get_user_profile_view(self, user: User, session: AsyncSession) -> UserProfileViewModel:
+        """Build the ``/me`` view for an already-loaded user in two queries.
+
+        The user itself comes from ``get_current_user`` (often the user cache),
+        so only the profile and the active subscriptions, joined to their
+        bouquets, are fetched.
+        """
+        profile = (await session.exec(
+            select(UserProfile).where(UserProfile.user_id == user.id)
+        )).first()
+        subscriptions = (await session.exec(
+            select(Subscription)
+            .where(Subscription.user_id == user.id, Subscription.active == True)
+            .options(joinedload(Subscription.bouquet))
+            .order_by(Subscription.started_at, Subscription.id)
+        )).all()
+        return UserProfileViewModel(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_verified=user.is_verified,
+            created_at=user.created_at,
+            profile=ProfileModel.model_validate(profile) if profile is not None else None,
+            subscriptions=[SubscriptionModel.model_validate(subscription) for subscription in subscriptions],
+        )
+
     async def create_user(self, user_data: UserCreateModel, session: AsyncSession) -> User:
         user_dict = user_data.model_dump()
         new_user = User(
-            uid=str(uuid.uuid4()),                
+            id=str(uuid.uuid4()),                
             username=user_dict["username"],
             first_name=user_dict.get("first_name"),
             last_name=user_dict.get("last_name"),
-            email=user_dict["email"],
-            password_hash=generate_password_hash(user_dict["password"]),
-            is_verified=user_dict.get("is_verified", False),
-            created_at=datetime.now(timezone.utc).isoformat(),
+            email=user_dict["email"].lower(),
+            # signups never choose their own privileges; an admin sets roles later
+            role="user",
+            password_hash=await password_hasher.hash(user_dict["password"]),
+            is_verified=False,
+            created_at=datetime.now(timezone.utc),
         )
         session.add(new_user)
         await session.commit()
         await session.refresh(new_user)
+        audit_log.record("user_created", new_user.id)
+
+        return new_user
+
+    async def update_user(self, user: User, user_data: dict, session: AsyncSession) -> User:
+        for key, value in user_data.items():
+            setattr(user, key, value)
+
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        await user_cache.invalidate(user.id, user.email)
+        # field names only, never values such as password hashes
+        audit_log.record("user_updated", user.id, fields=sorted(user_data))
+
+        return user
+
+    async def delete_user(self, user_uid: str, session: AsyncSession) -> bool:
+        user = await session.get(User, user_uid)
+        if user is None:
+            return False
+
+        await session.delete(user)
+        await session.commit()
+        await user_cache.invalidate(user.id, user.email)
+        audit_log.record("user_deleted", user.id)
 
-        return new_user
\ No newline at end of file
+        return True
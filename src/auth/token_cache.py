@@ -0,0 +1,107 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from src.config import Config
+from src.lazy import LazyObject
+
+
+class VerifiedTokenCache:
+    """Size-bounded LRU of already verified JWT payloads keyed by token digest.
+
+    Entries expire at the token's own ``exp`` (capped by ``max_ttl``) and can be
+    dropped early by jti when a token is revoked.
+    """
+
+    def __init__(self, maxsize: int = 10_000, max_ttl: float = 300.0) -> None:
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._by_jti: dict[str, set[bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, token_data = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return token_data
+
+    def put(self, token: str, token_data: dict) -> None:
+        if self.maxsize <= 0:
+            return
+
+        now = time.time()
+        expires_at = min(float(token_data.get("exp", now)), now + self.max_ttl)
+        if expires_at <= now:
+            return
+
+        key = self._key(token)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, token_data)
+
+        jti = token_data.get("jti")
+        if jti:
+            self._by_jti.setdefault(jti, set()).add(key)
+
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def evict_jti(self, jti: str) -> None:
+        for key in self._by_jti.pop(jti, ()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_jti.clear()
+
+    def _remove(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        jti = entry[1].get("jti")
+        keys = self._by_jti.get(jti)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_jti[jti]
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _create_token_cache() -> VerifiedTokenCache:
+    from src.db.blocklist import revoked_tokens
+
+    cache = VerifiedTokenCache(
+        maxsize=Config.TOKEN_CACHE_SIZE,
+        max_ttl=Config.TOKEN_CACHE_MAX_TTL,
+    )
+    # a revoked jti must not keep being served from the cache
+    revoked_tokens.add_listener(cache.evict_jti)
+    return cache
+
+
+token_cache = LazyObject(_create_token_cache)
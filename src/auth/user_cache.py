@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+
+from src.config import Config
+from src.lazy import LazyObject
+from src.db.broadcast import broadcaster, Broadcaster
+from src.db.models import User
+
+USER_CACHE_CHANNEL = "user-cache:invalidate"
+
+
+class UserCache:
+    """TTL + LRU cache of users, addressable by id and by email.
+
+    Entries are stored as plain snapshots and every hit returns a fresh, detached
+    ``User`` built from one, so callers must not add the result to a session.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 60.0,
+        enabled: bool = True,
+        broadcaster: Broadcaster | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self.broadcaster = broadcaster
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._ids_by_email: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if broadcaster is not None:
+            broadcaster.subscribe(USER_CACHE_CHANNEL, self._on_message)
+
+    def get_by_id(self, user_id: str) -> User | None:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, snapshot = entry
+        if expires_at <= time.monotonic():
+            self._remove(user_id)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return User.model_validate(snapshot)
+
+    def get_by_email(self, email: str) -> User | None:
+        if not self.enabled:
+            return None
+
+        user_id = self._ids_by_email.get(email)
+        if user_id is None:
+            self.misses += 1
+            return None
+        return self.get_by_id(user_id)
+
+    def put(self, user: User) -> None:
+        if not self.enabled:
+            return
+
+        self._remove(user.id)
+        self._entries[user.id] = (time.monotonic() + self.ttl, user.model_dump())
+        self._ids_by_email[user.email] = user.id
+
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def discard(self, user_id: str | None = None, email: str | None = None) -> None:
+        if email is not None and user_id is None:
+            user_id = self._ids_by_email.get(email)
+        if user_id is not None:
+            self._remove(user_id)
+        if email is not None:
+            self._ids_by_email.pop(email, None)
+
+    async def invalidate(self, user_id: str | None = None, email: str | None = None) -> None:
+        self.discard(user_id, email)
+        if self.enabled and self.broadcaster is not None:
+            await self.broadcaster.publish(USER_CACHE_CHANNEL, {"id": user_id, "email": email})
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._ids_by_email.clear()
+
+    def _on_message(self, message: dict) -> None:
+        self.discard(message.get("id"), message.get("email"))
+
+    def _remove(self, user_id: str) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            email = entry[1].get("email")
+            if self._ids_by_email.get(email) == user_id:
+                del self._ids_by_email[email]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _create_user_cache() -> UserCache:
+    return UserCache(
+        maxsize=Config.USER_CACHE_SIZE,
+        ttl=Config.USER_CACHE_TTL,
+        enabled=Config.USER_CACHE_ENABLED,
+        broadcaster=broadcaster if Config.USER_CACHE_BROADCAST else None,
+    )
+
+
+user_cache = LazyObject(_create_user_cache)
@@ -1,26 +1,52 @@
 import uuid
+import json
+import base64
 import logging
 from datetime import datetime, timedelta, timezone
 from itsdangerous import URLSafeTimedSerializer
 from itsdangerous import BadSignature, SignatureExpired
 from fastapi import HTTPException
 
+import bcrypt
 import jwt
-from passlib.context import CryptContext
 from src.config import Config
+from src.lazy import LazyObject
 
-serializer = URLSafeTimedSerializer(
-    secret_key=Config.JWT_SECRET, 
-    salt="email-configuration"
-)
 
-passwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def _create_serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(
+        secret_key=Config.JWT_SECRET,
+        salt="email-configuration"
+    )
+
+
+serializer = LazyObject(_create_serializer)
+
+# bcrypt only looks at the first 72 bytes; bcrypt>=5 raises instead of truncating
+BCRYPT_MAX_BYTES = 72
 
-def generate_password_hash(password: str) -> str:
-    return passwd_context.hash(password)
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+def generate_password_hash(password: str, rounds: int | None = None) -> str:
+    salt = bcrypt.gensalt(rounds=rounds if rounds is not None else Config.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode()
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return passwd_context.verify(password, hashed_password)
+    try:
+        return bcrypt.checkpw(_password_bytes(password), hashed_password.encode())
+    except ValueError:
+        return False
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return bcrypt_cost(hashed_password) != Config.BCRYPT_ROUNDS
+
+def bcrypt_cost(hashed_password: str) -> int | None:
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
 
 
 def create_access_token(user_data: dict, expiry: timedelta = None, refresh: bool = False) -> str:
@@ -75,4 +101,16 @@ def decode_url_safe_token(token: str, max_age: int = 3600) -> dict:
     except Exception as e:
         logging.exception("Unknown error decoding token", exc_info=e)
         raise HTTPException(status_code=500, detail="Could not decode token")
-    
\ No newline at end of file
+
+
+def encode_cursor(created_at: datetime, user_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), user_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+
+    try:
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), user_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.dependecies import RoleChecker, get_current_user
+from src.auth.schemas import ProfileModel
+from src.db.main import get_session
+from .schemas import AvatarConfirmModel, AvatarUploadModel, AvatarUploadRequestModel
+from .services import avatar_service
+
+avatar_router = APIRouter()
+role_checker = RoleChecker(["admin", "user"])
+
+
+@avatar_router.post("/upload-url", response_model=AvatarUploadModel)
+async def create_avatar_upload(
+    upload: AvatarUploadRequestModel,
+    user=Depends(get_current_user),
+    _: bool = Depends(role_checker),
+):
+    return await avatar_service.create_upload(user.id, upload.content_type, upload.content_length)
+
+
+@avatar_router.post("/confirm", response_model=ProfileModel, status_code=status.HTTP_202_ACCEPTED)
+async def confirm_avatar_upload(
+    upload: AvatarConfirmModel,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_current_user),
+    _: bool = Depends(role_checker),
+    session: AsyncSession = Depends(get_session),
+):
+    """Check the uploaded object and save its URL; thumbnails are added to the profile shortly after."""
+    profile = await avatar_service.confirm_upload(user.id, upload.key, session)
+    background_tasks.add_task(avatar_service.generate_thumbnails, user.id, upload.key)
+    return profile
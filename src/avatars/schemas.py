@@ -0,0 +1,20 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class AvatarUploadRequestModel(BaseModel):
+    content_type: Literal["image/jpeg", "image/png", "image/webp"]
+    content_length: int = Field(gt=0)
+
+
+class AvatarUploadModel(BaseModel):
+    """Presigned S3 POST: send ``fields`` plus the file as multipart form data to ``url``."""
+    url: str
+    fields: dict[str, str]
+    key: str
+    expires_in: int
+
+
+class AvatarConfirmModel(BaseModel):
+    key: str
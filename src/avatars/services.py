@@ -0,0 +1,252 @@
+import asyncio
+import io
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.config import Config
+from src.db.main import engine
+from src.db.models import UserProfile
+from src.lazy import LazyObject
+
+CONTENT_TYPE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def make_thumbnails(image_bytes: bytes, sizes: list[int], max_pixels: int = 25_000_000) -> dict[int, bytes]:
+    """Square-cropped JPEG thumbnail bytes for each size.
+
+    Raises ``ImageTooLarge`` for images over ``max_pixels``: a few kilobytes of
+    PNG can declare dimensions that take gigabytes to decode.
+    """
+    from PIL import Image, ImageOps
+
+    # Pillow's own decompression-bomb check, for anything that reaches a decoder without the check below
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    thumbnails = {}
+    # open() only reads the header, so the size is known before anything is decoded
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        if image.width * image.height > max_pixels:
+            raise ImageTooLarge(f"{image.width}x{image.height} is over {max_pixels} pixels")
+        # JPEGs can be decoded at a reduced scale, which is most of the cost for phone photos
+        image.draft("RGB", (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        for size in sizes:
+            thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, format="JPEG", quality=85, optimize=True)
+            thumbnails[size] = buffer.getvalue()
+    return thumbnails
+
+
+class AvatarService:
+    """Avatar uploads that go straight from the client to S3.
+
+    The API only signs an upload, checks the result with a HEAD request and
+    stores URLs; image bytes never pass through the web workers except for
+    thumbnailing, which runs on a small thread pool after the response.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        bucket: str,
+        region: str,
+        endpoint_url: str | None = None,
+        public_base_url: str = "",
+        max_bytes: int = 5 * 1024 * 1024,
+        expires_in: int = 300,
+        thumbnail_sizes: list[int] | None = None,
+        max_pixels: int = 25_000_000,
+        workers: int = 2,
+    ) -> None:
+        self.engine = engine
+        self.bucket = bucket
+        self.region = region
+        self.endpoint_url = endpoint_url
+        self.max_bytes = max_bytes
+        self.expires_in = expires_in
+        self.thumbnail_sizes = sorted(thumbnail_sizes or [64, 256])
+        self.max_pixels = max_pixels
+        self.workers = workers
+        if public_base_url:
+            self.public_base_url = public_base_url.rstrip("/")
+        elif endpoint_url:
+            self.public_base_url = f"{endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.public_base_url = f"https://{bucket}.s3.{region}.amazonaws.com"
+        self._client = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+
+            # boto3 clients are thread-safe once created, so the pool shares this one
+            self._client = boto3.client("s3", region_name=self.region, endpoint_url=self.endpoint_url)
+        return self._client
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def public_url(self, key: str) -> str:
+        return f"{self.public_base_url}/{key}"
+
+    @staticmethod
+    def key_prefix(user_id: str) -> str:
+        return f"avatars/{user_id}/"
+
+    def owned_keys(self, user_id: str, urls: list[str | None]) -> list[str]:
+        """Object keys behind ``urls`` that this service stored for ``user_id``; other URLs are left alone."""
+        base = f"{self.public_base_url}/{self.key_prefix(user_id)}"
+        return [url[len(self.public_base_url) + 1:] for url in urls if url and url.startswith(base)]
+
+    async def delete_objects(self, keys: list[str]) -> None:
+        if not keys:
+            return
+        try:
+            await asyncio.to_thread(
+                self.client.delete_objects,
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+        except Exception:
+            # an orphaned object costs storage, not correctness; the new avatar is already saved
+            logging.exception("Could not delete replaced avatar objects %s", keys)
+
+    async def create_upload(self, user_id: str, content_type: str, content_length: int) -> dict:
+        if content_length > self.max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Avatars are limited to {self.max_bytes} bytes",
+            )
+
+        key = f"{self.key_prefix(user_id)}{uuid.uuid4().hex}.{CONTENT_TYPE_EXTENSIONS[content_type]}"
+        # S3 itself rejects a POST whose type or size differs from what was signed
+        post = await asyncio.to_thread(
+            self.client.generate_presigned_post,
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, self.max_bytes],
+            ],
+            ExpiresIn=self.expires_in,
+        )
+        return {"url": post["url"], "fields": post["fields"], "key": key, "expires_in": self.expires_in}
+
+    async def confirm_upload(self, user_id: str, key: str, session: AsyncSession) -> UserProfile:
+        if not key.startswith(self.key_prefix(user_id)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Upload does not belong to this user")
+
+        from botocore.exceptions import ClientError
+
+        try:
+            head = await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+            raise
+
+        if head["ContentLength"] > self.max_bytes or head.get("ContentType") not in CONTENT_TYPE_EXTENSIONS:
+            await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is not an accepted image")
+
+        # FOR UPDATE also keeps this read-modify-write on the primary
+        statement = select(UserProfile).where(UserProfile.user_id == user_id).with_for_update()
+        profile = (await session.exec(statement)).first() or UserProfile(user_id=user_id)
+        replaced = [profile.avatar_url, *(profile.avatar_thumbnails or {}).values()]
+        profile.avatar_url = self.public_url(key)
+        profile.avatar_thumbnails = None
+        session.add(profile)
+        await session.commit()
+        await session.refresh(profile)
+
+        # confirming the same key twice must not delete the avatar just saved
+        await self.delete_objects([old for old in self.owned_keys(user_id, replaced) if old != key])
+        return profile
+
+    def _build_thumbnails(self, key: str) -> dict[str, str]:
+        body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        try:
+            image_bytes = body.read(self.max_bytes + 1)
+        finally:
+            body.close()
+
+        stem = key.rsplit(".", 1)[0]
+        urls = {}
+        for size, data in make_thumbnails(image_bytes, self.thumbnail_sizes, self.max_pixels).items():
+            thumbnail_key = f"{stem}_{size}.jpg"
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=thumbnail_key,
+                Body=data,
+                ContentType="image/jpeg",
+                # keys are never reused, so clients and CDNs can keep them forever
+                CacheControl="public, max-age=31536000, immutable",
+            )
+            urls[str(size)] = self.public_url(thumbnail_key)
+        return urls
+
+    async def generate_thumbnails(self, user_id: str, key: str) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="avatar-thumbnails")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            urls = await loop.run_in_executor(self._executor, self._build_thumbnails, key)
+
+            async with AsyncSession(self.engine) as session:
+                statement = select(UserProfile).where(UserProfile.user_id == user_id).with_for_update()
+                profile = (await session.exec(statement)).first()
+                # a newer upload may have replaced (and deleted) this avatar while the thumbnails were built
+                if profile is None or profile.avatar_url != self.public_url(key):
+                    await self.delete_objects(self.owned_keys(user_id, list(urls.values())))
+                    return
+                profile.avatar_thumbnails = urls
+                session.add(profile)
+                await session.commit()
+        except ImageTooLarge as exc:
+            logging.warning("Not generating avatar thumbnails for %s: %s", key, exc)
+        except Exception:
+            logging.exception("Could not generate avatar thumbnails for %s", key)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        # called from the lifespan, so it must not block the event loop on a running job;
+        # queued jobs are dropped and the running ones finish before the interpreter exits
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _create_avatar_service() -> AvatarService:
+    return AvatarService(
+        engine,
+        bucket=Config.AVATAR_BUCKET,
+        region=Config.AWS_REGION,
+        endpoint_url=Config.S3_ENDPOINT_URL,
+        public_base_url=Config.AVATAR_PUBLIC_BASE_URL,
+        max_bytes=Config.AVATAR_MAX_BYTES,
+        expires_in=Config.AVATAR_UPLOAD_EXPIRES_SECONDS,
+        thumbnail_sizes=Config.AVATAR_THUMBNAIL_SIZES,
+        max_pixels=Config.AVATAR_MAX_PIXELS,
+        workers=Config.AVATAR_THUMBNAIL_WORKERS,
+    )
+
+
+avatar_service = LazyObject(_create_avatar_service)
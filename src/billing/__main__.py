@@ -0,0 +1,40 @@
+"""Run billing for due subscriptions from the command line (e.g. from cron).
+
+    python -m src.billing
+    python -m src.billing --due-before 2025-01-31T23:59:59 --workers 8
+
+Safe to re-run: periods that already have an invoice are skipped.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+from src.config import Config
+from src.db.main import engine
+from .services import BillingService, due_before_from_now
+
+
+async def main(args: argparse.Namespace) -> int:
+    service = BillingService(
+        engine,
+        chunk_size=args.chunk_size or Config.BILLING_CHUNK_SIZE,
+        workers=args.workers or Config.BILLING_WORKERS,
+    )
+    due_before = args.due_before or due_before_from_now(Config.BILLING_LOOKAHEAD_SECONDS)
+    try:
+        report = await service.run(due_before)
+    finally:
+        await engine.dispose()
+
+    print(json.dumps(report.model_dump(), indent=2, default=str))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m src.billing")
+    parser.add_argument("--due-before", type=datetime.fromisoformat, help="bill deliveries due up to this UTC time")
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--workers", type=int)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,18 @@
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+
+class BillingReport(BaseModel):
+    run_id: str
+    due_before: datetime
+    # subscriptions with something to bill; each can have several due periods
+    scanned: int = 0
+    # periods invoiced by this run
+    invoiced: int = 0
+    # already invoiced by an earlier or concurrent run
+    skipped: int = 0
+    failed: int = 0
+    amount: Decimal = Decimal("0.00")
+    elapsed_seconds: float = 0.0
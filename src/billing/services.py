@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.db.models import Bouquet, Invoice, Subscription
+from src.subscriptions.scheduler import advance_delivery
+from .schemas import BillingReport
+
+CENT = Decimal("0.01")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_money(value) -> Decimal:
+    """Bouquet prices are floats; going through ``str`` keeps 12.1 from becoming 12.0999999..."""
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def idempotency_key(subscription_id: str, period_start: datetime) -> str:
+    return f"{subscription_id}:{_naive(period_start):%Y%m%dT%H%M%S}"
+
+
+def insert_ignoring_billed(dialect: str):
+    """INSERT into invoices that silently skips rows whose idempotency key already exists."""
+    table = Invoice.__table__
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+
+        statement = insert(table)
+        # a no-op update, so a duplicate counts as 0 affected rows
+        return statement.on_duplicate_key_update(idempotency_key=statement.inserted.idempotency_key)
+
+    from sqlalchemy.dialects.sqlite import insert
+
+    return insert(table).on_conflict_do_nothing(index_elements=["idempotency_key"])
+
+
+def due_subscriptions(due_before: datetime):
+    """Active subscriptions with a period to bill starting by ``due_before``, with their bouquet's prices."""
+    return (
+        select(
+            Subscription.id,
+            Subscription.user_id,
+            Subscription.bouquet_id,
+            Subscription.frequency,
+            Subscription.started_at,
+            Subscription.next_billing_at,
+            Bouquet.price,
+            Bouquet.subscription_fee,
+        )
+        .join(Bouquet, Bouquet.id == Subscription.bouquet_id)
+        .where(Subscription.active == True, Subscription.next_billing_at <= due_before)
+    )
+
+
+class BillingService:
+    """Invoices every period of every active subscription that starts by ``due_before``.
+
+    A subscription's ``next_billing_at`` is the first period not invoiced yet;
+    a run bills it and every later period up to ``due_before`` (so missed runs
+    catch up), then moves ``next_billing_at`` past them in the same
+    transaction. Due rows are read through a server-side cursor
+    (``yield_per``) and handed out in chunks over a bounded queue to
+    ``workers`` concurrent writers, each with its own connection. Every period
+    has its own idempotency key, so periods already invoiced are skipped and a
+    run that crashed or was stopped can simply be started again.
+    """
+
+    def __init__(self, engine: AsyncEngine, chunk_size: int = 1000, workers: int = 4, max_retries: int = 3) -> None:
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.max_retries = max_retries
+
+    def price(self, rows, run_id: str, now: datetime, due_before: datetime) -> tuple[list[dict], list[dict]]:
+        """Invoices for every due period of ``rows``, and each subscription's new ``next_billing_at``."""
+        invoices = []
+        advances = []
+        for subscription_id, user_id, bouquet_id, frequency, started_at, period_start, price, fee in rows:
+            price, fee = to_money(price), to_money(fee)
+            anchor_day = _naive(started_at).day
+            period_start = _naive(period_start)
+            while period_start <= due_before:
+                invoices.append({
+                    "id": str(uuid.uuid4()),
+                    "idempotency_key": idempotency_key(subscription_id, period_start),
+                    "subscription_id": subscription_id,
+                    "user_id": user_id,
+                    "bouquet_id": bouquet_id,
+                    "period_start": period_start,
+                    "price": price,
+                    "subscription_fee": fee,
+                    "amount": price + fee,
+                    "status": "pending",
+                    "billing_run_id": run_id,
+                    "created_at": now,
+                })
+                period_start = advance_delivery(period_start, frequency, anchor_day)
+            advances.append({"b_id": subscription_id, "b_next": period_start})
+        return invoices, advances
+
+    async def _bill_chunk(self, rows, run_id: str, report: BillingReport) -> None:
+        invoices, advances = self.price(rows, run_id, utcnow(), report.due_before)
+        statement = insert_ignoring_billed(self.engine.dialect.name)
+        table = Subscription.__table__
+        advance = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(next_billing_at=bindparam("b_next"))
+        )
+
+        # what this run actually inserted, read back inside the same transaction over the unique key
+        billed = select(func.count(), func.coalesce(func.sum(Invoice.amount), 0)).where(
+            Invoice.idempotency_key.in_([invoice["idempotency_key"] for invoice in invoices]),
+            Invoice.billing_run_id == run_id,
+        )
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with self.engine.begin() as conn:
+                    if invoices:
+                        await conn.execute(statement, invoices)
+                    await conn.execute(advance, advances)
+                    inserted, amount = (await conn.execute(billed)).one()
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    logging.exception("Billing chunk of %d subscriptions failed, leaving it for the next run", len(rows))
+                    report.failed += len(rows)
+                    return
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+        report.invoiced += inserted
+        report.skipped += len(invoices) - inserted
+        report.amount += to_money(amount)
+
+    async def _worker(self, queue: asyncio.Queue, run_id: str, report: BillingReport) -> None:
+        while True:
+            rows = await queue.get()
+            try:
+                if rows is None:
+                    return
+                await self._bill_chunk(rows, run_id, report)
+            except Exception:
+                logging.exception("Could not bill a chunk of %d subscriptions", len(rows))
+                report.failed += len(rows)
+            finally:
+                queue.task_done()
+
+    async def run(self, due_before: datetime | None = None) -> BillingReport:
+        due_before = _naive(due_before) if due_before is not None else utcnow()
+        report = BillingReport(run_id=str(uuid.uuid4()), due_before=due_before)
+        started = time.perf_counter()
+
+        statement = due_subscriptions(due_before).execution_options(yield_per=self.chunk_size)
+
+        # two chunks per worker in flight at most, so the cursor never races ahead of the writers
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        workers = [asyncio.create_task(self._worker(queue, report.run_id, report)) for _ in range(self.workers)]
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.stream(statement)
+                async for rows in result.partitions():
+                    report.scanned += len(rows)
+                    await queue.put(rows)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+
+def due_before_from_now(lookahead_seconds: int) -> datetime:
+    return utcnow() + timedelta(seconds=lookahead_seconds)
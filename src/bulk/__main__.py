@@ -0,0 +1,77 @@
+"""Bulk import/export from the command line.
+
+    python -m src.bulk import users users.ndjson
+    python -m src.bulk import subscriptions subs.csv
+    python -m src.bulk export users users.csv
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from src.auth.hashing import PasswordHasher
+from src.config import Config
+from src.db.main import engine
+from src.db.models import Subscription, User
+from .services import BulkService, iter_records, SUBSCRIPTION_EXPORT_COLUMNS, USER_EXPORT_COLUMNS
+
+EXPORTS = {
+    "users": (User, USER_EXPORT_COLUMNS),
+    "subscriptions": (Subscription, SUBSCRIPTION_EXPORT_COLUMNS),
+}
+
+
+async def read_file(path: Path, block_size: int = 1 << 20):
+    with path.open("rb") as fh:
+        while block := await asyncio.to_thread(fh.read, block_size):
+            yield block
+
+
+def detect_format(path: Path, fmt: str | None) -> str:
+    return fmt or ("csv" if path.suffix.lower() == ".csv" else "ndjson")
+
+
+async def main(args: argparse.Namespace) -> int:
+    # nothing else runs in this process, so bulk hashing gets every worker
+    hasher = PasswordHasher(
+        kind=Config.PASSWORD_HASH_EXECUTOR,
+        workers=args.hash_workers,
+        queue_limit=Config.PASSWORD_HASH_QUEUE_LIMIT,
+        bulk_batch_size=Config.PASSWORD_HASH_BULK_BATCH_SIZE,
+        bulk_workers=args.hash_workers,
+    )
+    service = BulkService(engine, chunk_size=args.chunk_size, hasher=hasher)
+    path = Path(args.path)
+    fmt = detect_format(path, args.format)
+
+    try:
+        if args.command == "import":
+            records = iter_records(read_file(path), fmt)
+            if args.kind == "users":
+                report = await service.import_users(records)
+            else:
+                report = await service.import_subscriptions(records)
+            print(json.dumps(report.model_dump(), indent=2, default=str))
+            return 1 if report.failed else 0
+
+        model, columns = EXPORTS[args.kind]
+        with path.open("w", newline="") as fh:
+            async for text in service.export(model, columns, fmt):
+                fh.write(text)
+        return 0
+    finally:
+        hasher.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m src.bulk")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("kind", choices=["users", "subscriptions"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,55 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from src.auth.dependecies import RoleChecker
+from src.db.main import engine
+from src.db.models import Subscription, User
+from .schemas import ImportReport
+from .services import BulkService, iter_records, SUBSCRIPTION_EXPORT_COLUMNS, USER_EXPORT_COLUMNS
+
+bulk_router = APIRouter()
+bulk_service = BulkService(engine)
+admin_checker = RoleChecker(["admin"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@bulk_router.post("/users/import", response_model=ImportReport)
+async def import_users(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    _: bool = Depends(admin_checker),
+):
+    return await bulk_service.import_users(iter_records(request.stream(), format))
+
+
+@bulk_router.get("/users/export")
+async def export_users(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    _: bool = Depends(admin_checker),
+):
+    return StreamingResponse(
+        bulk_service.export(User, USER_EXPORT_COLUMNS, format), media_type=MEDIA_TYPES[format]
+    )
+
+
+@bulk_router.post("/subscriptions/import", response_model=ImportReport)
+async def import_subscriptions(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    _: bool = Depends(admin_checker),
+):
+    return await bulk_service.import_subscriptions(iter_records(request.stream(), format))
+
+
+@bulk_router.get("/subscriptions/export")
+async def export_subscriptions(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    _: bool = Depends(admin_checker),
+):
+    return StreamingResponse(
+        bulk_service.export(Subscription, SUBSCRIPTION_EXPORT_COLUMNS, format),
+        media_type=MEDIA_TYPES[format],
+    )
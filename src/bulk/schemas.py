@@ -0,0 +1,57 @@
+from pydantic import BaseModel, EmailStr, model_validator
+from typing import Optional
+from datetime import datetime
+
+from src.db.models import Frequency
+
+
+class UserImportModel(BaseModel):
+    email: EmailStr
+    username: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    password: Optional[str] = None
+    password_hash: Optional[str] = None
+    is_verified: bool = False
+
+    @model_validator(mode="after")
+    def check_password(self):
+        if not self.password and not self.password_hash:
+            raise ValueError("either password or password_hash is required")
+        if self.password_hash and not self.password_hash.startswith("$2"):
+            raise ValueError("password_hash must be a bcrypt hash")
+        return self
+
+
+class SubscriptionImportModel(BaseModel):
+    user_id: Optional[str] = None
+    user_email: Optional[EmailStr] = None
+    bouquet_id: str
+    frequency: Frequency
+    next_delivery: datetime
+    active: bool = True
+
+    @model_validator(mode="after")
+    def check_user(self):
+        if not self.user_id and not self.user_email:
+            raise ValueError("either user_id or user_email is required")
+        return self
+
+
+# a file with millions of bad rows should not turn into a report of the same size
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: list[dict] = []
+    errors_truncated: bool = False
+
+    def add_error(self, **error) -> None:
+        """Count a failed record; only the first ``MAX_REPORTED_ERRORS`` are kept in ``errors``."""
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+        else:
+            self.errors_truncated = True
@@ -0,0 +1,294 @@
+import codecs
+import csv
+import io
+import json
+from collections import deque
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterable
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.hashing import PasswordHasher, password_hasher
+from src.db.models import Bouquet, Subscription, User
+from .schemas import ImportReport, SubscriptionImportModel, UserImportModel
+
+USER_EXPORT_COLUMNS = ("id", "email", "username", "first_name", "last_name", "is_verified", "created_at", "updated_at")
+# bounds the lines buffered while looking for the end of a quoted field
+MAX_CSV_RECORD_CHARS = 1_000_000
+SUBSCRIPTION_EXPORT_COLUMNS = ("id", "user_id", "bouquet_id", "frequency", "next_delivery", "active", "started_at", "cancelled_at")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # incremental, so a multi-byte character split across two chunks still decodes
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+class _LineFeed:
+    """The line iterator a single ``csv.reader`` pulls from; ``iter_records`` pushes into it.
+
+    Running out raises ``StopIteration``, which ends the current ``for`` over the
+    reader but leaves the reader usable for the lines pushed next.
+    """
+
+    def __init__(self) -> None:
+        self.lines: deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def _iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | Exception]]:
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    record: list[str] = []
+    record_line = quotes = size = 0
+    line_no = 0
+
+    async for line in lines:
+        line_no += 1
+        if not record:
+            if not line.strip():
+                continue
+            record_line = line_no
+        record.append(line)
+        quotes += line.count('"')
+        size += len(line)
+        # an odd number of quote characters so far means a quoted field continues on the next line
+        if quotes % 2:
+            if size <= MAX_CSV_RECORD_CHARS:
+                continue
+            yield record_line, ValueError(f"unterminated quoted field longer than {MAX_CSV_RECORD_CHARS} characters")
+            record, quotes, size = [], 0, 0
+            continue
+
+        feed.lines.extend(line + "\n" for line in record)
+        record, quotes, size = [], 0, 0
+        try:
+            for values in reader:
+                if header is None:
+                    header = values
+                    continue
+                yield record_line, {key: value for key, value in zip(header, values) if value != ""}
+        except csv.Error as exc:
+            feed.lines.clear()
+            yield record_line, exc
+
+    if record:
+        yield record_line, ValueError("unterminated quoted field at end of input")
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, dict | Exception]]:
+    """Yield ``(line_number, record)``; unparsable records yield the exception instead.
+
+    CSV records may span several lines (quoted fields with newlines); the line
+    number is the one the record starts on.
+    """
+    if fmt == "csv":
+        async for item in _iter_csv_records(iter_lines(chunks)):
+            yield item
+        return
+
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except Exception as exc:
+            yield line_no, exc
+
+
+def _validate(model: type[BaseModel], line_no: int, record, report: ImportReport):
+    if isinstance(record, Exception):
+        report.add_error(line=line_no, error=f"could not parse: {record}")
+        return None
+    try:
+        return model.model_validate(record)
+    except ValidationError as exc:
+        report.add_error(line=line_no, error=exc.errors(include_url=False, include_context=False))
+        return None
+
+
+class BulkService:
+    """Chunked bulk import and streaming export for users and subscriptions.
+
+    Imports validate a chunk at a time, hash passwords on the hashing pool and
+    write each chunk with one multi-row INSERT in its own transaction. If the
+    database rejects the chunk, its rows are retried one at a time so only the
+    offending rows are reported.
+    """
+
+    def __init__(self, engine: AsyncEngine, chunk_size: int = 1000, hasher: PasswordHasher | None = None) -> None:
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.hasher = hasher or password_hasher
+
+    async def _chunks(self, records: AsyncIterator[tuple[int, dict | Exception]]):
+        chunk = []
+        async for item in records:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def _insert(self, table, rows: list[dict], lines: list[int], report: ImportReport) -> None:
+        if not rows:
+            return
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(insert(table), rows)
+            report.inserted += len(rows)
+            return
+        except IntegrityError:
+            pass
+
+        # one bad row (a concurrent insert, a dangling foreign key) must not sink the
+        # rest of the chunk: retry row by row and report only the rows that fail
+        for line_no, row in zip(lines, rows):
+            try:
+                async with self.engine.begin() as conn:
+                    await conn.execute(insert(table), [row])
+                report.inserted += 1
+            except IntegrityError as exc:
+                report.add_error(line=line_no, error=f"rejected by the database: {exc.orig}")
+
+    async def import_users(self, records: AsyncIterator[tuple[int, dict | Exception]]) -> ImportReport:
+        report = ImportReport()
+        async for chunk in self._chunks(records):
+            valid: list[tuple[int, UserImportModel]] = []
+            seen = set()
+            for line_no, record in chunk:
+                user = _validate(UserImportModel, line_no, record, report)
+                if user is None:
+                    continue
+                email = user.email.lower()
+                if email in seen:
+                    report.add_error(line=line_no, error=f"duplicate email {email} in input")
+                    continue
+                seen.add(email)
+                valid.append((line_no, user))
+
+            async with AsyncSession(self.engine) as session:
+                existing = set((await session.exec(select(User.email).where(User.email.in_(seen)))).scalars())
+            rows_to_insert = []
+            for line_no, user in valid:
+                if user.email.lower() in existing:
+                    report.add_error(line=line_no, error=f"user {user.email} already exists")
+                else:
+                    rows_to_insert.append((line_no, user))
+
+            plain = [user.password for _, user in rows_to_insert if not user.password_hash]
+            hashed = iter(await self.hasher.hash_many(plain))
+
+            now = datetime.now(timezone.utc)
+            rows = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "email": user.email.lower(),
+                    "username": user.username,
+                    "first_name": user.first_name,
+                    "last_name": user.last_name,
+                    "password_hash": user.password_hash or next(hashed),
+                    "is_verified": user.is_verified,
+                    "is_admin": False,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for _, user in rows_to_insert
+            ]
+            await self._insert(User.__table__, rows, [line for line, _ in rows_to_insert], report)
+
+        return report
+
+    async def import_subscriptions(self, records: AsyncIterator[tuple[int, dict | Exception]]) -> ImportReport:
+        report = ImportReport()
+        async for chunk in self._chunks(records):
+            valid = [
+                (line_no, sub) for line_no, record in chunk
+                if (sub := _validate(SubscriptionImportModel, line_no, record, report)) is not None
+            ]
+            emails = {sub.user_email.lower() for _, sub in valid if not sub.user_id}
+            bouquet_ids = {sub.bouquet_id for _, sub in valid}
+
+            async with AsyncSession(self.engine) as session:
+                user_ids = dict((await session.exec(
+                    select(User.email, User.id).where(User.email.in_(emails))
+                )).all()) if emails else {}
+                known_bouquets = set((await session.exec(
+                    select(Bouquet.id).where(Bouquet.id.in_(bouquet_ids))
+                )).scalars())
+
+            now = datetime.now(timezone.utc)
+            rows, lines = [], []
+            for line_no, sub in valid:
+                user_id = sub.user_id or user_ids.get(sub.user_email.lower())
+                if user_id is None:
+                    report.add_error(line=line_no, error=f"unknown user {sub.user_email}")
+                    continue
+                if sub.bouquet_id not in known_bouquets:
+                    report.add_error(line=line_no, error=f"unknown bouquet {sub.bouquet_id}")
+                    continue
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "bouquet_id": sub.bouquet_id,
+                    "frequency": sub.frequency,
+                    "next_delivery": sub.next_delivery,
+                    "active": sub.active,
+                    "started_at": now,
+                })
+                lines.append(line_no)
+            await self._insert(Subscription.__table__, rows, lines, report)
+
+        return report
+
+    async def export(self, model, columns: Iterable[str], fmt: str) -> AsyncIterator[str]:
+        """Stream rows of ``model`` as NDJSON or CSV through a server-side cursor."""
+        columns = list(columns)
+        statement = (
+            select(*(getattr(model, column) for column in columns))
+            .order_by(model.id)
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+        async with AsyncSession(self.engine) as session:
+            result = await session.stream(statement)
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                async for partition in result.partitions():
+                    writer.writerows(partition)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+            else:
+                async for partition in result.partitions():
+                    yield "".join(
+                        json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in partition
+                    )
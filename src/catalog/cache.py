@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable
+
+from pydantic import TypeAdapter
+
+from src.auth.schemas import BouquetModel
+from src.db.broadcast import broadcaster, Broadcaster
+
+CATALOG_CHANNEL = "catalog:invalidate"
+
+_bouquet_list = TypeAdapter(list[BouquetModel])
+
+
+class CachedBody:
+    __slots__ = ("body", "etag", "loaded_at")
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        # content only, so every worker (and a reload after an unrelated write) agrees on it
+        self.etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        self.loaded_at = time.monotonic()
+
+
+class CatalogCache:
+    """Pre-encoded JSON bodies for the bouquet catalog, keyed by a version counter.
+
+    Every write bumps the version (locally and, through pub/sub, on the other
+    workers) and drops the cached bodies; ``max_age`` bounds staleness if an
+    invalidation message is missed.
+    """
+
+    def __init__(self, max_age: float = 300.0, broadcaster: Broadcaster | None = None) -> None:
+        self.max_age = max_age
+        self.broadcaster = broadcaster
+        self.version = 0
+        self._available: CachedBody | None = None
+        self._bouquets: dict[str, CachedBody] = {}
+        self._lock = asyncio.Lock()
+
+        if broadcaster is not None:
+            broadcaster.subscribe(CATALOG_CHANNEL, self._on_message)
+
+    def _fresh(self, cached: CachedBody | None) -> bool:
+        return cached is not None and time.monotonic() - cached.loaded_at < self.max_age
+
+    async def available(self, load: Callable[[], Awaitable[list]]) -> CachedBody:
+        if self._fresh(self._available):
+            return self._available
+
+        async with self._lock:
+            if not self._fresh(self._available):
+                version = self.version
+                bouquets = await load()
+                body = _bouquet_list.dump_json(_bouquet_list.validate_python(bouquets, from_attributes=True))
+                cached = CachedBody(body)
+                if version == self.version:
+                    self._available = cached
+                return cached
+            return self._available
+
+    async def bouquet(self, bouquet_id: str, load: Callable[[], Awaitable[object]]) -> CachedBody | None:
+        cached = self._bouquets.get(bouquet_id)
+        if self._fresh(cached):
+            return cached
+
+        version = self.version
+        bouquet = await load()
+        if bouquet is None:
+            return None
+
+        cached = CachedBody(BouquetModel.model_validate(bouquet).model_dump_json().encode())
+        if version == self.version:
+            self._bouquets[bouquet_id] = cached
+        return cached
+
+    def discard(self) -> None:
+        self.version += 1
+        self._available = None
+        self._bouquets.clear()
+
+    async def invalidate(self) -> None:
+        self.discard()
+        if self.broadcaster is not None:
+            await self.broadcaster.publish(CATALOG_CHANNEL, {})
+
+    def _on_message(self, message: dict) -> None:
+        self.discard()
+
+
+catalog_cache = CatalogCache(broadcaster=broadcaster)
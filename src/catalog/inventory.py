@@ -0,0 +1,372 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Iterable
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import Config
+from src.db.main import engine
+from src.db.models import Bouquet
+from src.lazy import LazyObject
+from .cache import catalog_cache
+
+FIELDS = ("price", "is_available")
+# lost connections, deadlocks, lock timeouts: the database's fault, not the event's
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+def parse_event(value: bytes | None) -> dict | None:
+    """``{"bouquet_id": ..., "price": ..., "is_available": ...}`` with either field optional; None if malformed."""
+    try:
+        event = json.loads(value) if value else None
+    except ValueError:
+        return None
+    if not isinstance(event, dict) or not isinstance(event.get("bouquet_id"), str):
+        return None
+
+    parsed = {"bouquet_id": event["bouquet_id"]}
+    if "price" in event:
+        price = event["price"]
+        if isinstance(price, bool) or not isinstance(price, (int, float)) or price < 0:
+            return None
+        parsed["price"] = float(price)
+    if "is_available" in event:
+        if not isinstance(event["is_available"], bool):
+            return None
+        parsed["is_available"] = event["is_available"]
+    return parsed
+
+
+def latest_updates(events: Iterable[dict]) -> dict[str, dict]:
+    """Collapse a batch, in offset order, to one set of changes per bouquet.
+
+    Later events win field by field, so a price change followed by a stock
+    change in the same batch keeps both.
+    """
+    updates: dict[str, dict] = {}
+    for event in events:
+        changes = {field: event[field] for field in FIELDS if field in event}
+        if changes:
+            updates.setdefault(event["bouquet_id"], {}).update(changes)
+    return updates
+
+
+class InventoryConsumer:
+    """Applies bouquet price and availability events from the inventory topic.
+
+    Each poll takes up to ``batch_size`` messages, collapses them to the latest
+    change per bouquet and writes those with one executemany UPDATE per set of
+    changed columns, in a single transaction. Offsets are committed only after
+    that transaction, so a crash replays the batch; the updates set absolute
+    values, so replaying is harmless. If the database write fails, the
+    consumer seeks back to the start of the batch and tries again.
+
+    After ``max_attempts`` failed tries the batch is applied one bouquet at a
+    time, and the events behind any update the database rejects (bad data,
+    not a lost connection) are written unchanged to ``dead_letter_topic``,
+    with their source offset and the error in the headers, so the offsets can
+    be committed past them. Malformed events go there too. Nothing is
+    committed past an event until it is in the database or the dead-letter
+    topic; with no dead-letter topic configured such events are only logged.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        topic: str,
+        consumer_factory: Callable[[], object],
+        batch_size: int = 500,
+        poll_timeout: float = 1.0,
+        on_applied: Callable[[], Awaitable[None]] | None = None,
+        producer_factory: Callable[[], object] | None = None,
+        dead_letter_topic: str = "",
+        max_attempts: int = 5,
+    ) -> None:
+        self.engine = engine
+        self.topic = topic
+        self.consumer_factory = consumer_factory
+        self.batch_size = batch_size
+        self.poll_timeout = poll_timeout
+        self.on_applied = on_applied
+        self.producer_factory = producer_factory
+        self.dead_letter_topic = dead_letter_topic
+        self.max_attempts = max_attempts
+
+        self._consumer = None
+        self._producer = None
+        self._attempts = 0
+        self._task: asyncio.Task | None = None
+        self._running = False
+        self.lag: dict[str, int] = {}
+        self.batches = 0
+        self.applied = 0
+        self.invalid = 0
+        self.unknown_bouquets = 0
+        self.dead_lettered = 0
+
+    @property
+    def consumer(self):
+        if self._consumer is None:
+            self._consumer = self.consumer_factory()
+            self._consumer.subscribe([self.topic])
+        return self._consumer
+
+    @property
+    def producer(self):
+        if self._producer is None:
+            self._producer = self.producer_factory()
+        return self._producer
+
+    async def apply(self, updates: dict[str, dict]) -> int:
+        """Write the collapsed changes; returns how many bouquets matched."""
+        table = Bouquet.__table__
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        for bouquet_id, changes in updates.items():
+            params = {"b_id": bouquet_id, **{f"b_{field}": value for field, value in changes.items()}}
+            groups.setdefault(tuple(sorted(changes)), []).append(params)
+
+        matched = 0
+        async with self.engine.begin() as conn:
+            for fields, params in groups.items():
+                statement = (
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values({field: bindparam(f"b_{field}") for field in fields})
+                )
+                result = await conn.execute(statement, params)
+                matched += max(result.rowcount, 0)
+        return matched
+
+    async def apply_each(self, updates: dict[str, dict]) -> tuple[int, dict[str, Exception]]:
+        """Write each bouquet's changes in its own transaction; returns (matched, errors by bouquet).
+
+        Stops at the first transient error and raises it: the database is
+        unavailable, so nothing here is the events' fault.
+        """
+        matched = 0
+        errors = {}
+        for bouquet_id, changes in updates.items():
+            try:
+                matched += await self.apply({bouquet_id: changes})
+            except TRANSIENT_ERRORS:
+                raise
+            except Exception as exc:
+                errors[bouquet_id] = exc
+        return matched, errors
+
+    async def process_batch(self, messages: list) -> bool:
+        """Apply one polled batch and commit its offsets; False if it must be retried."""
+        from confluent_kafka import KafkaError
+
+        events = []
+        rejected = []
+        first_offsets: dict[tuple[str, int], int] = {}
+        last_offsets: dict[tuple[str, int], int] = {}
+        for message in messages:
+            error = message.error()
+            if error is not None:
+                if error.code() != KafkaError._PARTITION_EOF:
+                    logging.warning("Inventory consumer error: %s", error)
+                continue
+
+            partition = (message.topic(), message.partition())
+            first_offsets.setdefault(partition, message.offset())
+            last_offsets[partition] = message.offset()
+
+            event = parse_event(message.value())
+            if event is None:
+                self.invalid += 1
+                logging.warning("Malformed inventory event at %s[%d]@%d", *partition, message.offset())
+                rejected.append((message, "malformed event"))
+                continue
+            events.append((event, message))
+
+        updates = latest_updates(event for event, _ in events)
+        if updates:
+            try:
+                matched = await self.apply(updates)
+            except Exception:
+                self._attempts += 1
+                if self._attempts < self.max_attempts:
+                    logging.exception(
+                        "Could not apply inventory batch (attempt %d of %d), replaying it",
+                        self._attempts, self.max_attempts,
+                    )
+                    self._rewind(first_offsets)
+                    return False
+
+                logging.exception("Could not apply inventory batch after %d attempts, applying it bouquet by bouquet", self._attempts)
+                try:
+                    matched, errors = await self.apply_each(updates)
+                except Exception:
+                    logging.exception("Database unavailable, replaying the inventory batch")
+                    self._rewind(first_offsets)
+                    return False
+                for event, message in events:
+                    error = errors.get(event["bouquet_id"])
+                    if error is not None:
+                        rejected.append((message, f"{type(error).__name__}: {error}"))
+                updates = {bouquet_id: changes for bouquet_id, changes in updates.items() if bouquet_id not in errors}
+            self.applied += len(updates)
+            self.unknown_bouquets += len(updates) - matched
+
+        if rejected:
+            try:
+                await self.dead_letter(rejected)
+            except Exception:
+                # the applied updates are replayed too, which rewrites the same values
+                logging.exception("Could not write to the inventory dead-letter topic, replaying the batch")
+                self._rewind(first_offsets)
+                return False
+        self._attempts = 0
+
+        if last_offsets:
+            await self._commit(last_offsets)
+
+        self.batches += 1
+        if updates and self.on_applied is not None:
+            await self.on_applied()
+        return True
+
+    def _rewind(self, first_offsets: dict[tuple[str, int], int]) -> None:
+        from confluent_kafka import TopicPartition
+
+        for (topic, partition), offset in first_offsets.items():
+            self.consumer.seek(TopicPartition(topic, partition, offset))
+
+    async def _commit(self, last_offsets: dict[tuple[str, int], int]) -> None:
+        from confluent_kafka import TopicPartition
+
+        offsets = [TopicPartition(topic, partition, offset + 1) for (topic, partition), offset in last_offsets.items()]
+        try:
+            await asyncio.to_thread(self.consumer.commit, offsets=offsets, asynchronous=False)
+        except Exception:
+            # the batch is already in the database; a redelivery just rewrites the same values
+            logging.exception("Could not commit inventory offsets")
+
+    def _produce_dead_letters(self, rejected: list[tuple[object, str]]) -> None:
+        errors = []
+
+        def on_delivery(err, _msg):
+            if err is not None:
+                errors.append(err)
+
+        for message, reason in rejected:
+            self.producer.produce(
+                self.dead_letter_topic,
+                key=message.key(),
+                value=message.value(),
+                headers={
+                    "source": f"{message.topic()}:{message.partition()}@{message.offset()}",
+                    "error": reason[:500],
+                },
+                on_delivery=on_delivery,
+            )
+        if self.producer.flush(30) or errors:
+            raise RuntimeError(f"Dead-letter delivery failed: {errors[0] if errors else 'timed out'}")
+
+    async def dead_letter(self, rejected: list[tuple[object, str]]) -> None:
+        """Write the original messages to the dead-letter topic before their offsets are committed."""
+        if not self.dead_letter_topic:
+            for message, reason in rejected:
+                logging.error(
+                    "Dropping inventory event at %s[%d]@%d (%s): no dead-letter topic",
+                    message.topic(), message.partition(), message.offset(), reason,
+                )
+            return
+        await asyncio.to_thread(self._produce_dead_letters, rejected)
+        self.dead_lettered += len(rejected)
+
+    def update_lag(self) -> None:
+        consumer = self.consumer
+        lag = {}
+        for partition in consumer.assignment():
+            _, high = consumer.get_watermark_offsets(partition, cached=True)
+            position = consumer.position([partition])[0].offset
+            if high >= 0 and position >= 0:
+                lag[f"{partition.topic}:{partition.partition}"] = max(high - position, 0)
+        self.lag = lag
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Finish the batch in hand, then leave the consumer group."""
+        if self._task is not None:
+            # not cancelled: the poll runs in a thread and the consumer must not be closed under it
+            self._running = False
+            await self._task
+            self._task = None
+        if self._consumer is not None:
+            await asyncio.to_thread(self._consumer.close)
+            self._consumer = None
+        self._producer = None
+
+    async def _run(self) -> None:
+        failures = 0
+        while self._running:
+            try:
+                messages = await asyncio.to_thread(self.consumer.consume, self.batch_size, self.poll_timeout)
+                if messages and not await self.process_batch(messages):
+                    failures += 1
+                    await asyncio.sleep(min(2 ** failures, 10))
+                    continue
+                failures = 0
+                self.update_lag()
+            except Exception:
+                logging.exception("Inventory consumer loop failed")
+                await asyncio.sleep(1)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "applied": self.applied,
+            "invalid": self.invalid,
+            "unknown_bouquets": self.unknown_bouquets,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+def _create_kafka_consumer():
+    from confluent_kafka import Consumer
+
+    return Consumer({
+        "bootstrap.servers": Config.KAFKA_BOOTSTRAP_SERVERS,
+        "group.id": Config.INVENTORY_CONSUMER_GROUP,
+        "auto.offset.reset": "earliest",
+        # offsets are committed by hand once the batch is in the database
+        "enable.auto.commit": False,
+        "enable.auto.offset.store": False,
+    })
+
+
+def _create_dead_letter_producer():
+    from confluent_kafka import Producer
+
+    return Producer({
+        "bootstrap.servers": Config.KAFKA_BOOTSTRAP_SERVERS,
+        "enable.idempotence": True,
+        "acks": "all",
+    })
+
+
+def _create_inventory_consumer() -> InventoryConsumer:
+    return InventoryConsumer(
+        engine,
+        Config.INVENTORY_KAFKA_TOPIC,
+        _create_kafka_consumer,
+        batch_size=Config.INVENTORY_BATCH_SIZE,
+        poll_timeout=Config.INVENTORY_POLL_SECONDS,
+        on_applied=catalog_cache.invalidate,
+        producer_factory=_create_dead_letter_producer,
+        dead_letter_topic=Config.INVENTORY_DEAD_LETTER_TOPIC,
+        max_attempts=Config.INVENTORY_MAX_ATTEMPTS,
+    )
+
+
+inventory_consumer = LazyObject(_create_inventory_consumer)
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.dependecies import RoleChecker
+from src.auth.schemas import BouquetModel
+from src.db.main import get_session
+from .cache import CachedBody, catalog_cache
+from .schemas import BouquetCreateModel, BouquetUpdateModel
+from .services import BouquetService
+
+catalog_router = APIRouter()
+bouquet_service = BouquetService()
+admin_checker = RoleChecker(["admin"])
+
+
+def cached_response(request: Request, cached: CachedBody) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or cached.etag in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+@catalog_router.get("/bouquets", response_model=list[BouquetModel])
+async def list_bouquets(request: Request, session: AsyncSession = Depends(get_session)):
+    cached = await catalog_cache.available(
+        lambda: bouquet_service.get_available_bouquets(session)
+    )
+    return cached_response(request, cached)
+
+
+@catalog_router.get("/bouquets/{bouquet_id}", response_model=BouquetModel)
+async def get_bouquet(bouquet_id: str, request: Request, session: AsyncSession = Depends(get_session)):
+    cached = await catalog_cache.bouquet(
+        bouquet_id, lambda: bouquet_service.get_bouquet(bouquet_id, session)
+    )
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Bouquet not found")
+    return cached_response(request, cached)
+
+
+@catalog_router.post("/bouquets", response_model=BouquetModel, status_code=status.HTTP_201_CREATED)
+async def create_bouquet(
+    bouquet_data: BouquetCreateModel,
+    _: bool = Depends(admin_checker),
+    session: AsyncSession = Depends(get_session),
+):
+    return await bouquet_service.create_bouquet(bouquet_data, session)
+
+
+@catalog_router.patch("/bouquets/{bouquet_id}", response_model=BouquetModel)
+async def update_bouquet(
+    bouquet_id: str,
+    bouquet_data: BouquetUpdateModel,
+    _: bool = Depends(admin_checker),
+    session: AsyncSession = Depends(get_session),
+):
+    bouquet = await bouquet_service.get_bouquet(bouquet_id, session)
+    if bouquet is None:
+        raise HTTPException(status_code=404, detail="Bouquet not found")
+    return await bouquet_service.update_bouquet(
+        bouquet, bouquet_data.model_dump(exclude_unset=True), session
+    )
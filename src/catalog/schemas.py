@@ -0,0 +1,28 @@
+from pydantic import BaseModel, field_validator
+from typing import Optional
+
+
+class BouquetCreateModel(BaseModel):
+    name: str
+    description: str
+    price: float
+    subscription_fee: float = 0.0
+    image_url: Optional[str] = None
+    is_available: bool = True
+
+
+class BouquetUpdateModel(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    subscription_fee: Optional[float] = None
+    image_url: Optional[str] = None
+    is_available: Optional[bool] = None
+
+    @field_validator("name", "description", "price", "subscription_fee", "is_available")
+    @classmethod
+    def not_null(cls, value):
+        # these columns are NOT NULL: leave the field out to keep it, don't send null
+        if value is None:
+            raise ValueError("may be omitted but not set to null")
+        return value
@@ -0,0 +1,34 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Bouquet
+from .cache import catalog_cache
+from .schemas import BouquetCreateModel
+
+
+class BouquetService:
+    async def get_available_bouquets(self, session: AsyncSession) -> list[Bouquet]:
+        statement = select(Bouquet).where(Bouquet.is_available == True).order_by(Bouquet.name)
+        result = await session.exec(statement)
+        return list(result.all())
+
+    async def get_bouquet(self, bouquet_id: str, session: AsyncSession) -> Bouquet | None:
+        return await session.get(Bouquet, bouquet_id)
+
+    async def create_bouquet(self, bouquet_data: BouquetCreateModel, session: AsyncSession) -> Bouquet:
+        bouquet = Bouquet(**bouquet_data.model_dump())
+        session.add(bouquet)
+        await session.commit()
+        await session.refresh(bouquet)
+        await catalog_cache.invalidate()
+        return bouquet
+
+    async def update_bouquet(self, bouquet: Bouquet, bouquet_data: dict, session: AsyncSession) -> Bouquet:
+        for key, value in bouquet_data.items():
+            setattr(bouquet, key, value)
+
+        session.add(bouquet)
+        await session.commit()
+        await session.refresh(bouquet)
+        await catalog_cache.invalidate()
+        return bouquet
@@ -0,0 +1,43 @@
+"""Celery worker for the outbox's default transport.
+
+    celery -A src.celery worker
+
+Only the outbox relay and the worker import this module, so the web app's
+startup never pays for Celery or reads its broker settings.
+"""
+import asyncio
+import threading
+
+from celery import Celery
+from celery.signals import worker_process_shutdown
+
+from src.config import Config
+from src.mail import mail_dispatcher
+
+c_app = Celery("flower", broker=Config.CELERY_BROKER_URL, backend=Config.CELERY_RESULT_BACKEND)
+c_app.conf.broker_connection_retry_on_startup = True
+
+
+_mail_loop: asyncio.AbstractEventLoop | None = None
+_mail_loop_lock = threading.Lock()
+
+
+def _get_mail_loop() -> asyncio.AbstractEventLoop:
+    """One event loop per worker process, so the dispatcher's SMTP connections outlive a task."""
+    global _mail_loop
+    with _mail_loop_lock:
+        if _mail_loop is None:
+            _mail_loop = asyncio.new_event_loop()
+            threading.Thread(target=_mail_loop.run_forever, name="mail-dispatcher", daemon=True).start()
+        return _mail_loop
+
+
+@c_app.task()
+def send_email(recipients: list[str], subject: str, body: str) -> None:
+    asyncio.run_coroutine_threadsafe(mail_dispatcher.send(recipients, subject, body), _get_mail_loop()).result()
+
+
+@worker_process_shutdown.connect
+def _stop_mail_dispatcher(**_kwargs) -> None:
+    if _mail_loop is not None:
+        asyncio.run_coroutine_threadsafe(mail_dispatcher.stop(), _mail_loop).result()
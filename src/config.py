@@ -1,7 +1,13 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from src.lazy import LazyObject
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # JSON list, e.g. '["mysql+aiomysql://reader@replica-1/flower"]'
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_SECONDS: float = 5.0
     JWT_SECRET:str
     JWT_ALGORITHM:str
     REDIS_HOST: str
@@ -20,12 +26,96 @@ class Settings(BaseSettings):
     DOMAIN: str
     CELERY_RESULT_BACKEND: str
     CELERY_BROKER_URL: str
+    PASSWORD_HASH_EXECUTOR: str = "process"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
+    PASSWORD_HASH_BULK_BATCH_SIZE: int = 8
+    BCRYPT_ROUNDS: int = 12
+    HASH_COST_REFRESH_SECONDS: int = 600
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_MAX_TTL: int = 300
+    BLOCKLIST_FILTER_CAPACITY: int = 100000
+    BLOCKLIST_FILTER_ERROR_RATE: float = 0.001
+    BLOCKLIST_FILTER_MAX_BYTES: int = 1048576
+    BLOCKLIST_FILTER_SYNC_SECONDS: int = 300
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 60
+    USER_CACHE_BROADCAST: bool = False
+    DELIVERY_SCHEDULER_ENABLED: bool = False
+    DELIVERY_SCHEDULER_BATCH_SIZE: int = 1000
+    DELIVERY_SCHEDULER_LOOKAHEAD_SECONDS: int = 300
+    DELIVERY_SCHEDULER_POLL_SECONDS: int = 30
+    # run the relay in one dedicated process (python -m src.outbox), not in every web worker
+    OUTBOX_RELAY_ENABLED: bool = False
+    OUTBOX_TRANSPORT: str = "celery"
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_CLAIM_SECONDS: float = 120.0
+    KAFKA_BOOTSTRAP_SERVERS: str = "localhost:9092"
+    OUTBOX_KAFKA_TOPIC: str = "flower.outbox"
+    MAIL_POOL_SIZE: int = 4
+    MAIL_RATE_LIMIT: float = 0.0
+    MAIL_STOP_TIMEOUT_SECONDS: float = 30.0
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_SLOW_QUERY_MS: int = 200
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS: bool = False
+    # reverse proxies in front of the app that append to X-Forwarded-For; 0 ignores the header
+    RATE_LIMIT_TRUSTED_PROXIES: int = 0
+    LOGIN_IP_LIMIT_PER_MINUTE: int = 30
+    LOGIN_EMAIL_LIMIT_PER_MINUTE: int = 10
+    PASSWORD_RESET_IP_LIMIT_PER_MINUTE: int = 5
+    PASSWORD_RESET_EMAIL_LIMIT_PER_MINUTE: int = 2
+    AVATAR_BUCKET: str = ""
+    AWS_REGION: str = "us-east-1"
+    # point at MinIO/moto locally; unset means AWS
+    S3_ENDPOINT_URL: Optional[str] = None
+    # CDN or bucket URL the stored avatar URLs start with; defaults to the bucket's S3 URL
+    AVATAR_PUBLIC_BASE_URL: str = ""
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+    AVATAR_UPLOAD_EXPIRES_SECONDS: int = 300
+    AVATAR_THUMBNAIL_SIZES: list[int] = [64, 256]
+    # larger images are not thumbnailed; decoding is ~3-4 bytes per pixel
+    AVATAR_MAX_PIXELS: int = 25_000_000
+    AVATAR_THUMBNAIL_WORKERS: int = 2
+    MONGODB_URL: str = "mongodb://localhost:27017"
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_DATABASE: str = "flower"
+    AUDIT_COLLECTION: str = "audit_events"
+    AUDIT_BUFFER_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 1.0
+    # 0 keeps events forever; otherwise a TTL index expires them
+    AUDIT_RETENTION_DAYS: int = 0
+    AUDIT_SERVER_SELECTION_SECONDS: float = 2.0
+    AUDIT_STOP_TIMEOUT_SECONDS: float = 10.0
+    BILLING_CHUNK_SIZE: int = 1000
+    BILLING_WORKERS: int = 4
+    # bill deliveries due up to this far ahead of the run
+    BILLING_LOOKAHEAD_SECONDS: int = 86400
+    INVENTORY_CONSUMER_ENABLED: bool = False
+    INVENTORY_KAFKA_TOPIC: str = "inventory.bouquets"
+    INVENTORY_CONSUMER_GROUP: str = "flower-catalog"
+    INVENTORY_BATCH_SIZE: int = 500
+    INVENTORY_POLL_SECONDS: float = 1.0
+    # failed batch writes before bad events are moved to the dead-letter topic; empty topic only logs them
+    INVENTORY_MAX_ATTEMPTS: int = 5
+    INVENTORY_DEAD_LETTER_TOPIC: str = "inventory.bouquets.dead-letter"
 
     model_config = SettingsConfigDict(
         env_file=".env",
         extra="ignore"
     )
 
-Config = Settings()
+# .env is parsed on first attribute access (normally in the app's lifespan), not at import
+Config = LazyObject(Settings)
+
+
+def load_settings() -> Settings:
+    return Config._resolve()
+
 
 broker_connection_retry_on_startup = True
\ No newline at end of file
@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+from src.config import Config
+from src.db.broadcast import broadcaster, Broadcaster
+from src.lazy import LazyObject
+
+REVOKED_JTIS_KEY = "blocklist:revoked-jtis"
+REVOKED_JTIS_CHANNEL = "blocklist:revoked"
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float, max_bytes: int) -> None:
+        capacity = max(capacity, 1)
+        bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        bits = max(8, min(bits, max_bytes * 8))
+
+        self.bits = bytearray(math.ceil(bits / 8))
+        self.size = len(self.bits) * 8
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def estimated_error_rate(self) -> float:
+        return (1 - math.exp(-self.num_hashes * self.count / self.size)) ** self.num_hashes
+
+
+class RevokedTokenFilter:
+    """Per-worker Bloom filter of revoked jtis sitting in front of the Redis blocklist.
+
+    A jti the filter has never seen is definitely not revoked, so Redis is only
+    asked when the filter answers "maybe". Revocations reach other workers over
+    pub/sub, and a periodic resync rebuilds the filter (dropping expired jtis and
+    covering any messages missed while disconnected).
+
+    The filter is rebuilt from a sorted set of revoked jtis. Blocklist entries
+    written before that set existed are copied into it (``existing``) before
+    the first seed, and the filter does not answer on its own until that copy
+    has succeeded.
+    """
+
+    def __init__(
+        self,
+        broadcaster: Broadcaster,
+        lookup: Callable[[str], Awaitable[bool]],
+        store: Callable[[str, float], Awaitable[None]],
+        capacity: int,
+        error_rate: float,
+        max_bytes: int,
+        sync_interval: float,
+        existing: Callable[[], AsyncIterator[tuple[str, float]]] | None = None,
+    ) -> None:
+        self.broadcaster = broadcaster
+        self.client = broadcaster.client
+        self.lookup = lookup
+        self.store = store
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_bytes = max_bytes
+        self.sync_interval = sync_interval
+        self.existing = existing
+
+        self._filter = BloomFilter(capacity, error_rate, max_bytes)
+        self._pending: set[str] | None = None
+        self._listeners: list[Callable[[str], None]] = []
+        self._task: asyncio.Task | None = None
+        self._backfilled = existing is None
+        self.ready = False
+        self.redis_lookups = 0
+        self.filter_skips = 0
+
+        broadcaster.subscribe(REVOKED_JTIS_CHANNEL, self._on_message)
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        self._listeners.append(listener)
+
+    def _add(self, jti: str) -> None:
+        self._filter.add(jti)
+        if self._pending is not None:
+            self._pending.add(jti)
+        for listener in self._listeners:
+            listener(jti)
+
+    def _on_message(self, message: dict) -> None:
+        jti = message.get("jti")
+        if jti:
+            self._add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self.ready and jti not in self._filter:
+            self.filter_skips += 1
+            return False
+        self.redis_lookups += 1
+        return await self.lookup(jti)
+
+    async def revoke(self, jti: str, exp: float) -> None:
+        await self.store(jti, exp - time.time())
+        await self.client.zadd(REVOKED_JTIS_KEY, {jti: exp})
+        self._add(jti)
+        await self.broadcaster.publish(REVOKED_JTIS_CHANNEL, {"jti": jti})
+
+    async def backfill(self, batch_size: int = 1000) -> int:
+        """Copy every blocklist entry into the revoked jti set; re-adding a jti already there is harmless."""
+        copied = 0
+        batch: dict[str, float] = {}
+        async for jti, expires_at in self.existing():
+            batch[jti] = expires_at
+            if len(batch) >= batch_size:
+                copied += len(batch)
+                await self.client.zadd(REVOKED_JTIS_KEY, batch)
+                batch = {}
+        if batch:
+            copied += len(batch)
+            await self.client.zadd(REVOKED_JTIS_KEY, batch)
+        return copied
+
+    async def seed(self) -> None:
+        if not self._backfilled:
+            copied = await self.backfill()
+            self._backfilled = True
+            logging.info("Copied %d existing blocklist entries into the revoked token set", copied)
+
+        self._pending = set()
+        try:
+            now = time.time()
+            await self.client.zremrangebyscore(REVOKED_JTIS_KEY, "-inf", now)
+            jtis = await self.client.zrangebyscore(REVOKED_JTIS_KEY, now, "+inf")
+
+            fresh = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate, self.max_bytes)
+            for jti in jtis:
+                fresh.add(jti.decode() if isinstance(jti, bytes) else jti)
+            for jti in self._pending:
+                fresh.add(jti)
+        finally:
+            self._pending = None
+
+        self._filter = fresh
+        self.ready = True
+
+        if fresh.estimated_error_rate > self.error_rate:
+            logging.warning(
+                "Revoked token filter holds %d jtis in %d bytes, false positive rate %.4f exceeds target %.4f",
+                fresh.count, len(fresh.bits), fresh.estimated_error_rate, self.error_rate,
+            )
+
+    async def start(self) -> None:
+        try:
+            await self.seed()
+        except Exception:
+            logging.exception("Could not seed revoked token filter, falling back to Redis lookups")
+        self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.seed()
+            except Exception:
+                logging.exception("Revoked token filter resync failed")
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "entries": self._filter.count,
+            "bytes": len(self._filter.bits),
+            "estimated_error_rate": self._filter.estimated_error_rate,
+            "redis_lookups": self.redis_lookups,
+            "filter_skips": self.filter_skips,
+        }
+
+
+def _create_revoked_tokens() -> RevokedTokenFilter:
+    from src.db.redis import add_jti_to_blocklist, blocklisted_jtis, token_in_blocklist
+
+    return RevokedTokenFilter(
+        broadcaster,
+        lookup=token_in_blocklist,
+        store=add_jti_to_blocklist,
+        capacity=Config.BLOCKLIST_FILTER_CAPACITY,
+        error_rate=Config.BLOCKLIST_FILTER_ERROR_RATE,
+        max_bytes=Config.BLOCKLIST_FILTER_MAX_BYTES,
+        sync_interval=Config.BLOCKLIST_FILTER_SYNC_SECONDS,
+        existing=blocklisted_jtis,
+    )
+
+
+revoked_tokens = LazyObject(_create_revoked_tokens)
@@ -0,0 +1,96 @@
+import asyncio
+import inspect
+import json
+import logging
+from typing import Any, Callable
+
+from src.config import Config
+from src.lazy import LazyObject
+
+
+def _create_redis_client():
+    import redis.asyncio as aioredis
+
+    return aioredis.Redis(host=Config.REDIS_HOST, port=Config.REDIS_PORT, db=0)
+
+
+redis_client = LazyObject(_create_redis_client)
+
+
+class Broadcaster:
+    """Fans JSON messages out to every worker over Redis pub/sub."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self._handlers: dict[str, list[Callable[[dict], Any]]] = {}
+        self._task: asyncio.Task | None = None
+        self._pubsub = None
+        # late SUBSCRIBE calls, referenced so they are not garbage collected mid-flight
+        self._subscribing: set[asyncio.Task] = set()
+
+    def subscribe(self, channel: str, handler: Callable[[dict], Any]) -> None:
+        is_new = channel not in self._handlers
+        self._handlers.setdefault(channel, []).append(handler)
+        # handlers registered by lazily built objects may arrive after start()
+        if is_new and self._pubsub is not None:
+            task = asyncio.ensure_future(self._pubsub.subscribe(channel))
+            self._subscribing.add(task)
+            task.add_done_callback(self._subscribing.discard)
+
+    async def publish(self, channel: str, message: dict) -> None:
+        try:
+            await self.client.publish(channel, json.dumps(message))
+        except Exception:
+            logging.exception("Could not publish to channel %s", channel)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            if not self._handlers:
+                await asyncio.sleep(1)
+                continue
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(*self._handlers)
+                self._pubsub = pubsub
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    await self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Broadcast listener failed, reconnecting")
+                await asyncio.sleep(1)
+            finally:
+                self._pubsub = None
+                await pubsub.aclose()
+
+    async def _dispatch(self, message: dict) -> None:
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        payload = json.loads(message["data"])
+
+        for handler in self._handlers.get(channel, ()):
+            try:
+                result = handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logging.exception("Broadcast handler for %s failed", channel)
+
+
+broadcaster = Broadcaster(redis_client)
@@ -0,0 +1,95 @@
+"""Run EXPLAIN on the service's hot queries and fail when one of them scans a whole table.
+
+Usage: ``python -m src.db.explain`` against a database with representative data
+(the optimizer may legitimately prefer a scan on empty tables).
+"""
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import or_, and_
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import select
+
+from src.billing.services import due_subscriptions
+from src.db.main import engine
+from src.db.models import Bouquet, Subscription, User, OutboxMessage
+
+_NOW = datetime.now(timezone.utc).replace(tzinfo=None)
+_ID = "00000000-0000-0000-0000-000000000000"
+
+KNOWN_QUERIES = {
+    "user_by_email": select(User).where(User.email == "someone@example.com"),
+    "users_page": (
+        select(User)
+        .where(or_(User.created_at > _NOW, and_(User.created_at == _NOW, User.id > _ID)))
+        .order_by(User.created_at, User.id)
+        .limit(100)
+    ),
+    "due_subscriptions": (
+        select(Subscription.id, Subscription.frequency, Subscription.next_delivery, Subscription.started_at)
+        .where(Subscription.active == True, Subscription.next_delivery <= _NOW)
+        .order_by(Subscription.next_delivery, Subscription.id)
+        .limit(1000)
+    ),
+    "user_active_subscriptions": select(Subscription).where(
+        Subscription.user_id == _ID, Subscription.active == True
+    ),
+    "billing_due_subscriptions": due_subscriptions(_NOW),
+    "bouquet_subscriptions": select(Subscription).where(Subscription.bouquet_id == _ID),
+    "available_bouquets": select(Bouquet).where(Bouquet.is_available == True),
+    "pending_outbox": (
+        select(OutboxMessage)
+        .where(
+            OutboxMessage.sent_at == None,
+            OutboxMessage.dead_lettered_at == None,
+            OutboxMessage.available_at <= _NOW,
+        )
+        .order_by(OutboxMessage.id)
+        .limit(100)
+    ),
+}
+
+
+async def _explain(conn: AsyncConnection, statement) -> list[dict]:
+    compiled = statement.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    result = await conn.exec_driver_sql(prefix + str(compiled), params)
+    return [dict(row._mapping) for row in result]
+
+
+def full_scans(dialect: str, plan: list[dict]) -> list[str]:
+    if dialect == "sqlite":
+        return [
+            row["detail"] for row in plan
+            if row["detail"].startswith("SCAN") and "INDEX" not in row["detail"]
+        ]
+    return [row["table"] for row in plan if row.get("type") == "ALL"]
+
+
+async def check() -> dict[str, list[str]]:
+    failures = {}
+    async with engine.connect() as conn:
+        for name, statement in KNOWN_QUERIES.items():
+            scans = full_scans(conn.dialect.name, await _explain(conn, statement))
+            if scans:
+                failures[name] = scans
+    return failures
+
+
+async def main() -> int:
+    failures = await check()
+    await engine.dispose()
+
+    for name in KNOWN_QUERIES:
+        status = "FULL SCAN " + ", ".join(failures[name]) if name in failures else "ok"
+        print(f"{name:<28} {status}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,19 +1,48 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
-from sqlmodel import SQLModel
 from src.config import Config
-from src.db.models import User, Frequency, Bouquet, Subscription
+from src.lazy import LazyObject
+from src.db.profiler import QueryProfiler
+from src.db.replicas import ReplicaRouter
+from src.db.migrations import migrate
+from src.db.models import User, Frequency, Bouquet, Subscription, OutboxMessage, Invoice
 
-engine = create_async_engine(
-    Config.DATABASE_URL,
-    echo=False,
-    future=True
-)
+def _create_query_profiler() -> QueryProfiler:
+    return QueryProfiler(
+        slow_query_threshold=Config.SQL_SLOW_QUERY_MS / 1000,
+        n_plus_one_threshold=Config.SQL_N_PLUS_ONE_THRESHOLD,
+    )
+
+
+query_profiler = LazyObject(_create_query_profiler)
+
+
+def _create_engine(url: str):
+    engine = create_async_engine(
+        url,
+        echo=False,
+        future=True
+    )
+    if Config.SQL_PROFILER_ENABLED:
+        query_profiler.install(engine)
+    return engine
+
+
+def _create_db_router() -> ReplicaRouter:
+    return ReplicaRouter(
+        engine._resolve(),
+        [_create_engine(url) for url in Config.DATABASE_REPLICA_URLS],
+        max_lag=Config.REPLICA_MAX_LAG_SECONDS,
+    )
+
+
+engine = LazyObject(lambda: _create_engine(Config.DATABASE_URL))
+db_router = LazyObject(_create_db_router)
 
 async def get_session():
-    async with AsyncSession(engine) as session:
+    """Request session: reads go to a replica until the request first writes."""
+    async with db_router.session() as session:
         yield session
 
 async def initdb():
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
\ No newline at end of file
+    await migrate(engine)
\ No newline at end of file
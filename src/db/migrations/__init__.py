@@ -0,0 +1,90 @@
+import importlib
+import logging
+import pkgutil
+from datetime import datetime, timezone
+from types import ModuleType
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "flower_schema_migrations"
+LOCK_TIMEOUT = 60
+
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def discover() -> list[ModuleType]:
+    """Return migration modules (``vNNNN_*.py`` in this package) ordered by version."""
+    names = sorted(
+        info.name for info in pkgutil.iter_modules(__path__)
+        if info.name.startswith("v")
+    )
+    return [importlib.import_module(f"{__name__}.{name}") for name in names]
+
+
+def _applied_versions(conn: Connection) -> set[str]:
+    migration_metadata.create_all(conn)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def _apply(conn: Connection, migration: ModuleType) -> None:
+    migration.upgrade(conn)
+    conn.execute(
+        schema_migrations.insert().values(
+            version=migration.__name__.rsplit(".", 1)[-1],
+            applied_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+async def pending(engine: AsyncEngine) -> list[str]:
+    async with engine.begin() as conn:
+        applied = await conn.run_sync(_applied_versions)
+    return [
+        m.__name__.rsplit(".", 1)[-1] for m in discover()
+        if m.__name__.rsplit(".", 1)[-1] not in applied
+    ]
+
+
+async def migrate(engine: AsyncEngine) -> list[str]:
+    """Apply every pending migration in order; safe to call from several workers at once."""
+    applied_now = []
+    async with engine.connect() as conn:
+        is_mysql = conn.dialect.name == "mysql"
+        if is_mysql:
+            # 1 once acquired, 0 if another worker still holds it after the timeout, NULL on error
+            acquired = (await conn.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}
+            )).scalar()
+            await conn.commit()
+            if acquired != 1:
+                raise RuntimeError(
+                    f"Could not take the migration lock {LOCK_NAME!r} within {LOCK_TIMEOUT}s; "
+                    "another worker may still be migrating"
+                )
+        try:
+            applied = await conn.run_sync(_applied_versions)
+            await conn.commit()
+
+            for migration in discover():
+                version = migration.__name__.rsplit(".", 1)[-1]
+                if version in applied:
+                    continue
+                logger.info("Applying migration %s", version)
+                await conn.run_sync(_apply, migration)
+                await conn.commit()
+                applied_now.append(version)
+        finally:
+            if is_mysql:
+                await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+                await conn.commit()
+    return applied_now
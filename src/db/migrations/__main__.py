@@ -0,0 +1,19 @@
+import asyncio
+import sys
+
+from src.db.main import engine
+from src.db.migrations import migrate, pending
+
+
+async def main(command: str) -> None:
+    if command == "status":
+        versions = await pending(engine)
+        print("\n".join(versions) if versions else "Database is up to date")
+    else:
+        applied = await migrate(engine)
+        print(f"Applied {len(applied)} migration(s)" + (": " + ", ".join(applied) if applied else ""))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "upgrade"))
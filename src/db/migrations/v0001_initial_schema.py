@@ -0,0 +1,96 @@
+"""Create the tables as they stood before versioned migrations.
+
+This is a frozen copy of the schema the old run-time ``create_all`` produced,
+deliberately not derived from ``src.db.models``: later columns and indexes
+belong to the migrations that add them, so a fresh database and an upgraded
+one go through the same steps. Databases created by ``create_all`` already
+have these tables and skip them.
+"""
+from sqlalchemy import (
+    BOOLEAN,
+    CHAR,
+    DATETIME,
+    FLOAT,
+    INTEGER,
+    TEXT,
+    VARCHAR,
+    Column,
+    Enum,
+    ForeignKey,
+    MetaData,
+    Table,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table(
+    "users",
+    metadata,
+    Column("id", CHAR(36), primary_key=True, unique=True),
+    Column("username", VARCHAR(50), nullable=False),
+    Column("email", VARCHAR(100), nullable=False, unique=True, index=True),
+    Column("first_name", VARCHAR(50)),
+    Column("last_name", VARCHAR(50)),
+    Column("is_admin", BOOLEAN, nullable=False),
+    Column("is_verified", BOOLEAN),
+    Column("password_hash", VARCHAR(255), nullable=False),
+    Column("created_at", DATETIME, nullable=False),
+    Column("updated_at", DATETIME, nullable=False),
+)
+
+Table(
+    "user_profiles",
+    metadata,
+    Column("id", CHAR(36), primary_key=True),
+    Column("user_id", VARCHAR(255), ForeignKey("users.id"), nullable=False, unique=True, index=True),
+    Column("avatar_url", VARCHAR(255)),
+    Column("bio", VARCHAR(500)),
+    Column("phone_number", VARCHAR(20)),
+    Column("created_at", DATETIME, nullable=False),
+    Column("updated_at", DATETIME, nullable=False),
+)
+
+Table(
+    "bouquets",
+    metadata,
+    Column("id", CHAR(36), primary_key=True),
+    Column("name", VARCHAR(255), nullable=False),
+    Column("description", VARCHAR(255), nullable=False),
+    Column("price", FLOAT, nullable=False),
+    Column("subscription_fee", FLOAT, nullable=False),
+    Column("image_url", VARCHAR(255)),
+    Column("is_available", BOOLEAN, nullable=False),
+    Column("created_at", DATETIME, nullable=False),
+)
+
+Table(
+    "subscriptions",
+    metadata,
+    Column("id", CHAR(36), primary_key=True),
+    Column("user_id", VARCHAR(255), ForeignKey("users.id"), nullable=False),
+    Column("bouquet_id", VARCHAR(255), ForeignKey("bouquets.id"), nullable=False),
+    # the enum member names, which is what SQLModel stores
+    Column("frequency", Enum("daily", "weekly", "bi_weekly", "monthly", name="frequency"), nullable=False),
+    Column("next_delivery", DATETIME, nullable=False),
+    Column("active", BOOLEAN, nullable=False),
+    Column("started_at", DATETIME, nullable=False),
+    Column("cancelled_at", DATETIME),
+)
+
+Table(
+    "outbox_messages",
+    metadata,
+    Column("id", INTEGER, primary_key=True, autoincrement=True),
+    Column("topic", VARCHAR(100), nullable=False),
+    Column("payload", TEXT, nullable=False),
+    Column("attempts", INTEGER, nullable=False),
+    Column("last_error", VARCHAR(500)),
+    Column("available_at", DATETIME, nullable=False),
+    Column("sent_at", DATETIME),
+    Column("created_at", DATETIME, nullable=False),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,29 @@
+"""Indexes for the due-delivery, per-user subscription, catalog and user paging queries."""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+INDEXES = {
+    "subscriptions": {
+        "ix_subscriptions_active_next_delivery": "active, next_delivery, id",
+        "ix_subscriptions_user_id_active": "user_id, active",
+        "ix_subscriptions_bouquet_id": "bouquet_id",
+    },
+    "bouquets": {
+        "ix_bouquets_is_available": "is_available",
+    },
+    "users": {
+        "ix_users_created_at_id": "created_at, id",
+    },
+    "outbox_messages": {
+        "ix_outbox_messages_pending": "sent_at, available_at, id",
+    },
+}
+
+
+def upgrade(conn: Connection) -> None:
+    inspector = inspect(conn)
+    for table, indexes in INDEXES.items():
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        for name, columns in indexes.items():
+            if name not in existing:
+                conn.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
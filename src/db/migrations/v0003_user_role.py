@@ -0,0 +1,9 @@
+"""Add the ``role`` column read by RoleChecker."""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("users")}
+    if "role" not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN role VARCHAR(20) NOT NULL DEFAULT 'user'"))
@@ -0,0 +1,9 @@
+"""Add ``user_profiles.avatar_thumbnails`` for the avatar upload flow."""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("user_profiles")}
+    if "avatar_thumbnails" not in columns:
+        conn.execute(text("ALTER TABLE user_profiles ADD COLUMN avatar_thumbnails JSON NULL"))
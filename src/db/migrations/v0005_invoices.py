@@ -0,0 +1,45 @@
+"""Create the ``invoices`` table written by the billing run.
+
+A frozen copy of the table as first released, like v0001; later changes to
+``Invoice`` belong to the migrations that make them.
+"""
+from sqlalchemy import (
+    CHAR,
+    DATETIME,
+    FLOAT,
+    VARCHAR,
+    Column,
+    ForeignKey,
+    Index,
+    MetaData,
+    Table,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+# only what the foreign keys below need to resolve; these tables are never created here
+for referenced in ("users", "bouquets", "subscriptions"):
+    Table(referenced, metadata, Column("id", CHAR(36), primary_key=True))
+
+invoices = Table(
+    "invoices",
+    metadata,
+    Column("id", CHAR(36), primary_key=True),
+    Column("idempotency_key", VARCHAR(100), nullable=False, unique=True),
+    Column("subscription_id", VARCHAR(255), ForeignKey("subscriptions.id"), nullable=False, index=True),
+    Column("user_id", VARCHAR(255), ForeignKey("users.id"), nullable=False),
+    Column("bouquet_id", VARCHAR(255), ForeignKey("bouquets.id"), nullable=False),
+    Column("period_start", DATETIME, nullable=False),
+    Column("price", FLOAT, nullable=False),
+    Column("subscription_fee", FLOAT, nullable=False),
+    Column("amount", FLOAT, nullable=False),
+    Column("status", VARCHAR(20), nullable=False, server_default="pending"),
+    Column("billing_run_id", CHAR(36), nullable=False),
+    Column("created_at", DATETIME, nullable=False),
+    Index("ix_invoices_user_id_period_start", "user_id", "period_start"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    invoices.create(conn, checkfirst=True)
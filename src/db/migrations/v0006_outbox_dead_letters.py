@@ -0,0 +1,9 @@
+"""Add ``outbox_messages.dead_lettered_at`` for messages the relay has given up on."""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("outbox_messages")}
+    if "dead_lettered_at" not in columns:
+        conn.execute(text("ALTER TABLE outbox_messages ADD COLUMN dead_lettered_at DATETIME NULL"))
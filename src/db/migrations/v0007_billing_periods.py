@@ -0,0 +1,43 @@
+"""Exact invoice amounts, and ``subscriptions.next_billing_at`` for billing every period.
+
+Invoice money columns become ``NUMERIC(10, 2)``. SQLite cannot change a
+column's type, but it stores whatever it is given and ``Numeric`` reads the
+values back as ``Decimal``, so only MySQL is altered.
+
+``next_billing_at`` is the start of the first period not invoiced yet. It is
+backfilled from the latest invoiced period (billed again as a no-op thanks
+to its idempotency key, then advanced), or from ``next_delivery`` for
+subscriptions that were never billed.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.types import Float
+
+MONEY_COLUMNS = ("price", "subscription_fee", "amount")
+
+
+def upgrade(conn: Connection) -> None:
+    inspector = inspect(conn)
+    mysql = conn.dialect.name == "mysql"
+
+    invoice_columns = {column["name"]: column for column in inspector.get_columns("invoices")}
+    if mysql and any(isinstance(invoice_columns[name]["type"], Float) for name in MONEY_COLUMNS):
+        modify = ", ".join(f"MODIFY {name} NUMERIC(10, 2) NOT NULL" for name in MONEY_COLUMNS)
+        conn.execute(text(f"ALTER TABLE invoices {modify}"))
+
+    subscription_columns = {column["name"] for column in inspector.get_columns("subscriptions")}
+    if "next_billing_at" not in subscription_columns:
+        conn.execute(text("ALTER TABLE subscriptions ADD COLUMN next_billing_at DATETIME NULL"))
+        conn.execute(text(
+            "UPDATE subscriptions SET next_billing_at = COALESCE("
+            "(SELECT MAX(period_start) FROM invoices WHERE invoices.subscription_id = subscriptions.id), "
+            "next_delivery)"
+        ))
+        if mysql:
+            conn.execute(text("ALTER TABLE subscriptions MODIFY next_billing_at DATETIME NOT NULL"))
+
+    indexes = {index["name"] for index in inspector.get_indexes("subscriptions")}
+    if "ix_subscriptions_active_next_billing_at" not in indexes:
+        conn.execute(text(
+            "CREATE INDEX ix_subscriptions_active_next_billing_at ON subscriptions (active, next_billing_at, id)"
+        ))
@@ -4,12 +4,16 @@ from sqlalchemy import String
 from enum import Enum as pyEnum 
 import uuid
 from datetime import datetime, timezone
+from decimal import Decimal
 import sqlalchemy.dialects.mysql as mysql
-from sqlalchemy import func, ForeignKey
+from sqlalchemy import func, DateTime, ForeignKey, Index
 
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id: str = Field(
         sa_column=Column(
@@ -25,6 +29,7 @@ class User(SQLModel, table=True):
     first_name: Optional[str] = Field(sa_column=Column(mysql.VARCHAR(50), nullable=True))
     last_name: Optional[str] = Field(sa_column=Column(mysql.VARCHAR(50), nullable=True))
     is_admin: bool = False
+    role: str = Field(sa_column=Column(mysql.VARCHAR(20), nullable=False, default="user", server_default="user"))
     is_verified: bool = Field(sa_column=Column(mysql.BOOLEAN, default=False))
     password_hash: str = Field(sa_column=Column(mysql.VARCHAR(255), nullable=False))
     created_at: datetime = Field(sa_column=Column(mysql.DATETIME, nullable=False, default=datetime.now(timezone.utc)))
@@ -54,6 +59,11 @@ class UserProfile(SQLModel, table=True):
     avatar_url: Optional[str] = Field(
         sa_column=Column(mysql.VARCHAR(255), nullable=True)
     )
+    # thumbnail width in pixels -> URL, filled in once the thumbnails are generated
+    avatar_thumbnails: Optional[dict] = Field(
+        default=None,
+        sa_column=Column(mysql.JSON, nullable=True)
+    )
     bio: Optional[str] = Field(
         sa_column=Column(mysql.VARCHAR(500), nullable=True)
     )
@@ -75,6 +85,9 @@ class Frequency(str, pyEnum):
 
 class Bouquet(SQLModel, table=True):
     __tablename__ = "bouquets"
+    __table_args__ = (
+        Index("ix_bouquets_is_available", "is_available"),
+    )
 
     id: str = Field(
         sa_column=Column(
@@ -99,6 +112,12 @@ class Bouquet(SQLModel, table=True):
 
 class Subscription(SQLModel, table=True):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        Index("ix_subscriptions_active_next_delivery", "active", "next_delivery", "id"),
+        Index("ix_subscriptions_user_id_active", "user_id", "active"),
+        Index("ix_subscriptions_bouquet_id", "bouquet_id"),
+        Index("ix_subscriptions_active_next_billing_at", "active", "next_billing_at", "id"),
+    )
 
     id: str = Field(
         sa_column=Column(
@@ -113,6 +132,15 @@ class Subscription(SQLModel, table=True):
 
     frequency: Frequency
     next_delivery: datetime
+    # start of the first period not invoiced yet; the billing run advances it, starting from the first delivery
+    next_billing_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(
+            DateTime,
+            nullable=False,
+            default=lambda context: context.get_current_parameters()["next_delivery"],
+        ),
+    )
 
     active: bool = Field(default=True)
     started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -122,3 +150,53 @@ class Subscription(SQLModel, table=True):
     bouquet: Bouquet = Relationship(back_populates="subscriptions")
 
 
+
+class OutboxMessage(SQLModel, table=True):
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        Index("ix_outbox_messages_pending", "sent_at", "available_at", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    topic: str = Field(sa_column=Column(mysql.VARCHAR(100), nullable=False))
+    payload: str = Field(sa_column=Column(mysql.TEXT, nullable=False))
+    attempts: int = 0
+    last_error: Optional[str] = Field(sa_column=Column(mysql.VARCHAR(500), nullable=True))
+    available_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    sent_at: Optional[datetime] = None
+    # set once the relay gives up on the message; it is kept for inspection and never retried
+    dead_lettered_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+
+class Invoice(SQLModel, table=True):
+    """One billed delivery period of a subscription.
+
+    ``idempotency_key`` is ``<subscription id>:<period start>``, so billing the
+    same period twice (a retried chunk, a resumed run) is rejected by the
+    unique index instead of charging again.
+    """
+    __tablename__ = "invoices"
+    __table_args__ = (
+        Index("ix_invoices_user_id_period_start", "user_id", "period_start"),
+    )
+
+    id: str = Field(
+        sa_column=Column(
+            mysql.CHAR(36),
+            primary_key=True,
+            default=lambda: str(uuid.uuid4())
+        )
+    )
+    idempotency_key: str = Field(sa_column=Column(mysql.VARCHAR(100), nullable=False, unique=True))
+    subscription_id: str = Field(foreign_key="subscriptions.id", index=True)
+    user_id: str = Field(foreign_key="users.id")
+    bouquet_id: str = Field(foreign_key="bouquets.id")
+    period_start: datetime
+    price: Decimal = Field(max_digits=10, decimal_places=2)
+    subscription_fee: Decimal = Field(max_digits=10, decimal_places=2)
+    amount: Decimal = Field(max_digits=10, decimal_places=2)
+    status: str = Field(sa_column=Column(mysql.VARCHAR(20), nullable=False, default="pending", server_default="pending"))
+    billing_run_id: str = Field(sa_column=Column(mysql.CHAR(36), nullable=False))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,144 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger("sql.profiler")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\([^)]*\)s|%s|\?|:\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so calls that differ only by literals or bind values compare equal."""
+    normalized = _STRING.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+
+    def add(self, duration: float, rows: int) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        if rows > 0:
+            self.rows += rows
+
+
+@dataclass
+class RequestProfile:
+    label: str
+    statements: dict[str, StatementStats] = field(default_factory=dict)
+    query_count: int = 0
+    total_time: float = 0.0
+
+    def record(self, fp: str, duration: float, rows: int) -> None:
+        self.statements.setdefault(fp, StatementStats()).add(duration, rows)
+        self.query_count += 1
+        self.total_time += duration
+
+    def repeated(self, threshold: int) -> dict[str, StatementStats]:
+        return {
+            fp: stats for fp, stats in self.statements.items()
+            if stats.count >= threshold and fp.lower().startswith("select")
+        }
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("sql_profile", default=None)
+
+
+class QueryProfiler:
+    """Times every statement on an engine and attributes it to the current request.
+
+    Statements are grouped by fingerprint both per request and process-wide.
+    When one SELECT fingerprint runs ``n_plus_one_threshold`` times or more in a
+    single request, the request is flagged as a likely N+1.
+    """
+
+    def __init__(self, slow_query_threshold: float = 0.2, n_plus_one_threshold: int = 5) -> None:
+        self.slow_query_threshold = slow_query_threshold
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.statements: dict[str, StatementStats] = {}
+        self.slow_queries = 0
+        self.flagged_requests: dict[str, int] = {}
+
+    def install(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+        self.record(statement, duration, getattr(cursor, "rowcount", -1))
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        fp = fingerprint(statement)
+        self.statements.setdefault(fp, StatementStats()).add(duration, rows)
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(fp, duration, rows)
+
+        if duration >= self.slow_query_threshold:
+            self.slow_queries += 1
+            logger.warning(
+                "Slow query (%.1f ms, %d rows) in %s: %s",
+                duration * 1000, rows, profile.label if profile else "<no request>", fp,
+            )
+
+    def begin(self, label: str):
+        return _current_profile.set(RequestProfile(label))
+
+    def end(self, token, label: str | None = None) -> RequestProfile | None:
+        profile = _current_profile.get()
+        _current_profile.reset(token)
+        if profile is None:
+            return None
+        if label is not None:
+            profile.label = label
+
+        repeated = profile.repeated(self.n_plus_one_threshold)
+        if repeated:
+            self.flagged_requests[profile.label] = self.flagged_requests.get(profile.label, 0) + 1
+            for fp, stats in repeated.items():
+                logger.warning(
+                    "Possible N+1 in %s: statement ran %d times (%.1f ms total): %s",
+                    profile.label, stats.count, stats.total_time * 1000, fp,
+                )
+        return profile
+
+    def summary(self, limit: int = 20) -> dict:
+        top = sorted(self.statements.items(), key=lambda item: item[1].total_time, reverse=True)
+        return {
+            "slow_queries": self.slow_queries,
+            "n_plus_one_requests": self.flagged_requests,
+            "statements": [
+                {
+                    "fingerprint": fp,
+                    "count": stats.count,
+                    "total_ms": stats.total_time * 1000,
+                    "mean_ms": stats.total_time * 1000 / stats.count,
+                    "max_ms": stats.max_time * 1000,
+                    "rows": stats.rows,
+                }
+                for fp, stats in top[:limit]
+            ],
+        }
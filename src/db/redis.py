@@ -0,0 +1,27 @@
+import time
+from typing import AsyncIterator
+
+from src.db.broadcast import redis_client
+
+JTI_KEY_PREFIX = "blocklist:jti:"
+# refresh tokens live 7 days, so a revocation must outlast that by default
+JTI_EXPIRY = 7 * 24 * 3600
+
+
+async def add_jti_to_blocklist(jti: str, expiry: float = JTI_EXPIRY) -> None:
+    await redis_client.set(name=JTI_KEY_PREFIX + jti, value="", ex=max(int(expiry), 1))
+
+
+async def token_in_blocklist(jti: str) -> bool:
+    return await redis_client.get(JTI_KEY_PREFIX + jti) is not None
+
+
+async def blocklisted_jtis() -> AsyncIterator[tuple[str, float]]:
+    """Yield ``(jti, expires_at)`` for every blocklist entry still in Redis."""
+    now = time.time()
+    async for key in redis_client.scan_iter(match=JTI_KEY_PREFIX + "*", count=1000):
+        ttl = await redis_client.ttl(key)
+        if ttl == -2:
+            continue
+        key = key.decode() if isinstance(key, bytes) else key
+        yield key[len(JTI_KEY_PREFIX):], now + (ttl if ttl >= 0 else JTI_EXPIRY)
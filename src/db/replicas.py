@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+PRIMARY_READ = "primary_read"
+
+_Statement = TypeVar("_Statement", bound=Select)
+
+
+def from_primary(statement: _Statement) -> _Statement:
+    """Mark a SELECT to be read from the primary, e.g. when its result will be cached."""
+    return statement.execution_options(**{PRIMARY_READ: True})
+
+
+async def replica_lag(engine: AsyncEngine) -> float | None:
+    """Seconds the replica is behind its source; None when replication is broken.
+
+    Only MySQL reports lag. Other backends (the SQLite files used as stand-ins)
+    are treated as always caught up.
+    """
+    if engine.dialect.name != "mysql":
+        return 0.0
+
+    async with engine.connect() as conn:
+        try:
+            result = await conn.exec_driver_sql("SHOW REPLICA STATUS")
+            column = "Seconds_Behind_Source"
+        except Exception:
+            # MySQL before 8.0.22
+            result = await conn.exec_driver_sql("SHOW SLAVE STATUS")
+            column = "Seconds_Behind_Master"
+        row = result.mappings().first()
+
+    if row is None:
+        # not configured as a replica, so there is nothing to lag behind
+        return 0.0
+    lag = row.get(column)
+    return float(lag) if lag is not None else None
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica until the unit of work writes.
+
+    Flushes, DML, text() statements and SELECT ... FOR UPDATE go to the primary,
+    and from then on so does everything else in the session, so a request reads
+    its own writes even when the replicas lag. The writing user (``info["user_id"]``,
+    set by ``get_current_user``) stays on the primary for ``max_lag`` seconds
+    afterwards so their next requests do too. Statements marked with
+    ``from_primary`` always read from the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        router: "ReplicaRouter" = self.info["router"]
+        if not self.info.get("primary") and self._is_replica_safe(clause):
+            if clause.get_execution_options().get(PRIMARY_READ) or router.is_pinned(self.info.get("user_id")):
+                return router.primary.sync_engine
+            return router.choose_replica().sync_engine
+
+        self.info["primary"] = True
+        router.pin(self.info.get("user_id"))
+        return router.primary.sync_engine
+
+    def _is_replica_safe(self, clause) -> bool:
+        return (
+            not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        )
+
+
+class ReplicaRouter:
+    """Primary engine plus read replicas, balanced round-robin and skipped while lagging.
+
+    ``run()`` probes each replica's lag periodically; a replica that is more
+    than ``max_lag`` seconds behind (or cannot be probed) gets no reads until a
+    later probe finds it caught up. With no healthy replica, reads fall back to
+    the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        max_lag: float = 5.0,
+        probe: Callable[[AsyncEngine], Awaitable[float | None]] = replica_lag,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.probe = probe
+        self.lag: list[float | None] = [0.0] * len(replicas)
+        self._healthy = list(replicas)
+        self._next = 0
+        self.replica_reads = 0
+        self.fallback_reads = 0
+        self._pinned: dict[str, float] = {}
+
+    def session(self) -> AsyncSession:
+        if not self.replicas:
+            return AsyncSession(self.primary)
+        return AsyncSession(self.primary, sync_session_class=RoutingSession, info={"router": self})
+
+    def choose_replica(self) -> AsyncEngine:
+        healthy = self._healthy
+        if not healthy:
+            self.fallback_reads += 1
+            return self.primary
+        engine = healthy[self._next % len(healthy)]
+        self._next += 1
+        self.replica_reads += 1
+        return engine
+
+    def pin(self, user_id: str | None) -> None:
+        """Read ``user_id``'s requests from the primary until the replicas have caught up with their write."""
+        if user_id is None or not self.replicas:
+            return
+        now = time.monotonic()
+        if len(self._pinned) >= 10_000:
+            self._pinned = {key: until for key, until in self._pinned.items() if until > now}
+        self._pinned[user_id] = now + self.max_lag
+
+    def is_pinned(self, user_id: str | None) -> bool:
+        until = self._pinned.get(user_id) if user_id is not None else None
+        return until is not None and until > time.monotonic()
+
+    async def check(self) -> None:
+        results = await asyncio.gather(
+            *(self.probe(replica) for replica in self.replicas),
+            return_exceptions=True,
+        )
+        healthy = []
+        for index, (replica, lag) in enumerate(zip(self.replicas, results)):
+            if isinstance(lag, BaseException):
+                logging.warning("Could not probe replica %d: %s", index, lag)
+                lag = None
+            self.lag[index] = lag
+            if lag is not None and lag <= self.max_lag:
+                healthy.append(replica)
+            elif replica in self._healthy:
+                logging.warning("Replica %d is %s behind, routing its reads elsewhere", index,
+                                f"{lag:.1f}s" if lag is not None else "unknown")
+        self._healthy = healthy
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Replica lag check failed")
+            await asyncio.sleep(interval)
+
+    def lag_by_replica(self) -> dict[str, float]:
+        return {str(index): lag if lag is not None else -1.0 for index, lag in enumerate(self.lag)}
+
+    def stats(self) -> dict:
+        return {
+            "replicas": len(self.replicas),
+            "healthy": len(self._healthy),
+            "replica_reads": self.replica_reads,
+            "fallback_reads": self.fallback_reads,
+            "pinned_users": len(self._pinned),
+        }
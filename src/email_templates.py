@@ -0,0 +1,56 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+from src.config import Config
+from src.lazy import LazyObject
+
+if TYPE_CHECKING:
+    from jinja2 import Template
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+
+class TemplateRegistry:
+    """Email templates compiled once and rendered with per-recipient variables.
+
+    Jinja compiles each template to Python code in which the static markup is a
+    constant, so rendering only does the per-recipient substitutions.
+    """
+
+    def __init__(self, directory: Path, globals: dict | None = None) -> None:
+        from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(["html"]),
+            auto_reload=False,
+        )
+        self.env.globals.update(globals or {})
+        self._templates: dict[str, "Template"] = {}
+
+    def load_all(self) -> None:
+        for name in self.env.list_templates():
+            self._templates[name] = self.env.get_template(name)
+
+    def get(self, name: str) -> "Template":
+        template = self._templates.get(name)
+        if template is None:
+            template = self._templates[name] = self.env.get_template(name)
+        return template
+
+    def render(self, name: str, **context) -> str:
+        return self.get(name).render(context)
+
+    def render_many(self, name: str, contexts: Iterable[dict]) -> list[str]:
+        render = self.get(name).render
+        return [render(context) for context in contexts]
+
+
+def _create_email_templates() -> TemplateRegistry:
+    return TemplateRegistry(
+        TEMPLATE_DIR,
+        globals={"app_name": Config.APP_NAME, "domain": Config.DOMAIN},
+    )
+
+
+email_templates = LazyObject(_create_email_templates)
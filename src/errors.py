@@ -0,0 +1,64 @@
+from typing import Any, Callable
+
+from fastapi import FastAPI, status
+from fastapi.requests import Request
+from fastapi.responses import JSONResponse
+
+
+class FlowerException(Exception):
+    """Base class for errors the API turns into a JSON response."""
+
+
+class InvalidToken(FlowerException):
+    """The token is malformed, expired or revoked."""
+
+
+class AccessTokenRequired(FlowerException):
+    """A refresh token was sent where an access token is expected."""
+
+
+class RefreshTokenRequired(FlowerException):
+    """An access token was sent where a refresh token is expected."""
+
+
+class UserAlreadyExists(FlowerException):
+    """Signing up with an email that already has an account."""
+
+
+class InsufficientPermission(FlowerException):
+    """The user's role does not allow this action."""
+
+
+class UserNotFound(FlowerException):
+    """No user matches the request."""
+
+
+class AccountNotVerified(FlowerException):
+    """The account's email address has not been verified yet."""
+
+
+def create_exception_handler(
+    status_code: int, detail: str, error_code: str
+) -> Callable[[Request, Exception], Any]:
+
+    async def exception_handler(request: Request, exc: FlowerException) -> JSONResponse:
+        return JSONResponse(
+            status_code=status_code,
+            content={"detail": str(exc) or detail, "error_code": error_code},
+        )
+
+    return exception_handler
+
+
+def register_all_errors(app: FastAPI) -> None:
+    errors = [
+        (InvalidToken, status.HTTP_401_UNAUTHORIZED, "Token is invalid or expired", "invalid_token"),
+        (AccessTokenRequired, status.HTTP_401_UNAUTHORIZED, "Please provide a valid access token", "access_token_required"),
+        (RefreshTokenRequired, status.HTTP_403_FORBIDDEN, "Please provide a valid refresh token", "refresh_token_required"),
+        (UserAlreadyExists, status.HTTP_403_FORBIDDEN, "User with email already exists", "user_exists"),
+        (InsufficientPermission, status.HTTP_401_UNAUTHORIZED, "You do not have enough permissions to perform this action", "insufficient_permissions"),
+        (UserNotFound, status.HTTP_404_NOT_FOUND, "User not found", "user_not_found"),
+        (AccountNotVerified, status.HTTP_403_FORBIDDEN, "Account not verified", "account_not_verified"),
+    ]
+    for exc_class, status_code, detail, error_code in errors:
+        app.add_exception_handler(exc_class, create_exception_handler(status_code, detail, error_code))
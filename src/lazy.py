@@ -0,0 +1,33 @@
+from typing import Any, Callable
+
+
+class LazyObject:
+    """Stand-in for a module-level singleton that is only built on first use.
+
+    Attribute access is forwarded to the object returned by ``factory``, so
+    callers keep using the module attribute as if it were the real object while
+    importing the module stays cheap and does not read configuration.
+    """
+
+    __slots__ = ("_factory", "_instance")
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+
+    def _resolve(self) -> Any:
+        instance = object.__getattribute__(self, "_instance")
+        if instance is None:
+            instance = object.__getattribute__(self, "_factory")()
+            object.__setattr__(self, "_instance", instance)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __repr__(self) -> str:
+        instance = object.__getattribute__(self, "_instance")
+        return f"<lazy {instance!r}>" if instance is not None else "<lazy (unresolved)>"
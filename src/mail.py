@@ -1,33 +1,297 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
-from fastapi_mail import FastMail, ConnectionConfig, MessageSchema, MessageType
+from typing import TYPE_CHECKING
+
 from src.config import Config
+from src.lazy import LazyObject
+
+if TYPE_CHECKING:
+    import aiosmtplib
+    from fastapi_mail import MessageSchema
 
 BASE_DIR = Path(__file__).resolve().parent
 
-mail_config = ConnectionConfig(
-    MAIL_USERNAME=Config.MAIL_USERNAME,
-    MAIL_PASSWORD=Config.MAIL_PASSWORD,  
-    MAIL_FROM=Config.MAIL_FROM,
-    MAIL_PORT=587,
-    MAIL_SERVER="smtp.gmail.com",
-    MAIL_STARTTLS=True,      
-    MAIL_SSL_TLS=False,      
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,     
-)
 
-mail = FastMail(mail_config)
+def _create_mail_config():
+    from fastapi_mail import ConnectionConfig
+
+    return ConnectionConfig(
+        MAIL_USERNAME=Config.MAIL_USERNAME,
+        MAIL_PASSWORD=Config.MAIL_PASSWORD,
+        MAIL_FROM=Config.MAIL_FROM,
+        MAIL_PORT=587,
+        MAIL_SERVER="smtp.gmail.com",
+        MAIL_STARTTLS=True,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=True,
+        VALIDATE_CERTS=True,
+    )
+
+
+def _create_mail():
+    from fastapi_mail import FastMail
+
+    return FastMail(mail_config._resolve())
+
+
+mail_config = LazyObject(_create_mail_config)
+mail = LazyObject(_create_mail)
 
 
 def create_message(
     recipients: list[str],
     subject: str,
     body: str,
-    subtype: MessageType = MessageType.html,
-) -> MessageSchema:
+    subtype: str = "html",
+) -> "MessageSchema":
+    from fastapi_mail import MessageSchema
+
     return MessageSchema(
         subject=subject,
         recipients=recipients,
         body=body,
         subtype=subtype,
     )
+
+
+class _RateLimiter:
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class MailDispatcher:
+    """Sends queued emails over a pool of long-lived, authenticated SMTP connections.
+
+    Each worker owns one connection and takes messages from the shared queue
+    one at a time, so a slow send never holds back messages another worker
+    could take, and the STARTTLS handshake and login are paid once per
+    connection instead of once per message. Sends are capped by the pool size and a global rate limit,
+    and a dropped connection is re-established on the next attempt.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str,
+        password: str,
+        sender: str,
+        start_tls: bool = True,
+        use_tls: bool = False,
+        validate_certs: bool = True,
+        pool_size: int = 4,
+        rate_limit: float = 0.0,
+        max_retries: int = 3,
+        queue_size: int = 10_000,
+        stop_timeout: float = 30.0,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.start_tls = start_tls
+        self.use_tls = use_tls
+        self.validate_certs = validate_certs
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.queue_size = queue_size
+        self.stop_timeout = stop_timeout
+        self._limiter = _RateLimiter(rate_limit, burst=pool_size)
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._started_at: float | None = None
+        self._latencies: deque[float] = deque(maxlen=1000)
+        self.sent = 0
+        self.failed = 0
+        self.reconnects = 0
+
+    def build_message(
+        self,
+        recipients: list[str],
+        subject: str,
+        body: str,
+        subtype: str = "html",
+    ) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = ", ".join(recipients)
+        message["Subject"] = subject
+        message.set_content(body, subtype=getattr(subtype, "value", subtype))
+        return message
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._started_at = time.monotonic()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.pool_size)]
+
+    async def stop(self) -> None:
+        """Give queued messages up to ``stop_timeout`` seconds to go out, then fail the rest."""
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), self.stop_timeout)
+            except asyncio.TimeoutError:
+                logging.warning(
+                    "Mail dispatcher stopped with %d message(s) still queued", self._queue.qsize()
+                )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        while self._queue is not None and not self._queue.empty():
+            _message, future = self._queue.get_nowait()
+            self._queue.task_done()
+            if not future.done():
+                future.set_exception(RuntimeError("Mail dispatcher stopped before the message was sent"))
+
+    async def send(
+        self,
+        recipients: list[str],
+        subject: str,
+        body: str,
+        subtype: str = "html",
+    ) -> None:
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((self.build_message(recipients, subject, body, subtype), future))
+        await future
+
+    async def send_many(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        """Queue a batch of messages and wait for all of them; returns one error (or None) per message."""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for message in messages:
+            future = loop.create_future()
+            await self._queue.put((message, future))
+            futures.append(future)
+
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [result if isinstance(result, Exception) else None for result in results]
+
+    async def _connect(self) -> "aiosmtplib.SMTP":
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            validate_certs=self.validate_certs,
+            username=self.username or None,
+            password=self.password or None,
+        )
+        await smtp.connect()
+        return smtp
+
+    async def _deliver(self, smtp: "aiosmtplib.SMTP | None", message: EmailMessage) -> "aiosmtplib.SMTP":
+        import aiosmtplib
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                if smtp is None or not smtp.is_connected:
+                    smtp = await self._connect()
+                    self.reconnects += 1
+                await smtp.send_message(message)
+                return smtp
+            except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, OSError):
+                smtp = None
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+        return smtp
+
+    async def _worker(self) -> None:
+        smtp = None
+        future = None
+        try:
+            while True:
+                message, future = await self._queue.get()
+                started = time.monotonic()
+                try:
+                    await self._limiter.acquire()
+                    smtp = await self._deliver(smtp, message)
+                    self.sent += 1
+                    self._latencies.append(time.monotonic() - started)
+                    if not future.done():
+                        future.set_result(None)
+                except Exception as exc:
+                    self.failed += 1
+                    logging.exception("Failed to send email to %s", message["To"])
+                    if not future.done():
+                        future.set_exception(exc)
+                finally:
+                    self._queue.task_done()
+        finally:
+            if future is not None and not future.done():
+                future.set_exception(RuntimeError("Mail dispatcher stopped before the message was sent"))
+            if smtp is not None and smtp.is_connected:
+                try:
+                    await smtp.quit()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float | None:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "reconnects": self.reconnects,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "throughput_per_second": self.sent / elapsed if elapsed else 0.0,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_p99": percentile(0.99),
+        }
+
+
+def _create_mail_dispatcher() -> MailDispatcher:
+    return MailDispatcher(
+        hostname=Config.MAIL_SERVER,
+        port=Config.MAIL_PORT,
+        username=Config.MAIL_USERNAME if Config.USE_CREDENTIALS else "",
+        password=Config.MAIL_PASSWORD if Config.USE_CREDENTIALS else "",
+        sender=formataddr((Config.MAIL_FROM_NAME, Config.MAIL_FROM)),
+        start_tls=Config.MAIL_STARTTLS,
+        use_tls=Config.MAIL_SSL_TLS,
+        validate_certs=Config.VALIDATE_CERTS,
+        pool_size=Config.MAIL_POOL_SIZE,
+        rate_limit=Config.MAIL_RATE_LIMIT,
+        stop_timeout=Config.MAIL_STOP_TIMEOUT_SECONDS,
+    )
+
+
+mail_dispatcher = LazyObject(_create_mail_dispatcher)
@@ -0,0 +1,122 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """Request and auth-stage metrics rendered in the Prometheus text format.
+
+    Everything is updated from the event loop thread only, so plain counters
+    and dicts are safe without locks.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.stages: dict[str, Histogram] = {}
+        self.in_flight = 0
+        self._gauges: list[tuple[str, str, Callable[[], float | dict], str]] = []
+
+    def observe_request(self, method: str, route: str, status_code: int, duration: float) -> None:
+        key = (method, route, status_code)
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram(self.buckets)
+        histogram.observe(duration)
+
+    def observe_stage(self, stage: str, duration: float) -> None:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram(self.buckets)
+        histogram.observe(duration)
+
+    @contextmanager
+    def time_stage(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start)
+
+    def register_gauge(self, name: str, help: str, collect: Callable[[], float | dict], label: str = "key") -> None:
+        """Register a gauge read at scrape time; ``collect`` returns a value or a {label: value} dict."""
+        self._gauges.append((name, help, collect, label))
+
+    def _render_histogram(self, lines: list[str], name: str, histogram: Histogram, **labels) -> None:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Requests handled, by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status_code), count in self.requests.items():
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status_code)} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency, by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in self.latency.items():
+            self._render_histogram(lines, "http_request_duration_seconds", histogram, method=method, route=route)
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP auth_stage_duration_seconds Time spent in each auth dependency stage.",
+            "# TYPE auth_stage_duration_seconds histogram",
+        ]
+        for stage, histogram in self.stages.items():
+            self._render_histogram(lines, "auth_stage_duration_seconds", histogram, stage=stage)
+
+        for name, help, collect, label_name in self._gauges:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+            value = collect()
+            if isinstance(value, dict):
+                for label, item in value.items():
+                    lines.append(f"{name}{_labels(**{label_name: label})} {float(item)}")
+            else:
+                lines.append(f"{name} {float(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
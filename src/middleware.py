@@ -1,29 +1,75 @@
 import time
 import logging
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from src.errors import AccountNotVerified
+from src.metrics import metrics
+from src.config import Config
+from src.db.main import query_profiler
 
 logger = logging.getLogger("uvicorn.access")
 logger.disabled = True
 
 
-def register_middleware(app: FastAPI) -> None:
+class RequestMetricsMiddleware:
+    """Times every request and records it per route in ``metrics``.
+
+    A plain ASGI middleware rather than ``@app.middleware("http")``: that
+    decorator runs each request in its own task group with memory streams
+    between the layers, which costs far more than the timing itself.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        metrics.in_flight += 1
+        profile_token = None
+        if Config.SQL_PROFILER_ENABLED:
+            profile_token = query_profiler.begin(scope["method"])
+        status_code = 500
+        response_started = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+            await send(message)
 
-    @app.middleware("http")
-    async def custom_logging(request: Request, call_next):
-        start_time = time.time()
         try:
-            response = await call_next(request)
-        except AccountNotVerified:
-            return JSONResponse(status_code=403, content={"detail": "Account not verified"})
-        except Exception as exc:
-            
-            return JSONResponse(status_code=500, content={"detail": str(exc)})
-        
-        process_time = time.time() - start_time
-        return response
+            try:
+                await self.app(scope, receive, send_with_status)
+            except AccountNotVerified:
+                if response_started:
+                    raise
+                response = JSONResponse(status_code=403, content={"detail": "Account not verified"})
+                await response(scope, receive, send_with_status)
+            except Exception as exc:
+                if response_started:
+                    raise
+                response = JSONResponse(status_code=500, content={"detail": str(exc)})
+                await response(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            process_time = time.perf_counter() - start_time
+            route = scope.get("route")
+            route_path = route.path if route is not None else "<unmatched>"
+            metrics.observe_request(scope["method"], route_path, status_code, process_time)
+            if profile_token is not None:
+                query_profiler.end(profile_token, f"{scope['method']} {route_path}")
+
+
+def register_middleware(app: FastAPI) -> None:
+
+    app.add_middleware(RequestMetricsMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
@@ -31,4 +77,4 @@ def register_middleware(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.config import Config
+from src.lazy import LazyObject
+from src.db.main import engine
+from src.db.models import OutboxMessage
+
+EMAIL_TOPIC = "email"
+
+
+def enqueue_email(session: AsyncSession, recipients: list[str], subject: str, body: str) -> OutboxMessage:
+    """Stage an email in the outbox; it is sent once the session commits."""
+    message = OutboxMessage(
+        topic=EMAIL_TOPIC,
+        payload=json.dumps({"recipients": recipients, "subject": subject, "body": body}),
+    )
+    session.add(message)
+    return message
+
+
+class CeleryTransport:
+
+    def _send(self, messages: list[OutboxMessage]) -> dict[int, Exception]:
+        from src.celery import send_email
+
+        failures = {}
+        for message in messages:
+            try:
+                payload = json.loads(message.payload)
+                if message.topic != EMAIL_TOPIC:
+                    raise ValueError(f"No Celery task for outbox topic {message.topic!r}")
+                send_email.apply_async(
+                    args=[payload["recipients"], payload["subject"], payload["body"]]
+                )
+            except Exception as exc:
+                failures[message.id] = exc
+        return failures
+
+    async def send_batch(self, messages: list[OutboxMessage]) -> dict[int, Exception]:
+        return await asyncio.to_thread(self._send, messages)
+
+
+class KafkaTransport:
+
+    def __init__(self, bootstrap_servers: str, topic: str) -> None:
+        from confluent_kafka import Producer
+
+        self.topic = topic
+        self.producer = Producer({
+            "bootstrap.servers": bootstrap_servers,
+            "enable.idempotence": True,
+            "acks": "all",
+        })
+
+    def _send(self, messages: list[OutboxMessage]) -> dict[int, Exception]:
+        failures = {}
+
+        def on_delivery(message_id: int):
+            def callback(err, _msg):
+                if err is not None:
+                    failures[message_id] = RuntimeError(str(err))
+            return callback
+
+        for message in messages:
+            try:
+                self.producer.produce(
+                    self.topic,
+                    key=str(message.id),
+                    value=message.payload,
+                    headers={"topic": message.topic},
+                    on_delivery=on_delivery(message.id),
+                )
+            except Exception as exc:
+                failures[message.id] = exc
+
+        remaining = self.producer.flush(30)
+        if remaining:
+            for message in messages:
+                failures.setdefault(message.id, TimeoutError("Kafka delivery timed out"))
+        return failures
+
+    async def send_batch(self, messages: list[OutboxMessage]) -> dict[int, Exception]:
+        return await asyncio.to_thread(self._send, messages)
+
+
+class SmtpTransport:
+
+    async def send_batch(self, messages: list[OutboxMessage]) -> dict[int, Exception]:
+        from src.mail import mail_dispatcher
+
+        failures = {}
+        pending, emails = [], []
+        for message in messages:
+            try:
+                if message.topic != EMAIL_TOPIC:
+                    raise ValueError(f"Cannot send outbox topic {message.topic!r} over SMTP")
+                payload = json.loads(message.payload)
+                emails.append(mail_dispatcher.build_message(
+                    payload["recipients"], payload["subject"], payload["body"]
+                ))
+                pending.append(message)
+            except Exception as exc:
+                failures[message.id] = exc
+
+        errors = await mail_dispatcher.send_many(emails)
+        for message, error in zip(pending, errors):
+            if error is not None:
+                failures[message.id] = error
+        return failures
+
+
+class OutboxRelay:
+    """Drains committed outbox rows to the broker in batches.
+
+    A batch is claimed with ``FOR UPDATE SKIP LOCKED`` in a short transaction
+    that pushes ``available_at`` out by ``claim_timeout`` and commits, so no
+    row locks are held while the transport sends. Rows are deleted once the
+    transport has accepted them (at-least-once: a worker that dies mid-send
+    leaves its claim to expire and the batch is sent again). Failed rows are
+    retried with exponential backoff, and after ``max_attempts`` they are
+    dead-lettered: kept with their last error but never picked up again.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        transport,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        base_backoff: float = 2.0,
+        max_backoff: float = 600.0,
+        max_attempts: int = 10,
+        claim_timeout: float = 120.0,
+    ) -> None:
+        self.engine = engine
+        self.transport = transport
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self.dead_lettered = 0
+
+    def _backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.base_backoff * 2 ** (attempts - 1), self.max_backoff))
+
+    async def _claim(self, now: datetime) -> list[OutboxMessage]:
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            statement = (
+                select(OutboxMessage)
+                .where(
+                    OutboxMessage.sent_at == None,
+                    OutboxMessage.dead_lettered_at == None,
+                    OutboxMessage.available_at <= now,
+                )
+                .order_by(OutboxMessage.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            messages = list((await session.exec(statement)).all())
+            if messages:
+                await session.exec(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_([message.id for message in messages]))
+                    .values(available_at=now + timedelta(seconds=self.claim_timeout))
+                )
+                await session.commit()
+            return messages
+
+    async def _settle(self, messages: list[OutboxMessage], failures: dict[int, Exception]) -> None:
+        now = datetime.now(timezone.utc)
+        async with AsyncSession(self.engine) as session:
+            sent = [message.id for message in messages if message.id not in failures]
+            if sent:
+                await session.exec(delete(OutboxMessage).where(OutboxMessage.id.in_(sent)))
+
+            for message in messages:
+                error = failures.get(message.id)
+                if error is None:
+                    continue
+                attempts = message.attempts + 1
+                values = {"attempts": attempts, "last_error": str(error)[:500]}
+                if attempts >= self.max_attempts:
+                    values["dead_lettered_at"] = now
+                    self.dead_lettered += 1
+                    logging.error("Outbox message %s dead-lettered after %d attempts: %s", message.id, attempts, error)
+                else:
+                    values["available_at"] = now + self._backoff(attempts)
+                    logging.warning("Outbox message %s failed (attempt %d): %s", message.id, attempts, error)
+                await session.exec(update(OutboxMessage).where(OutboxMessage.id == message.id).values(**values))
+
+            await session.commit()
+
+    async def drain_once(self) -> int:
+        messages = await self._claim(datetime.now(timezone.utc))
+        if not messages:
+            return 0
+
+        failures = await self.transport.send_batch(messages)
+        await self._settle(messages, failures)
+        return len(messages) - len(failures)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                sent = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Outbox relay batch failed")
+                sent = 0
+
+            if sent < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+def create_transport():
+    if Config.OUTBOX_TRANSPORT == "kafka":
+        return KafkaTransport(Config.KAFKA_BOOTSTRAP_SERVERS, Config.OUTBOX_KAFKA_TOPIC)
+    if Config.OUTBOX_TRANSPORT == "smtp":
+        return SmtpTransport()
+    return CeleryTransport()
+
+
+def _create_outbox_relay() -> OutboxRelay:
+    return OutboxRelay(
+        engine,
+        create_transport(),
+        batch_size=Config.OUTBOX_BATCH_SIZE,
+        poll_interval=Config.OUTBOX_POLL_SECONDS,
+        max_attempts=Config.OUTBOX_MAX_ATTEMPTS,
+        claim_timeout=Config.OUTBOX_CLAIM_SECONDS,
+    )
+
+
+outbox_relay = LazyObject(_create_outbox_relay)
+
+
+async def _run_relay() -> None:
+    try:
+        await outbox_relay.run()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_relay())
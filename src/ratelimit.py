@@ -0,0 +1,152 @@
+import logging
+import time
+import uuid
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, status
+
+from src.config import Config
+from src.lazy import LazyObject
+
+
+class TokenBucket:
+    """In-process token buckets, one per key, with LRU eviction of idle keys."""
+
+    def __init__(self, limit: int, period: float, max_keys: int = 100_000) -> None:
+        self.capacity = float(limit)
+        self.rate = limit / period
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def hit(self, key: str) -> float:
+        """Take a token for ``key``; returns 0 when allowed, else seconds until one is available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.capacity, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+
+class RedisSlidingWindow:
+    """Sliding-window log in a Redis sorted set, shared by every worker."""
+
+    def __init__(self, client, limit: int, period: float, prefix: str) -> None:
+        self.client = client
+        self.limit = limit
+        self.period = period
+        self.prefix = prefix
+
+    async def hit(self, key: str) -> float:
+        now = time.time()
+        name = f"{self.prefix}:{key}"
+        member = uuid.uuid4().hex
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(name, 0, now - self.period)
+            pipe.zadd(name, {member: now})
+            pipe.zcard(name)
+            pipe.zrange(name, 0, 0, withscores=True)
+            pipe.expire(name, int(self.period) + 1)
+            _, _, count, oldest, _ = await pipe.execute()
+
+        if count <= self.limit:
+            return 0.0
+        # a rejected attempt must not count, or a client retrying too early is locked out indefinitely
+        await self.client.zrem(name, member)
+        return max(oldest[0][1] + self.period - now, 0.0) if oldest else self.period
+
+
+class RateLimiter:
+    """Per-IP and per-email limits for one route, checked before any database or hashing work."""
+
+    def __init__(self, name: str, ip_limit: int, email_limit: int, period: float = 60.0) -> None:
+        self.name = name
+        self.local = {
+            "ip": TokenBucket(ip_limit, period),
+            "email": TokenBucket(email_limit, period),
+        }
+        self.shared = {}
+        if Config.RATE_LIMIT_REDIS:
+            from src.db.broadcast import redis_client
+
+            self.shared = {
+                "ip": RedisSlidingWindow(redis_client, ip_limit, period, f"ratelimit:{name}:ip"),
+                "email": RedisSlidingWindow(redis_client, email_limit, period, f"ratelimit:{name}:email"),
+            }
+        self.rejected = 0
+
+    @staticmethod
+    def client_ip(request: Request) -> str:
+        """The address of the client as seen by the first of our trusted proxies.
+
+        Each proxy appends the address it received the request from to
+        X-Forwarded-For, so with N trusted proxies in front of the app the Nth
+        entry from the right is the client. Anything further left was sent by
+        the client itself and can be forged.
+        """
+        hops = Config.RATE_LIMIT_TRUSTED_PROXIES
+        if hops > 0:
+            forwarded = [
+                address.strip()
+                for header in request.headers.getlist("x-forwarded-for")
+                for address in header.split(",")
+                if address.strip()
+            ]
+            if len(forwarded) >= hops:
+                return forwarded[-hops]
+        return request.client.host if request.client else "unknown"
+
+    async def check(self, request: Request, email: str | None = None) -> None:
+        if not Config.RATE_LIMIT_ENABLED:
+            return
+
+        keys = {"ip": self.client_ip(request)}
+        if email:
+            keys["email"] = email.lower()
+
+        retry_after = max(self.local[kind].hit(key) for kind, key in keys.items())
+        if not retry_after and self.shared:
+            try:
+                for kind, key in keys.items():
+                    retry_after = max(retry_after, await self.shared[kind].hit(key))
+            except Exception:
+                logging.exception("Shared rate limit check for %s failed, using local limits only", self.name)
+
+        if retry_after:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(max(int(retry_after + 0.999), 1))},
+            )
+
+
+def _create_login_limiter() -> RateLimiter:
+    return RateLimiter(
+        "login",
+        ip_limit=Config.LOGIN_IP_LIMIT_PER_MINUTE,
+        email_limit=Config.LOGIN_EMAIL_LIMIT_PER_MINUTE,
+    )
+
+
+login_limiter = LazyObject(_create_login_limiter)
+
+
+def _create_password_reset_limiter() -> RateLimiter:
+    return RateLimiter(
+        "password-reset",
+        ip_limit=Config.PASSWORD_RESET_IP_LIMIT_PER_MINUTE,
+        email_limit=Config.PASSWORD_RESET_EMAIL_LIMIT_PER_MINUTE,
+    )
+
+
+password_reset_limiter = LazyObject(_create_password_reset_limiter)
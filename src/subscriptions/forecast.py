@@ -0,0 +1,167 @@
+from datetime import date, timedelta
+from typing import NamedTuple
+
+import numpy as np
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Bouquet, Frequency, Subscription
+from src.subscriptions.scheduler import clamp_day
+
+# position of each frequency in SubscriptionArrays.frequency
+FREQUENCIES = [Frequency.daily, Frequency.weekly, Frequency.bi_weekly, Frequency.monthly]
+# rows may come back as Frequency members or as their raw string values
+FREQUENCY_CODES = {
+    **{frequency: code for code, frequency in enumerate(FREQUENCIES)},
+    **{frequency.value: code for code, frequency in enumerate(FREQUENCIES)},
+}
+STEP_DAYS = {Frequency.daily: 1, Frequency.weekly: 7, Frequency.bi_weekly: 14}
+MONTHLY = FREQUENCIES.index(Frequency.monthly)
+
+
+class SubscriptionArrays(NamedTuple):
+    """Active subscriptions as parallel columns, one element per subscription."""
+    bouquet: np.ndarray        # int32 index into the bouquet list
+    frequency: np.ndarray      # int8 index into FREQUENCIES
+    next_delivery: np.ndarray  # datetime64[s], naive UTC like the database column
+    anchor_day: np.ndarray     # int8 day of month of started_at, which monthly plans return to
+
+
+def add_months(values: np.ndarray, anchor_day: np.ndarray) -> np.ndarray:
+    """Vectorized ``scheduler.add_month``: each value moves to its ``anchor_day`` clamped to the next month."""
+    days = values.astype("datetime64[D]")
+    time_of_day = values - days
+    months = days.astype("datetime64[M]")
+    one_month = np.timedelta64(1, "M")
+    next_start = (months + one_month).astype("datetime64[D]")
+    next_length = ((months + 2 * one_month).astype("datetime64[D]") - next_start).astype(np.int64)
+
+    new_day = clamp_day(anchor_day.astype(np.int64), next_length) - 1
+    return next_start + new_day.astype("timedelta64[D]") + time_of_day
+
+
+def forecast_demand(
+    subscriptions: SubscriptionArrays,
+    bouquet_count: int,
+    start: np.datetime64,
+    days: int,
+) -> np.ndarray:
+    """Deliveries per day and bouquet over ``days`` days from ``start``, shape ``(days, bouquet_count)``.
+
+    Recurrences are expanded a step at a time across all subscriptions of a
+    frequency at once, so the Python loop runs once per step in the horizon
+    (or per month for monthly plans), never once per subscription. Deliveries
+    already overdue at ``start`` are counted on the first day, since the
+    scheduler sends each missed one as soon as it runs.
+    """
+    start = np.datetime64(start, "D")
+    end = (start + np.timedelta64(days, "D")).astype("datetime64[s]")
+    first = start.astype("datetime64[s]")
+    counts = np.zeros(days * bouquet_count, dtype=np.int64)
+
+    def count(occurrences: np.ndarray, bouquet: np.ndarray, weights: np.ndarray | None = None) -> None:
+        day = (occurrences.astype("datetime64[D]") - start).astype(np.int64)
+        np.maximum(day, 0, out=day)
+        counts[:] += np.bincount(day * bouquet_count + bouquet, weights, minlength=counts.size).astype(np.int64)
+
+    for code, frequency in enumerate(FREQUENCIES):
+        selected = subscriptions.frequency == code
+        current = subscriptions.next_delivery[selected]
+        bouquet = subscriptions.bouquet[selected]
+
+        if code == MONTHLY:
+            anchor_day = subscriptions.anchor_day[selected]
+            while current.size:
+                due = current < end
+                current, bouquet, anchor_day = current[due], bouquet[due], anchor_day[due]
+                count(current, bouquet)
+                current = add_months(current, anchor_day)
+            continue
+
+        step = np.timedelta64(STEP_DAYS[frequency], "D")
+        # catch up overdue plans arithmetically: ceil((first - current) / step) missed deliveries each
+        overdue = current < first
+        if overdue.any():
+            missed = -((current[overdue] - first) // step)
+            count(np.full(missed.size, first), bouquet[overdue], missed)
+            current = current.copy()
+            current[overdue] += missed * step
+
+        while current.size:
+            due = current < end
+            current, bouquet = current[due], bouquet[due]
+            count(current, bouquet)
+            current = current + step
+
+    return counts.reshape(days, bouquet_count)
+
+
+async def load_subscriptions(
+    session: AsyncSession,
+    bouquet_index: dict[str, int],
+    chunk_size: int = 50_000,
+) -> SubscriptionArrays:
+    """Stream the forecast columns of every active subscription into NumPy arrays."""
+    statement = (
+        select(Subscription.bouquet_id, Subscription.frequency, Subscription.next_delivery, Subscription.started_at)
+        .where(Subscription.active == True)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(statement)
+
+    bouquets, frequencies, next_deliveries, anchor_days = [], [], [], []
+    async for partition in result.partitions():
+        bouquet_ids, frequency_values, delivery_times, start_times = zip(*partition)
+        size = len(bouquet_ids)
+        bouquets.append(np.fromiter((bouquet_index[b] for b in bouquet_ids), np.int32, size))
+        frequencies.append(np.fromiter((FREQUENCY_CODES[f] for f in frequency_values), np.int8, size))
+        next_deliveries.append(np.array(delivery_times, dtype="datetime64[s]"))
+        anchor_days.append(np.fromiter((started.day for started in start_times), np.int8, size))
+
+    if not bouquets:
+        return SubscriptionArrays(
+            np.empty(0, np.int32), np.empty(0, np.int8), np.empty(0, "datetime64[s]"), np.empty(0, np.int8)
+        )
+    return SubscriptionArrays(
+        np.concatenate(bouquets), np.concatenate(frequencies), np.concatenate(next_deliveries),
+        np.concatenate(anchor_days),
+    )
+
+
+async def load_forecast_inputs(session: AsyncSession) -> tuple[list, SubscriptionArrays]:
+    """Every bouquet as ``(id, name, price, subscription_fee)`` and the active subscriptions."""
+    statement = select(Bouquet.id, Bouquet.name, Bouquet.price, Bouquet.subscription_fee).order_by(Bouquet.name)
+    bouquets = (await session.exec(statement)).all()
+    index = {bouquet_id: position for position, (bouquet_id, *_) in enumerate(bouquets)}
+    return bouquets, await load_subscriptions(session, index)
+
+
+def forecast_bouquet_demand(bouquets: list, subscriptions: SubscriptionArrays, start: date, weeks: int) -> dict:
+    """Per-day deliveries and revenue for each bouquet with any demand in the window.
+
+    Revenue per delivery is the bouquet's ``price`` plus its ``subscription_fee``.
+    CPU-bound for large tables, so callers on the event loop run it in a thread.
+    """
+    days = weeks * 7
+    counts = forecast_demand(subscriptions, len(bouquets), np.datetime64(start, "D"), days)
+    unit_revenue = np.array([price + (fee or 0.0) for _, _, price, fee in bouquets], dtype=np.float64)
+    revenue = np.round(counts * unit_revenue, 2)
+
+    totals = counts.sum(axis=0)
+    return {
+        "start": start,
+        "days": days,
+        "dates": [start + timedelta(days=offset) for offset in range(days)],
+        "bouquets": [
+            {
+                "bouquet_id": bouquet_id,
+                "name": name,
+                "deliveries": counts[:, position].tolist(),
+                "revenue": revenue[:, position].tolist(),
+                "total_deliveries": int(totals[position]),
+                "total_revenue": round(float(revenue[:, position].sum()), 2),
+            }
+            for position, (bouquet_id, name, _, _) in enumerate(bouquets)
+            if totals[position]
+        ],
+    }
@@ -0,0 +1,29 @@
+import asyncio
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.dependecies import RoleChecker
+from src.db.main import get_session
+from .schemas import DemandForecastModel
+
+subscriptions_router = APIRouter()
+admin_checker = RoleChecker(["admin"])
+
+
+@subscriptions_router.get("/forecast", response_model=DemandForecastModel)
+async def demand_forecast(
+    weeks: int = Query(4, ge=1, le=26),
+    start: Optional[date] = None,
+    _: bool = Depends(admin_checker),
+    session: AsyncSession = Depends(get_session),
+):
+    # NumPy is only needed here, so it stays off the startup import path
+    from .forecast import forecast_bouquet_demand, load_forecast_inputs
+
+    start = start or datetime.now(timezone.utc).date()
+    bouquets, subscriptions = await load_forecast_inputs(session)
+    # NumPy releases the GIL for most of this, and the loop keeps serving other requests meanwhile
+    return await asyncio.to_thread(forecast_bouquet_demand, bouquets, subscriptions, start, weeks)
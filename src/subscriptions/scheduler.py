@@ -0,0 +1,262 @@
+import asyncio
+import calendar
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, NamedTuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select, or_, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.config import Config
+from src.lazy import LazyObject
+from src.db.main import engine
+from src.db.models import Frequency, Subscription
+
+INTERVALS = {
+    Frequency.daily: timedelta(days=1),
+    Frequency.weekly: timedelta(weeks=1),
+    Frequency.bi_weekly: timedelta(weeks=2),
+}
+
+
+class DueDelivery(NamedTuple):
+    subscription_id: str
+    user_id: str
+    bouquet_id: str
+    delivery_at: datetime
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def clamp_day(anchor_day, month_length):
+    """``anchor_day`` clamped to ``month_length``; element-wise when given NumPy arrays."""
+    over = anchor_day > month_length
+    return anchor_day - over * (anchor_day - month_length)
+
+
+def add_month(value: datetime, anchor_day: int | None = None) -> datetime:
+    """Move ``value`` one calendar month forward, onto ``anchor_day`` clamped to that month.
+
+    The anchor is the day of month the plan started on, so a plan from the 31st
+    goes Jan 31 -> Feb 28 -> Mar 31 and one from the 28th stays on the 28th.
+    Without an anchor the current day is kept (clamped).
+    """
+    year = value.year + value.month // 12
+    month = value.month % 12 + 1
+    day = clamp_day(anchor_day or value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def advance_delivery(value: datetime, frequency: Frequency, anchor_day: int | None = None) -> datetime:
+    if frequency == Frequency.monthly:
+        return add_month(value, anchor_day)
+    return value + INTERVALS[Frequency(frequency)]
+
+
+class DeliveryScheduler:
+    """Dispatches due subscription deliveries and advances ``next_delivery``.
+
+    Upcoming deliveries inside the lookahead window are kept in a heap ordered
+    by time. The window is filled with keyset-paginated range reads over
+    ``(next_delivery, id)``, so a tick never scans the whole table. The database
+    is the only state: each due row is claimed with ``FOR UPDATE SKIP LOCKED``
+    and advanced by an ``UPDATE`` guarded on the ``next_delivery`` that was read,
+    and only rows that update dispatch, so concurrent or stale schedulers never
+    send a delivery twice. The advance commits after dispatch, so a restart
+    picks up where it stopped (at-least-once). Monthly plans advance from the day of month in
+    ``started_at``, not from the last delivery, so short months do not move
+    them for good.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        dispatch: Callable[[list[DueDelivery]], Awaitable[None]],
+        batch_size: int = 1000,
+        lookahead: timedelta = timedelta(minutes=5),
+        resync_interval: timedelta = timedelta(minutes=30),
+        clock: Callable[[], datetime] = utcnow,
+    ) -> None:
+        self.engine = engine
+        self.dispatch = dispatch
+        self.batch_size = batch_size
+        self.lookahead = lookahead
+        self.resync_interval = resync_interval
+        self.clock = clock
+
+        self._heap: list[tuple[datetime, str, Frequency, int]] = []
+        self._queued: set[str] = set()
+        self._cursor: tuple[datetime, str] | None = None
+        self._exhausted_until: datetime | None = None
+        self._last_resync: datetime | None = None
+
+    def reset(self) -> None:
+        self._heap.clear()
+        self._queued.clear()
+        self._cursor = None
+        self._exhausted_until = None
+
+    def next_wakeup(self) -> datetime | None:
+        return self._heap[0][0] if self._heap else None
+
+    async def _load_batch(self, session: AsyncSession, horizon: datetime) -> int:
+        statement = (
+            select(Subscription.id, Subscription.frequency, Subscription.next_delivery, Subscription.started_at)
+            .where(Subscription.active == True, Subscription.next_delivery <= horizon)
+            .order_by(Subscription.next_delivery, Subscription.id)
+            .limit(self.batch_size)
+        )
+        if self._cursor is not None:
+            last_delivery, last_id = self._cursor
+            statement = statement.where(
+                or_(
+                    Subscription.next_delivery > last_delivery,
+                    and_(Subscription.next_delivery == last_delivery, Subscription.id > last_id),
+                )
+            )
+
+        rows = (await session.exec(statement)).all()
+        for sub_id, frequency, next_delivery, started_at in rows:
+            if sub_id not in self._queued:
+                heapq.heappush(self._heap, (_naive(next_delivery), sub_id, frequency, _naive(started_at).day))
+                self._queued.add(sub_id)
+
+        if rows:
+            self._cursor = (_naive(rows[-1][2]), rows[-1][0])
+        if len(rows) < self.batch_size:
+            self._exhausted_until = horizon
+        return len(rows)
+
+    def _pop_due(self, now: datetime) -> list[tuple[datetime, str, Frequency, int]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            due.append(heapq.heappop(self._heap))
+        return due
+
+    async def _process(
+        self,
+        session: AsyncSession,
+        due: list[tuple[datetime, str, Frequency, int]],
+        now: datetime,
+        horizon: datetime,
+    ) -> int:
+        scheduled = {sub_id: (delivery_at, frequency, anchor_day) for delivery_at, sub_id, frequency, anchor_day in due}
+
+        statement = (
+            select(Subscription.id, Subscription.user_id, Subscription.bouquet_id, Subscription.next_delivery)
+            .where(
+                Subscription.id.in_(list(scheduled)),
+                Subscription.active == True,
+                Subscription.next_delivery <= now,
+            )
+            .with_for_update(skip_locked=True)
+        )
+        current = {row[0]: row for row in (await session.exec(statement)).all()}
+
+        table = Subscription.__table__
+        advance = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.next_delivery == bindparam("b_old"))
+            .values(next_delivery=bindparam("b_next"))
+        )
+
+        deliveries = []
+        for sub_id, (delivery_at, frequency, anchor_day) in scheduled.items():
+            self._queued.discard(sub_id)
+            row = current.get(sub_id)
+            if row is None or _naive(row[3]) != delivery_at:
+                continue
+
+            next_delivery = advance_delivery(delivery_at, frequency, anchor_day)
+            result = await session.exec(advance, params={"b_id": sub_id, "b_old": row[3], "b_next": next_delivery})
+            if result.rowcount != 1:
+                # another scheduler advanced it after our read
+                continue
+
+            deliveries.append(DueDelivery(sub_id, row[1], row[2], delivery_at))
+            if next_delivery <= horizon:
+                heapq.heappush(self._heap, (next_delivery, sub_id, frequency, anchor_day))
+                self._queued.add(sub_id)
+
+        if not deliveries:
+            await session.commit()
+            return 0
+
+        try:
+            await self.dispatch(deliveries)
+        except BaseException:
+            # the transaction rolls back, so reload the window from the database
+            self.reset()
+            raise
+        await session.commit()
+        return len(deliveries)
+
+    async def tick(self) -> int:
+        now = self.clock()
+        horizon = now + self.lookahead
+
+        if self._last_resync is None or now - self._last_resync >= self.resync_interval:
+            self.reset()
+            self._last_resync = now
+
+        processed = 0
+        async with AsyncSession(self.engine) as session:
+            while True:
+                needs_rows = not self._heap or self._heap[0][0] > now
+                if needs_rows and (self._exhausted_until is None or self._exhausted_until < horizon):
+                    await self._load_batch(session, horizon)
+
+                due = self._pop_due(now)
+                if not due:
+                    break
+                processed += await self._process(session, due, now, horizon)
+
+        return processed
+
+    async def run(self, poll_interval: float = 30.0) -> None:
+        while True:
+            try:
+                processed = await self.tick()
+                if processed:
+                    logging.info("Dispatched %d subscription deliveries", processed)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Delivery scheduler tick failed")
+
+            delay = poll_interval
+            wakeup = self.next_wakeup()
+            if wakeup is not None:
+                delay = min(delay, max((wakeup - self.clock()).total_seconds(), 0.0))
+            await asyncio.sleep(delay)
+
+
+async def log_deliveries(deliveries: list[DueDelivery]) -> None:
+    for delivery in deliveries:
+        logging.info(
+            "Delivery due for subscription %s (bouquet %s) at %s",
+            delivery.subscription_id, delivery.bouquet_id, delivery.delivery_at,
+        )
+
+
+def _create_delivery_scheduler() -> DeliveryScheduler:
+    return DeliveryScheduler(
+        engine,
+        log_deliveries,
+        batch_size=Config.DELIVERY_SCHEDULER_BATCH_SIZE,
+        lookahead=timedelta(seconds=Config.DELIVERY_SCHEDULER_LOOKAHEAD_SECONDS),
+    )
+
+
+delivery_scheduler = LazyObject(_create_delivery_scheduler)
@@ -0,0 +1,21 @@
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel
+
+
+class BouquetForecastModel(BaseModel):
+    bouquet_id: str
+    name: str
+    deliveries: List[int]
+    revenue: List[float]
+    total_deliveries: int
+    total_revenue: float
+
+
+class DemandForecastModel(BaseModel):
+    """``deliveries[i]`` and ``revenue[i]`` of each bouquet belong to ``dates[i]``."""
+    start: date
+    days: int
+    dates: List[date]
+    bouquets: List[BouquetForecastModel]
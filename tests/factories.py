@@ -0,0 +1,62 @@
+"""Rows for tests that need a populated database."""
+import uuid
+from datetime import datetime, timezone
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Bouquet, Frequency, Subscription, User, UserProfile
+
+
+def make_user(**overrides) -> User:
+    suffix = uuid.uuid4().hex[:8]
+    values = dict(
+        id=str(uuid.uuid4()),
+        username=f"user-{suffix}",
+        email=f"user-{suffix}@example.com",
+        first_name=None,
+        last_name=None,
+        password_hash="not-a-real-hash",
+        is_verified=True,
+        role="user",
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+    values.update(overrides)
+    return User(**values)
+
+
+def make_bouquet(**overrides) -> Bouquet:
+    values = dict(id=str(uuid.uuid4()), name="Roses", description="A dozen roses", price=40.0, subscription_fee=5.0)
+    values.update(overrides)
+    return Bouquet(**values)
+
+
+def make_subscription(user: User, bouquet: Bouquet, **overrides) -> Subscription:
+    values = dict(
+        id=str(uuid.uuid4()),
+        user_id=user.id,
+        bouquet_id=bouquet.id,
+        frequency=Frequency.weekly,
+        next_delivery=datetime(2025, 1, 8),
+        started_at=datetime(2025, 1, 1),
+    )
+    values.update(overrides)
+    return Subscription(**values)
+
+
+async def seed_users(engine, users: int, subscriptions_each: int = 0, profiles: bool = False) -> list[str]:
+    """Insert ``users`` users, each with a profile and subscriptions if asked; returns their ids."""
+    async with AsyncSession(engine) as session:
+        bouquet = make_bouquet()
+        session.add(bouquet)
+        ids = []
+        for _ in range(users):
+            user = make_user()
+            session.add(user)
+            ids.append(user.id)
+            if profiles:
+                session.add(UserProfile(id=str(uuid.uuid4()), user_id=user.id, bio="Likes tulips"))
+            for _ in range(subscriptions_each):
+                session.add(make_subscription(user, bouquet))
+        await session.commit()
+        return ids
@@ -0,0 +1,197 @@
+import asyncio
+import inspect
+from datetime import datetime, timedelta, timezone
+
+import mongomock
+import pymongo
+import pytest
+from bson import ObjectId
+
+from src.audit import AuditLog
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args):
+        self.cursor = self.cursor.sort(*args)
+        return self
+
+    def limit(self, count):
+        self.cursor = self.cursor.limit(count)
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class AsyncCollection:
+    """The slice of pymongo's async collection API the audit log uses, over mongomock."""
+
+    def __init__(self, collection):
+        self.sync = collection
+
+    async def insert_many(self, documents, ordered=True):
+        return self.sync.insert_many(documents, ordered=ordered)
+
+    async def create_index(self, keys, **kwargs):
+        return self.sync.create_index(keys, **kwargs)
+
+    def find(self, criteria):
+        return AsyncCursor(self.sync.find(criteria))
+
+
+class FakeMongoClient:
+    def __init__(self):
+        self.client = mongomock.MongoClient(tz_aware=True)
+        self.closed = False
+
+    def __getitem__(self, database):
+        client = self.client
+
+        class Database:
+            def __getitem__(self, collection):
+                return AsyncCollection(client[database][collection])
+
+        return Database()
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def audit():
+    audit = AuditLog("mongodb://unused", "flower", "audit_events", max_buffer=3, batch_size=2, flush_interval=0.05)
+    audit._client = FakeMongoClient()
+    return audit
+
+
+def stored(audit: AuditLog) -> list[dict]:
+    return list(audit.collection.sync.find().sort("at", 1))
+
+
+def test_record_does_not_wait_and_drops_when_full(audit):
+    assert not inspect.iscoroutinefunction(audit.record)
+    for i in range(5):
+        audit.record("login", f"user-{i}")
+
+    assert audit.stats() == {"buffered": 3, "written": 0, "dropped": 2}
+
+
+async def test_stop_flushes_the_buffer_in_batches(audit):
+    client = audit._client
+    for i in range(3):
+        audit.record("login", f"user-{i}", "10.0.0.1", method="password")
+    await audit.stop()
+
+    assert [event["user_id"] for event in client.client.flower.audit_events.find().sort("at", 1)] == [
+        "user-0", "user-1", "user-2",
+    ]
+    assert audit.written == 3 and client.closed
+
+
+async def test_writer_flushes_after_the_interval(audit):
+    await audit.start()
+    audit.record("logout", "user-1")
+    for _ in range(50):
+        if audit.written:
+            break
+        await asyncio.sleep(0.02)
+    assert [event["type"] for event in stored(audit)] == ["logout"]
+    await audit.stop()
+
+
+async def test_a_retried_batch_does_not_insert_duplicates(audit):
+    audit.record("login", "user-1")
+    audit.record("login", "user-2")
+    audit._take(2)
+    # the first attempt got one event in before the connection dropped
+    for event in audit._inflight:
+        event.setdefault("_id", ObjectId())
+    await audit.collection.insert_many(audit._inflight[:1])
+
+    await audit._write()
+
+    assert [event["user_id"] for event in stored(audit)] == ["user-1", "user-2"]
+    assert audit.written == 2 and audit.dropped == 0
+
+
+async def test_query_filters_and_orders_newest_first(audit):
+    now = datetime.now(timezone.utc)
+    await audit.collection.insert_many([
+        {"type": "login", "user_id": "a", "at": now - timedelta(minutes=3)},
+        {"type": "logout", "user_id": "a", "at": now - timedelta(minutes=2)},
+        {"type": "login", "user_id": "b", "at": now - timedelta(minutes=1)},
+    ])
+
+    events = await audit.query(user_id="a")
+    assert [event["type"] for event in events] == ["logout", "login"]
+    assert all(isinstance(event["id"], str) for event in events)
+
+    since = await audit.query(event_type="login", since=now - timedelta(minutes=2))
+    assert [event["user_id"] for event in since] == ["b"]
+
+
+async def test_start_does_not_wait_for_the_indexes(audit, monkeypatch):
+    async def unreachable(self, keys, **kwargs):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(AsyncCollection, "create_index", unreachable)
+
+    await asyncio.wait_for(audit.start(), 1)
+    await asyncio.wait_for(audit.stop(), 1)
+
+
+async def test_stop_gives_up_on_the_flush_after_its_timeout(audit, monkeypatch):
+    async def hanging(self, documents, ordered=True):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(AsyncCollection, "insert_many", hanging)
+    audit.stop_timeout = 0.1
+    for i in range(3):
+        audit.record("login", f"user-{i}")
+
+    await asyncio.wait_for(audit.stop(), 1)
+
+    assert audit.stats() == {"buffered": 0, "written": 0, "dropped": 3}
+
+
+async def test_writer_drops_a_batch_it_cannot_write_and_keeps_going(audit, monkeypatch):
+    insert_many = AsyncCollection.insert_many
+
+    async def reject_bad_events(self, documents, ordered=True):
+        if any(event["type"] == "bad" for event in documents):
+            raise ValueError("cannot encode object")
+        return await insert_many(self, documents, ordered)
+
+    monkeypatch.setattr(AsyncCollection, "insert_many", reject_bad_events)
+    await audit.start()
+    audit.record("bad", "user-1")
+    audit.record("login", "user-2")
+    await asyncio.sleep(0)
+    audit.record("login", "user-3")
+    # the writer pauses for a second after a failure
+    for _ in range(60):
+        if audit.written:
+            break
+        await asyncio.sleep(0.05)
+
+    assert [event["user_id"] for event in stored(audit)] == ["user-3"]
+    assert (audit.written, audit.dropped) == (1, 2)
+    await audit.stop()
+
+
+def test_server_selection_fails_fast(monkeypatch):
+    clients = []
+    monkeypatch.setattr(pymongo, "AsyncMongoClient", lambda *args, **kwargs: clients.append(kwargs) or FakeMongoClient())
+
+    AuditLog("mongodb://unused", "flower", "audit_events", server_selection_timeout=1.5).collection
+
+    assert clients == [{"tz_aware": True, "serverSelectionTimeoutMS": 1500}]
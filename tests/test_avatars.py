@@ -0,0 +1,137 @@
+import asyncio
+import io
+import threading
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+from PIL import Image
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.avatars.services import AvatarService, ImageTooLarge, make_thumbnails
+from src.db.models import UserProfile
+from tests.factories import seed_users
+
+BUCKET = "avatars"
+
+
+def png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "purple").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def service(engine, s3):
+    service = AvatarService(engine, bucket=BUCKET, region="us-east-1", thumbnail_sizes=[16, 32], workers=1)
+    yield service
+    service.shutdown()
+
+
+def keys(s3) -> set[str]:
+    return {item["Key"] for item in s3.list_objects_v2(Bucket=BUCKET).get("Contents", [])}
+
+
+async def upload(service: AvatarService, s3, user_id: str) -> str:
+    """What the client does with the presigned POST, minus the HTTP."""
+    data = png(40, 30)
+    signed = await service.create_upload(user_id, "image/png", len(data))
+    s3.put_object(Bucket=BUCKET, Key=signed["key"], Body=data, ContentType="image/png")
+    return signed["key"]
+
+
+async def profile_of(engine, user_id: str) -> UserProfile:
+    async with AsyncSession(engine) as session:
+        return (await session.exec(select(UserProfile).where(UserProfile.user_id == user_id))).one()
+
+
+@pytest.mark.filterwarnings("ignore::PIL.Image.DecompressionBombWarning")
+def test_oversized_dimensions_are_rejected_before_decoding(monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", Image.MAX_IMAGE_PIXELS)
+    with pytest.raises(ImageTooLarge):
+        make_thumbnails(png(100, 100), [16], max_pixels=5_000)
+    assert Image.MAX_IMAGE_PIXELS == 5_000
+
+    assert set(make_thumbnails(png(100, 100), [16, 32], max_pixels=10_000)) == {16, 32}
+
+
+async def test_confirm_then_thumbnails(engine, service, s3):
+    [user_id] = await seed_users(engine, 1)
+    key = await upload(service, s3, user_id)
+
+    async with AsyncSession(engine) as session:
+        profile = await service.confirm_upload(user_id, key, session)
+    assert profile.avatar_url == service.public_url(key)
+
+    await service.generate_thumbnails(user_id, key)
+    stem = key.rsplit(".", 1)[0]
+    assert keys(s3) == {key, f"{stem}_16.jpg", f"{stem}_32.jpg"}
+    assert (await profile_of(engine, user_id)).avatar_thumbnails == {
+        "16": service.public_url(f"{stem}_16.jpg"),
+        "32": service.public_url(f"{stem}_32.jpg"),
+    }
+
+
+async def test_replacing_an_avatar_deletes_the_old_objects(engine, service, s3):
+    [user_id] = await seed_users(engine, 1)
+    first = await upload(service, s3, user_id)
+    async with AsyncSession(engine) as session:
+        await service.confirm_upload(user_id, first, session)
+    await service.generate_thumbnails(user_id, first)
+
+    second = await upload(service, s3, user_id)
+    async with AsyncSession(engine) as session:
+        await service.confirm_upload(user_id, second, session)
+        # confirming again keeps the current avatar
+        await service.confirm_upload(user_id, second, session)
+
+    assert keys(s3) == {second}
+
+
+async def test_thumbnails_of_a_replaced_upload_are_not_kept(engine, service, s3):
+    [user_id] = await seed_users(engine, 1)
+    first = await upload(service, s3, user_id)
+    second = await upload(service, s3, user_id)
+    async with AsyncSession(engine) as session:
+        await service.confirm_upload(user_id, first, session)
+        await service.confirm_upload(user_id, second, session)
+
+    # the job for the first upload finishes after the second was confirmed
+    s3.put_object(Bucket=BUCKET, Key=first, Body=png(40, 30), ContentType="image/png")
+    await service.generate_thumbnails(user_id, first)
+
+    assert keys(s3) == {first, second}
+    assert (await profile_of(engine, user_id)).avatar_thumbnails is None
+
+
+async def test_shutdown_does_not_wait_for_running_jobs(engine, service, monkeypatch):
+    release = threading.Event()
+
+    def build_slowly(key):
+        release.wait(5)
+        return {}
+
+    monkeypatch.setattr(service, "_build_thumbnails", build_slowly)
+    job = asyncio.create_task(service.generate_thumbnails("user", "avatars/user/a.png"))
+    while not service.pending:
+        await asyncio.sleep(0.01)
+
+    began = time.perf_counter()
+    service.shutdown()
+    assert time.perf_counter() - began < 1
+
+    release.set()
+    await job
+    assert service.pending == 0
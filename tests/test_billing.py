@@ -0,0 +1,99 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.billing.services import BillingService
+from src.db.models import Frequency, Invoice, Subscription
+from tests.factories import make_bouquet, make_subscription, make_user
+
+
+async def subscribe(engine, price=12.1, fee=0.2, **overrides) -> str:
+    user, bouquet = make_user(), make_bouquet(price=price, subscription_fee=fee)
+    subscription = make_subscription(user, bouquet, **overrides)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([user, bouquet, subscription])
+        await session.commit()
+    return subscription.id
+
+
+async def invoices_of(engine, subscription_id: str) -> list[Invoice]:
+    async with AsyncSession(engine) as session:
+        statement = select(Invoice).where(Invoice.subscription_id == subscription_id).order_by(Invoice.period_start)
+        return (await session.exec(statement)).all()
+
+
+async def next_billing_at(engine, subscription_id: str) -> datetime:
+    async with AsyncSession(engine) as session:
+        return (await session.exec(select(Subscription.next_billing_at).where(Subscription.id == subscription_id))).one()
+
+
+async def test_every_missed_period_is_billed_and_the_subscription_advances(engine):
+    subscription_id = await subscribe(engine, next_delivery=datetime(2025, 1, 8), frequency=Frequency.weekly)
+
+    report = await BillingService(engine, chunk_size=10, workers=2).run(datetime(2025, 1, 29))
+
+    invoices = await invoices_of(engine, subscription_id)
+    assert [invoice.period_start for invoice in invoices] == [
+        datetime(2025, 1, 8), datetime(2025, 1, 15), datetime(2025, 1, 22), datetime(2025, 1, 29),
+    ]
+    assert len({invoice.idempotency_key for invoice in invoices}) == 4
+    assert await next_billing_at(engine, subscription_id) == datetime(2025, 2, 5)
+    assert (report.scanned, report.invoiced, report.skipped, report.failed) == (1, 4, 0, 0)
+
+
+async def test_amounts_are_exact_decimals(engine):
+    subscription_id = await subscribe(engine, price=12.1, fee=0.2)
+
+    report = await BillingService(engine).run(datetime(2025, 1, 8))
+
+    [invoice] = await invoices_of(engine, subscription_id)
+    assert (invoice.price, invoice.subscription_fee, invoice.amount) == (
+        Decimal("12.10"), Decimal("0.20"), Decimal("12.30"),
+    )
+    assert report.amount == Decimal("12.30")
+
+
+async def test_monthly_periods_follow_the_start_day(engine):
+    subscription_id = await subscribe(
+        engine,
+        frequency=Frequency.monthly,
+        started_at=datetime(2025, 1, 31, 9),
+        next_delivery=datetime(2025, 1, 31, 9),
+    )
+
+    await BillingService(engine).run(datetime(2025, 4, 1))
+
+    assert [invoice.period_start for invoice in await invoices_of(engine, subscription_id)] == [
+        datetime(2025, 1, 31, 9), datetime(2025, 2, 28, 9), datetime(2025, 3, 31, 9),
+    ]
+    assert await next_billing_at(engine, subscription_id) == datetime(2025, 4, 30, 9)
+
+
+async def test_a_second_run_bills_nothing_new(engine):
+    await subscribe(engine, next_delivery=datetime(2025, 1, 8), frequency=Frequency.daily)
+    service = BillingService(engine)
+    first = await service.run(datetime(2025, 1, 10))
+
+    second = await service.run(datetime(2025, 1, 10))
+
+    assert first.invoiced == 3
+    assert (second.scanned, second.invoiced) == (0, 0)
+
+
+async def test_periods_invoiced_before_are_skipped(engine):
+    subscription_id = await subscribe(engine, next_delivery=datetime(2025, 1, 8), frequency=Frequency.daily)
+    service = BillingService(engine)
+    await service.run(datetime(2025, 1, 9))
+    # as if the subscription had not been advanced, e.g. right after the v0007 backfill
+    async with AsyncSession(engine) as session:
+        subscription = await session.get(Subscription, subscription_id)
+        subscription.next_billing_at = datetime(2025, 1, 9)
+        session.add(subscription)
+        await session.commit()
+
+    report = await service.run(datetime(2025, 1, 10))
+
+    assert (report.invoiced, report.skipped) == (1, 1)
+    assert len(await invoices_of(engine, subscription_id)) == 3
@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+import src.db.redis as blocklist_store
+from benchmarks.standins import InMemoryRedis
+from src.db.blocklist import REVOKED_JTIS_KEY, BloomFilter, RevokedTokenFilter
+from src.db.broadcast import Broadcaster
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = InMemoryRedis()
+    monkeypatch.setattr(blocklist_store, "redis_client", client)
+    return client
+
+
+def make_filter(redis, **overrides) -> RevokedTokenFilter:
+    options = dict(
+        lookup=blocklist_store.token_in_blocklist,
+        store=blocklist_store.add_jti_to_blocklist,
+        capacity=1000,
+        error_rate=0.001,
+        max_bytes=4096,
+        sync_interval=3600,
+        existing=blocklist_store.blocklisted_jtis,
+    )
+    options.update(overrides)
+    return RevokedTokenFilter(Broadcaster(redis), **options)
+
+
+async def test_unrevoked_jti_is_answered_without_redis(redis):
+    revoked = make_filter(redis)
+    await revoked.seed()
+
+    assert not await revoked.is_revoked("never-revoked")
+    assert revoked.redis_lookups == 0
+    assert revoked.filter_skips == 1
+
+
+async def test_revoked_jti_is_confirmed_in_redis(redis):
+    revoked = make_filter(redis)
+    await revoked.seed()
+
+    await revoked.revoke("logged-out", time.time() + 60)
+
+    assert await revoked.is_revoked("logged-out")
+    assert revoked.redis_lookups == 1
+    assert await redis.ttl(blocklist_store.JTI_KEY_PREFIX + "logged-out") > 0
+
+
+async def test_revocations_from_before_the_jti_set_are_backfilled(redis):
+    # written by an earlier release, which only kept the plain blocklist key
+    await blocklist_store.add_jti_to_blocklist("old-refresh-token", 7 * 24 * 3600)
+    assert await redis.zcard(REVOKED_JTIS_KEY) == 0
+
+    revoked = make_filter(redis)
+    await revoked.seed()
+
+    assert revoked.ready
+    assert await revoked.is_revoked("old-refresh-token")
+    assert await redis.zcard(REVOKED_JTIS_KEY) == 1
+
+
+async def test_filter_defers_to_redis_until_backfill_succeeds(redis):
+    async def unavailable():
+        raise ConnectionError("redis went away")
+        yield
+
+    await blocklist_store.add_jti_to_blocklist("old-refresh-token")
+    revoked = make_filter(redis, existing=unavailable)
+    await revoked.start()
+    try:
+        assert not revoked.ready
+        assert await revoked.is_revoked("old-refresh-token")
+        assert revoked.redis_lookups == 1
+    finally:
+        await revoked.stop()
+
+
+async def test_revocation_reaches_other_workers(redis):
+    broadcaster = Broadcaster(redis)
+    options = dict(
+        lookup=blocklist_store.token_in_blocklist,
+        store=blocklist_store.add_jti_to_blocklist,
+        capacity=1000,
+        error_rate=0.001,
+        max_bytes=4096,
+        sync_interval=3600,
+    )
+    worker_a = RevokedTokenFilter(broadcaster, **options)
+    worker_b = RevokedTokenFilter(Broadcaster(redis), **options)
+    await worker_a.seed()
+    await worker_b.seed()
+    await worker_b.broadcaster.start()
+    try:
+        # let the listener subscribe before publishing
+        await asyncio.sleep(0.05)
+        await worker_a.revoke("shared", time.time() + 60)
+        for _ in range(50):
+            if "shared" in worker_b._filter:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await worker_b.is_revoked("shared")
+        assert worker_b.redis_lookups == 1
+    finally:
+        await worker_b.broadcaster.stop()
+
+
+def test_bloom_filter_stays_within_its_memory_budget():
+    bloom = BloomFilter(capacity=1_000_000, error_rate=0.001, max_bytes=1024)
+    assert len(bloom.bits) == 1024
+
+    for i in range(100):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(100))
@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.bulk.schemas import MAX_REPORTED_ERRORS, ImportReport
+from src.bulk.services import BulkService, iter_lines, iter_records
+from src.db.models import User
+
+BCRYPT_HASH = "$2b$12$" + "a" * 53
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+async def test_multibyte_characters_split_across_chunks_decode():
+    data = "name\nJosé Müller\n".encode()
+    split = data.index("é".encode()) + 1
+
+    assert await collect(iter_lines(stream(data[:split], data[split:]))) == ["name", "José Müller"]
+
+
+async def test_csv_quoted_fields_may_span_lines_and_chunks():
+    data = (
+        b'email,username,bio\r\n'
+        b'a@example.com,ann,"first line\r\nsecond, with a comma"\r\n'
+        b'\r\n'
+        b'b@example.com,"bo ""the"" builder",plain\r\n'
+    )
+
+    records = await collect(iter_records(stream(data[:40], data[40:70], data[70:]), "csv"))
+
+    assert records == [
+        (2, {"email": "a@example.com", "username": "ann", "bio": "first line\nsecond, with a comma"}),
+        (5, {"email": "b@example.com", "username": 'bo "the" builder', "bio": "plain"}),
+    ]
+
+
+async def test_unterminated_quote_is_reported_once():
+    records = await collect(iter_records(stream(b'email,username\nc@example.com,"never closed\n'), "csv"))
+
+    [(line_no, error)] = records
+    assert line_no == 2 and isinstance(error, ValueError)
+
+
+def test_report_keeps_counting_past_the_error_cap():
+    report = ImportReport()
+    for line_no in range(MAX_REPORTED_ERRORS + 5):
+        report.add_error(line=line_no, error="bad")
+
+    assert report.failed == MAX_REPORTED_ERRORS + 5
+    assert len(report.errors) == MAX_REPORTED_ERRORS
+    assert report.errors_truncated
+
+
+def user_row(email: str) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": email.split("@")[0].ljust(36, "0"),
+        "email": email,
+        "username": email.split("@")[0],
+        "password_hash": BCRYPT_HASH,
+        "is_verified": True,
+        "is_admin": False,
+        "role": "user",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def test_rejected_chunk_is_retried_row_by_row(engine):
+    service = BulkService(engine)
+    report = ImportReport()
+    await service._insert(User.__table__, [user_row("taken@example.com")], [1], report)
+
+    # e.g. another import inserted taken@example.com after this chunk checked for it
+    rows = [user_row("new1@example.com"), {**user_row("taken@example.com"), "id": "x" * 36}, user_row("new2@example.com")]
+    await service._insert(User.__table__, rows, [10, 11, 12], report)
+
+    assert report.inserted == 3
+    assert [error["line"] for error in report.errors] == [11]
+    async with AsyncSession(engine) as session:
+        emails = set((await session.exec(select(User.email))).all())
+    assert emails == {"taken@example.com", "new1@example.com", "new2@example.com"}
+
+
+async def test_import_users_reports_bad_lines_and_inserts_the_rest(engine):
+    ndjson = (
+        b'{"email": "ok@example.com", "username": "ok", "password_hash": "' + BCRYPT_HASH.encode() + b'"}\n'
+        b'{"email": "not-an-email", "username": "bad", "password_hash": "' + BCRYPT_HASH.encode() + b'"}\n'
+        b'{broken json\n'
+    )
+
+    report = await BulkService(engine).import_users(iter_records(stream(ndjson), "ndjson"))
+
+    assert report.inserted == 1
+    assert report.failed == 2
+    assert [error["line"] for error in report.errors] == [2, 3]
@@ -0,0 +1,38 @@
+import pytest
+from pydantic import ValidationError
+
+from src.catalog.cache import CatalogCache
+from src.catalog.schemas import BouquetUpdateModel
+from tests.factories import make_bouquet
+
+
+async def test_etag_depends_only_on_the_body():
+    roses = make_bouquet()
+
+    async def load():
+        return [roses]
+
+    worker_a, worker_b = CatalogCache(), CatalogCache()
+    worker_b.discard()
+    worker_b.discard()
+    first = await worker_a.available(load)
+    assert (await worker_b.available(load)).etag == first.etag
+
+    # an unrelated write bumps the version but leaves the listing unchanged
+    await worker_a.invalidate()
+    assert (await worker_a.available(load)).etag == first.etag
+
+    roses.price = 45.0
+    await worker_a.invalidate()
+    assert (await worker_a.available(load)).etag != first.etag
+
+
+def test_patch_accepts_partial_updates_and_nullable_fields():
+    update = BouquetUpdateModel.model_validate({"price": 42.5, "image_url": None})
+    assert update.model_dump(exclude_unset=True) == {"price": 42.5, "image_url": None}
+
+
+@pytest.mark.parametrize("field", ["name", "description", "price", "subscription_fee", "is_available"])
+def test_patch_rejects_null_for_required_columns(field):
+    with pytest.raises(ValidationError, match="not set to null"):
+        BouquetUpdateModel.model_validate({field: None})
@@ -0,0 +1,17 @@
+from sqlmodel import select
+
+import src.db.explain as explain
+from src.db.models import UserProfile
+
+
+async def test_no_known_query_scans_a_whole_table(engine, monkeypatch):
+    monkeypatch.setattr(explain, "engine", engine)
+
+    assert await explain.check() == {}
+
+
+async def test_an_unindexed_filter_is_reported(engine, monkeypatch):
+    monkeypatch.setattr(explain, "engine", engine)
+    monkeypatch.setitem(explain.KNOWN_QUERIES, "profiles_by_bio", select(UserProfile).where(UserProfile.bio == "x"))
+
+    assert list(await explain.check()) == ["profiles_by_bio"]
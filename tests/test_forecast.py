@@ -0,0 +1,74 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Frequency
+from src.subscriptions.forecast import (
+    FREQUENCIES,
+    SubscriptionArrays,
+    add_months,
+    forecast_bouquet_demand,
+    forecast_demand,
+    load_forecast_inputs,
+)
+from src.subscriptions.scheduler import add_month
+from tests.factories import make_bouquet, make_subscription, make_user
+
+
+def monthly(deliveries: list[datetime], anchor_days: list[int]) -> SubscriptionArrays:
+    count = len(deliveries)
+    return SubscriptionArrays(
+        np.zeros(count, np.int32),
+        np.full(count, FREQUENCIES.index(Frequency.monthly), np.int8),
+        np.array(deliveries, dtype="datetime64[s]"),
+        np.array(anchor_days, np.int8),
+    )
+
+
+def test_add_months_matches_the_scheduler_and_returns_to_the_anchor():
+    values = [datetime(2025, 1, 31, 9), datetime(2025, 2, 28, 9), datetime(2025, 4, 30), datetime(2024, 1, 30)]
+    anchors = [31, 31, 30, 30]
+    current = np.array(values, dtype="datetime64[s]")
+    expected = values
+    for _ in range(13):
+        current = add_months(current, np.array(anchors, np.int8))
+        expected = [add_month(value, anchor) for value, anchor in zip(expected, anchors)]
+        assert current.astype(datetime).tolist() == expected
+
+    # Feb 28 started on the 31st is back on the 31st in March, not stuck on the 28th
+    assert add_months(np.array([datetime(2025, 2, 28)], "datetime64[s]"), np.array([31], np.int8))[0] == (
+        np.datetime64("2025-03-31")
+    )
+
+
+def test_month_end_plan_does_not_drift_over_the_horizon():
+    counts = forecast_demand(monthly([datetime(2025, 1, 31, 9)], [31]), 1, np.datetime64("2025-01-01"), 181)
+    delivered = [date(2025, 1, 1) + timedelta(days=int(day)) for day in np.flatnonzero(counts[:, 0])]
+    assert delivered == [
+        date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30), date(2025, 5, 31),
+        date(2025, 6, 30),
+    ]
+
+
+async def test_forecast_reads_anchors_from_started_at(engine):
+    user, bouquet = make_user(), make_bouquet(price=10.0, subscription_fee=2.5)
+    subscription = make_subscription(
+        user, bouquet,
+        frequency=Frequency.monthly,
+        started_at=datetime(2024, 12, 31, 9),
+        next_delivery=datetime(2025, 2, 28, 9),
+    )
+    async with AsyncSession(engine) as session:
+        session.add_all([user, bouquet, subscription])
+        await session.commit()
+
+    async with AsyncSession(engine) as session:
+        bouquets, subscriptions = await load_forecast_inputs(session)
+    assert subscriptions.anchor_day.tolist() == [31]
+
+    forecast = forecast_bouquet_demand(bouquets, subscriptions, date(2025, 2, 1), 9)
+    [row] = forecast["bouquets"]
+    delivered = [day for day, count in zip(forecast["dates"], row["deliveries"]) if count]
+    assert delivered == [date(2025, 2, 28), date(2025, 3, 31)]
+    assert row["total_revenue"] == 25.0
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+import src.auth.hashing as hashing
+from src.auth.hashing import PasswordHasher
+
+
+@pytest.fixture
+def slow_hashing(monkeypatch):
+    def fake_hash(password: str, rounds=None) -> str:
+        time.sleep(0.01)
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(hashing, "generate_password_hash", fake_hash)
+
+
+async def peak_pending(hasher: PasswordHasher, job) -> tuple[int, object]:
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, hasher.pending)
+            await asyncio.sleep(0.002)
+
+    watcher = asyncio.ensure_future(watch())
+    try:
+        result = await job
+        return peak, result
+    finally:
+        watcher.cancel()
+
+
+async def test_bulk_hashing_leaves_a_worker_for_logins(slow_hashing):
+    hasher = PasswordHasher(kind="thread", workers=3, queue_limit=4, bulk_batch_size=8)
+
+    async def job():
+        bulk = asyncio.ensure_future(hasher.hash_many([f"pw{i}" for i in range(40)]))
+        await asyncio.sleep(0.05)
+        began = time.perf_counter()
+        assert await hasher.hash("login") == "hashed:login"
+        return time.perf_counter() - began, await bulk
+
+    try:
+        peak, (login_wait, hashed) = await peak_pending(hasher, job())
+    finally:
+        hasher.shutdown()
+
+    assert hashed == [f"hashed:pw{i}" for i in range(40)]
+    # two batches in flight, plus the login on the worker left free
+    assert peak == 3
+    # a busy worker would keep it waiting for a whole 80 ms batch
+    assert login_wait < 0.05
+
+
+async def test_offline_bulk_hashing_uses_every_worker(slow_hashing):
+    hasher = PasswordHasher(kind="thread", workers=4, bulk_batch_size=2, bulk_workers=4)
+    try:
+        began = time.perf_counter()
+        peak, hashed = await peak_pending(hasher, hasher.hash_many([f"pw{i}" for i in range(40)]))
+        elapsed = time.perf_counter() - began
+    finally:
+        hasher.shutdown()
+
+    assert hashed == [f"hashed:pw{i}" for i in range(40)]
+    assert peak == 4
+    # serially this takes 40 x 10 ms
+    assert elapsed < 0.3
+
+
+async def test_bulk_hashing_waits_while_the_queue_is_full(slow_hashing):
+    hasher = PasswordHasher(kind="thread", workers=1, queue_limit=0, bulk_batch_size=2, bulk_retry_delay=0.01)
+    try:
+        login = asyncio.ensure_future(hasher.hash("login"))
+        await asyncio.sleep(0)
+        assert hasher.pending == 1
+
+        assert await hasher.hash_many(["a", "b", "c"]) == ["hashed:a", "hashed:b", "hashed:c"]
+        assert await login == "hashed:login"
+    finally:
+        hasher.shutdown()
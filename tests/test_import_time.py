@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from benchmarks.import_time import DEFAULT_TOLERANCE, best_of, compare, eager_imports, measure
+
+
+def test_heavy_clients_are_not_imported_with_the_app():
+    _, modules = measure("main")
+
+    assert eager_imports(modules) == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("IMPORT_TIME_CHECK"),
+    reason="timings are machine-specific; set IMPORT_TIME_CHECK=1 where the baseline was recorded",
+)
+def test_cold_import_stays_within_the_recorded_baseline():
+    # IMPORT_TIME_TOLERANCE loosens the timing check on slow or shared CI machines
+    tolerance = float(os.environ.get("IMPORT_TIME_TOLERANCE", DEFAULT_TOLERANCE))
+    total, modules = best_of("main", runs=3)
+
+    assert compare("main", total, modules, tolerance) == []
@@ -0,0 +1,205 @@
+import json
+
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.catalog.inventory import InventoryConsumer
+from src.db.models import Bouquet
+from tests.factories import make_bouquet
+
+TOPIC = "inventory.bouquets"
+DEAD_LETTERS = "inventory.bouquets.dead-letter"
+
+
+class FakeMessage:
+    def __init__(self, partition: int, offset: int, value: bytes, key: bytes | None = None) -> None:
+        self._partition, self._offset, self._value, self._key = partition, offset, value, key
+
+    def error(self):
+        return None
+
+    def topic(self):
+        return TOPIC
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def value(self):
+        return self._value
+
+    def key(self):
+        return self._key
+
+
+class FakeConsumer:
+    """One partition held in memory, with the seek/commit calls the consumer makes."""
+
+    def __init__(self, values: list[bytes]) -> None:
+        self.messages = [FakeMessage(0, offset, value) for offset, value in enumerate(values)]
+        self.position = 0
+        self.committed: int | None = None
+
+    def subscribe(self, topics):
+        pass
+
+    def consume(self, count, timeout):
+        batch = self.messages[self.position:self.position + count]
+        self.position += len(batch)
+        return batch
+
+    def seek(self, partition):
+        self.position = partition.offset
+
+    def commit(self, offsets, asynchronous):
+        [partition] = offsets
+        self.committed = partition.offset
+
+    def close(self):
+        pass
+
+
+class FakeProducer:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.produced = []
+        self._callbacks = []
+
+    def produce(self, topic, key=None, value=None, headers=None, on_delivery=None):
+        self.produced.append({"topic": topic, "value": value, "headers": headers})
+        self._callbacks.append(on_delivery)
+
+    def flush(self, timeout):
+        for callback in self._callbacks:
+            callback("broker unavailable" if self.fail else None, None)
+        self._callbacks = []
+        return 0
+
+
+def event(bouquet_id: str, **fields) -> bytes:
+    return json.dumps({"bouquet_id": bouquet_id, **fields}).encode()
+
+
+@pytest.fixture
+async def bouquets(engine):
+    good, poisoned = make_bouquet(price=10.0), make_bouquet(price=20.0)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([good, poisoned])
+        await session.commit()
+    return good.id, poisoned.id
+
+
+def inventory(engine, consumer: FakeConsumer, producer: FakeProducer, **kwargs) -> InventoryConsumer:
+    kwargs.setdefault("dead_letter_topic", DEAD_LETTERS)
+    return InventoryConsumer(
+        engine, TOPIC, lambda: consumer, producer_factory=lambda: producer, max_attempts=3, **kwargs
+    )
+
+
+def reject(service: InventoryConsumer, monkeypatch, bouquet_id: str, error: Exception) -> None:
+    apply = service.apply
+
+    async def failing_apply(updates):
+        if bouquet_id in updates:
+            raise error
+        return await apply(updates)
+
+    monkeypatch.setattr(service, "apply", failing_apply)
+
+
+async def price_of(engine, bouquet_id: str) -> float:
+    async with AsyncSession(engine) as session:
+        return (await session.get(Bouquet, bouquet_id)).price
+
+
+async def poll(service: InventoryConsumer) -> bool:
+    return await service.process_batch(service.consumer.consume(100, 0))
+
+
+async def test_a_batch_is_applied_then_committed(engine, bouquets):
+    good, _ = bouquets
+    consumer = FakeConsumer([event(good, price=11.0), event(good, is_available=False)])
+    service = inventory(engine, consumer, FakeProducer())
+
+    assert await poll(service)
+
+    assert await price_of(engine, good) == 11.0
+    assert consumer.committed == 2
+
+
+async def test_a_poison_event_is_dead_lettered_after_max_attempts(engine, bouquets, monkeypatch):
+    good, poisoned = bouquets
+    consumer = FakeConsumer([event(good, price=12.0), event(poisoned, price=1e30)])
+    producer = FakeProducer()
+    service = inventory(engine, consumer, producer)
+    reject(service, monkeypatch, poisoned, DataError("UPDATE bouquets", {}, Exception("Out of range value")))
+
+    assert not await poll(service)
+    assert not await poll(service)
+    assert consumer.committed is None and consumer.position == 0
+
+    assert await poll(service)
+
+    assert await price_of(engine, good) == 12.0
+    assert consumer.committed == 2
+    [dead_letter] = producer.produced
+    assert dead_letter["topic"] == DEAD_LETTERS
+    assert dead_letter["value"] == event(poisoned, price=1e30)
+    assert dead_letter["headers"]["source"] == f"{TOPIC}:0@1"
+    assert "Out of range value" in dead_letter["headers"]["error"]
+    assert service.stats()["dead_lettered"] == 1
+
+    # the next batch starts from a clean attempt count
+    consumer.messages.append(FakeMessage(0, 2, event(poisoned, price=2e30)))
+    assert not await poll(service)
+
+
+async def test_a_database_outage_is_never_dead_lettered(engine, bouquets, monkeypatch):
+    _, poisoned = bouquets
+    consumer = FakeConsumer([event(poisoned, price=5.0)])
+    producer = FakeProducer()
+    service = inventory(engine, consumer, producer)
+    reject(service, monkeypatch, poisoned, OperationalError("UPDATE bouquets", {}, Exception("server has gone away")))
+
+    for _ in range(5):
+        assert not await poll(service)
+
+    assert producer.produced == [] and consumer.committed is None
+
+
+async def test_malformed_events_are_dead_lettered_and_skipped(engine, bouquets):
+    good, _ = bouquets
+    consumer = FakeConsumer([b"not json", event(good, price=-1), event(good, price=13.0)])
+    producer = FakeProducer()
+    service = inventory(engine, consumer, producer)
+
+    assert await poll(service)
+
+    assert [message["value"] for message in producer.produced] == [b"not json", event(good, price=-1)]
+    assert await price_of(engine, good) == 13.0
+    assert consumer.committed == 3
+    assert service.stats()["invalid"] == 2
+
+
+async def test_nothing_is_committed_past_an_event_the_dead_letter_topic_did_not_take(engine, bouquets):
+    good, _ = bouquets
+    consumer = FakeConsumer([event(good, price=14.0), b"not json"])
+    service = inventory(engine, consumer, FakeProducer(fail=True))
+
+    assert not await poll(service)
+
+    assert consumer.committed is None and consumer.position == 0
+
+
+async def test_without_a_dead_letter_topic_bad_events_are_logged_and_skipped(engine, bouquets, caplog):
+    consumer = FakeConsumer([b"not json"])
+    producer = FakeProducer()
+    service = inventory(engine, consumer, producer, dead_letter_topic="")
+
+    assert await poll(service)
+
+    assert producer.produced == [] and consumer.committed == 1
+    assert "no dead-letter topic" in caplog.text
@@ -0,0 +1,137 @@
+import asyncio
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+import src.celery as celery_module
+from src.mail import MailDispatcher
+
+
+class RecordingHandler:
+
+    def __init__(self, delay: float = 0.0, slow_subject: str | None = None) -> None:
+        self.delay = delay
+        self.slow_subject = slow_subject
+        self.messages: list[str] = []
+        self.sessions: set[int] = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay and (self.slow_subject is None or f"Subject: {self.slow_subject}" in envelope.content.decode()):
+            await asyncio.sleep(self.delay)
+        self.sessions.add(id(session))
+        self.messages.append(envelope.content.decode())
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(handler: RecordingHandler) -> Controller:
+        controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+        controller.start()
+        servers.append(controller)
+        return controller
+
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+def dispatcher_for(controller: Controller, **overrides) -> MailDispatcher:
+    options = dict(
+        hostname=controller.hostname,
+        port=controller.port,
+        username="",
+        password="",
+        sender="Flower <noreply@example.com>",
+        start_tls=False,
+        validate_certs=False,
+        pool_size=2,
+    )
+    options.update(overrides)
+    return MailDispatcher(**options)
+
+
+async def test_batch_is_sent_over_pooled_connections(smtp_server):
+    handler = RecordingHandler()
+    dispatcher = dispatcher_for(smtp_server(handler))
+    try:
+        messages = [dispatcher.build_message([f"user{i}@example.com"], f"Hello {i}", "<p>hi</p>") for i in range(20)]
+        errors = await dispatcher.send_many(messages)
+    finally:
+        await dispatcher.stop()
+
+    assert errors == [None] * 20
+    assert len(handler.messages) == 20
+    assert dispatcher.sent == 20
+    # one connection per worker, not one per message
+    assert dispatcher.reconnects == len(handler.sessions) <= 2
+
+
+async def test_unreachable_server_fails_the_message():
+    dispatcher = MailDispatcher(
+        hostname="127.0.0.1", port=free_port(), username="", password="", sender="noreply@example.com",
+        start_tls=False, pool_size=1, max_retries=1,
+    )
+    try:
+        [error] = await dispatcher.send_many([dispatcher.build_message(["a@example.com"], "Hi", "hi")])
+    finally:
+        await dispatcher.stop()
+
+    assert error is not None
+    assert dispatcher.failed == 1
+
+
+async def test_stop_gives_up_after_its_timeout(smtp_server):
+    handler = RecordingHandler(delay=5)
+    dispatcher = dispatcher_for(smtp_server(handler), pool_size=1, stop_timeout=0.2)
+    await dispatcher.start()
+    sending = asyncio.ensure_future(dispatcher.send_many(
+        [dispatcher.build_message(["a@example.com"], f"Hi {i}", "hi") for i in range(3)]
+    ))
+    await asyncio.sleep(0.1)
+
+    await asyncio.wait_for(dispatcher.stop(), 2)
+
+    errors = await asyncio.wait_for(sending, 1)
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+
+async def test_a_slow_message_does_not_hold_up_the_queue(smtp_server):
+    handler = RecordingHandler(delay=2, slow_subject="Slow")
+    dispatcher = dispatcher_for(smtp_server(handler), pool_size=2)
+    await dispatcher.start()
+    try:
+        slow = asyncio.ensure_future(dispatcher.send(["a@example.com"], "Slow", "hi"))
+        quick = [asyncio.ensure_future(dispatcher.send(["b@example.com"], f"Quick {i}", "hi")) for i in range(5)]
+
+        # the idle worker takes every quick message while the other one is busy
+        await asyncio.wait_for(asyncio.gather(*quick), 1.5)
+        assert not slow.done()
+        await slow
+    finally:
+        await dispatcher.stop()
+
+
+def test_celery_task_sends_through_the_pooled_dispatcher(smtp_server, monkeypatch):
+    handler = RecordingHandler()
+    monkeypatch.setattr(celery_module, "mail_dispatcher", dispatcher_for(smtp_server(handler), pool_size=1))
+    monkeypatch.setattr(celery_module, "_mail_loop", None)
+
+    celery_module.send_email(["a@example.com"], "Welcome", "<p>hi</p>")
+    celery_module.send_email(["b@example.com"], "Verify", "<p>hi</p>")
+    loop = celery_module._mail_loop
+    celery_module._stop_mail_dispatcher()
+    loop.call_soon_threadsafe(loop.stop)
+
+    assert len(handler.messages) == 2
+    # the second task reused the first one's connection
+    assert len(handler.sessions) == 1
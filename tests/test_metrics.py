@@ -0,0 +1,67 @@
+import httpx
+from fastapi import FastAPI
+
+from src.errors import AccountNotVerified
+from src.metrics import MetricsRegistry, metrics
+from src.middleware import register_middleware
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/unverified")
+    async def unverified():
+        raise AccountNotVerified()
+
+    @app.get("/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    register_middleware(app)
+    return app
+
+
+def client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_requests_are_recorded_per_route_template():
+    before = metrics.requests.get(("GET", "/items/{item_id}", 200), 0)
+    async with client(build_app()) as http:
+        for i in range(3):
+            assert (await http.get(f"/items/{i}")).status_code == 200
+        assert (await http.get("/missing")).status_code == 404
+
+    assert metrics.requests[("GET", "/items/{item_id}", 200)] == before + 3
+    assert metrics.requests[("GET", "<unmatched>", 404)] >= 1
+    assert metrics.in_flight == 0
+
+
+async def test_unhandled_errors_become_json_responses():
+    async with client(build_app()) as http:
+        unverified = await http.get("/unverified")
+        broken = await http.get("/broken")
+
+    assert unverified.status_code == 403
+    assert unverified.json() == {"detail": "Account not verified"}
+    assert broken.status_code == 500
+    assert broken.json() == {"detail": "boom"}
+    assert metrics.requests[("GET", "/broken", 500)] >= 1
+
+
+def test_render_is_prometheus_text():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe_request("GET", "/a", 200, 0.05)
+    registry.observe_request("GET", "/a", 200, 0.5)
+    registry.register_gauge("queue_depth", "Jobs queued.", lambda: {"mail": 3}, label="queue")
+
+    body = registry.render()
+
+    assert 'http_requests_total{method="GET",route="/a",status="200"} 2' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/a",le="0.1"} 1' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/a",le="+Inf"} 2' in body
+    assert 'queue_depth{queue="mail"} 3.0' in body
@@ -0,0 +1,91 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+from src.db import models  # noqa: F401  registers the tables on SQLModel.metadata
+from src.db.migrations import discover, migrate, pending
+from src.db.migrations.v0001_initial_schema import metadata as baseline
+
+
+def schema(conn) -> dict[str, set[str]]:
+    inspector = inspect(conn)
+    return {
+        table: {column["name"] for column in inspector.get_columns(table)}
+        | {index["name"] for index in inspector.get_indexes(table)}
+        for table in inspector.get_table_names()
+        if table != "schema_migrations"
+    }
+
+
+def model_schema() -> dict[str, set[str]]:
+    return {
+        table.name: {column.name for column in table.columns} | {index.name for index in table.indexes}
+        for table in SQLModel.metadata.sorted_tables
+    }
+
+
+async def test_fresh_database_ends_up_with_the_model_schema(engine):
+    async with engine.connect() as conn:
+        assert await conn.run_sync(schema) == model_schema()
+    assert await pending(engine) == []
+    assert await migrate(engine) == []
+
+
+async def test_database_from_the_old_create_all_is_upgraded(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(baseline.create_all)
+
+    applied = await migrate(engine)
+
+    assert applied == [migration.__name__.rsplit(".", 1)[-1] for migration in discover()]
+    async with engine.connect() as conn:
+        assert await conn.run_sync(schema) == model_schema()
+    await engine.dispose()
+
+
+def test_baseline_does_not_follow_the_models():
+    assert "role" not in baseline.tables["users"].c
+    assert "avatar_thumbnails" not in baseline.tables["user_profiles"].c
+    assert "invoices" not in baseline.tables
+
+
+def test_invoice_table_is_frozen_at_its_first_release():
+    from src.db.migrations.v0005_invoices import invoices
+
+    assert type(invoices.c.amount.type).__name__ == "FLOAT"
+
+
+async def test_next_billing_at_is_backfilled_from_the_last_invoice(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    *before, v0007 = [m for m in discover() if m.__name__ < "src.db.migrations.v0008"]
+    async with engine.begin() as conn:
+        await conn.run_sync(baseline.create_all)
+        for migration in before:
+            await conn.run_sync(migration.upgrade)
+        await conn.execute(text(
+            "INSERT INTO users (id, username, email, is_admin, password_hash, created_at, updated_at, role) "
+            "VALUES ('u', 'u', 'u@example.com', 0, 'x', '2025-01-01', '2025-01-01', 'user')"
+        ))
+        await conn.execute(text(
+            "INSERT INTO bouquets (id, name, description, price, subscription_fee, is_available, created_at) "
+            "VALUES ('b', 'Roses', 'Red', 10.0, 1.0, 1, '2025-01-01')"
+        ))
+        for subscription in ("billed", "never-billed"):
+            await conn.execute(text(
+                "INSERT INTO subscriptions (id, user_id, bouquet_id, frequency, next_delivery, active, started_at) "
+                f"VALUES ('{subscription}', 'u', 'b', 'weekly', '2025-03-05 00:00:00.000000', 1, '2025-01-01')"
+            ))
+        for period in ("2025-01-08", "2025-01-15"):
+            await conn.execute(text(
+                "INSERT INTO invoices (id, idempotency_key, subscription_id, user_id, bouquet_id, period_start, "
+                "price, subscription_fee, amount, billing_run_id, created_at) "
+                f"VALUES ('{period}', 'billed:{period}', 'billed', 'u', 'b', '{period} 00:00:00.000000', "
+                "10.0, 1.0, 11.0, 'run', '2025-01-01')"
+            ))
+
+        await conn.run_sync(v0007.upgrade)
+        rows = dict((await conn.execute(text("SELECT id, next_billing_at FROM subscriptions"))).all())
+
+    assert rows == {"billed": "2025-01-15 00:00:00.000000", "never-billed": "2025-03-05 00:00:00.000000"}
+    await engine.dispose()
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import OutboxMessage
+from src.outbox import OutboxRelay
+
+
+class FakeTransport:
+
+    def __init__(self, fail: set[int] = frozenset()) -> None:
+        self.fail = fail
+        self.batches: list[list[int]] = []
+
+    async def send_batch(self, messages: list[OutboxMessage]) -> dict[int, Exception]:
+        self.batches.append([message.id for message in messages])
+        return {message.id: ConnectionError("broker down") for message in messages if message.id in self.fail}
+
+
+async def stage(engine, count: int) -> list[int]:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        messages = [OutboxMessage(topic="email", payload="{}") for _ in range(count)]
+        session.add_all(messages)
+        await session.commit()
+        return [message.id for message in messages]
+
+
+async def remaining(engine) -> list[OutboxMessage]:
+    async with AsyncSession(engine) as session:
+        return list((await session.exec(select(OutboxMessage).order_by(OutboxMessage.id))).all())
+
+
+async def test_sent_rows_are_deleted(engine):
+    ids = await stage(engine, 3)
+    transport = FakeTransport()
+
+    assert await OutboxRelay(engine, transport).drain_once() == 3
+    assert transport.batches == [ids]
+    assert await remaining(engine) == []
+
+
+async def test_claimed_rows_are_committed_before_the_send(engine):
+    await stage(engine, 2)
+
+    class InspectingTransport(FakeTransport):
+        async def send_batch(self, messages):
+            # a second relay sees the batch as claimed while the first is still sending
+            self.seen_by_other_relay = await OutboxRelay(engine, FakeTransport()).drain_once()
+            return await super().send_batch(messages)
+
+    transport = InspectingTransport()
+    assert await OutboxRelay(engine, transport).drain_once() == 2
+    assert transport.seen_by_other_relay == 0
+
+
+async def test_failed_rows_back_off_then_dead_letter(engine):
+    [message_id] = await stage(engine, 1)
+    relay = OutboxRelay(engine, FakeTransport(fail={message_id}), base_backoff=60, max_attempts=2)
+
+    assert await relay.drain_once() == 0
+    [message] = await remaining(engine)
+    assert message.attempts == 1
+    assert message.dead_lettered_at is None
+    assert message.available_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    async with AsyncSession(engine) as session:
+        message.available_at = datetime.now(timezone.utc)
+        session.add(message)
+        await session.commit()
+
+    assert await relay.drain_once() == 0
+    [message] = await remaining(engine)
+    assert message.attempts == 2
+    assert message.dead_lettered_at is not None
+    assert "broker down" in message.last_error
+    assert relay.dead_lettered == 1
+
+    # dead letters are never picked up again
+    assert await relay.drain_once() == 0
+    assert relay.transport.batches == [[message_id], [message_id]]
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import event, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.services import UserService
+from src.db.models import Subscription, User
+from tests.factories import seed_users
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+async def load_detached_user(engine, user_id: str) -> User:
+    # what get_current_user hands the route: loaded elsewhere, possibly from the user cache
+    async with AsyncSession(engine) as session:
+        return (await session.exec(select(User).where(User.id == user_id))).one()
+
+
+@pytest.mark.parametrize("subscriptions", [0, 1, 25])
+async def test_profile_view_query_count_is_constant(engine, statements, subscriptions):
+    [user_id] = await seed_users(engine, 1, subscriptions_each=subscriptions, profiles=True)
+    user = await load_detached_user(engine, user_id)
+
+    statements.clear()
+    async with AsyncSession(engine) as session:
+        view = await UserService().get_user_profile_view(user, session)
+
+    assert len(statements) == 2
+    assert not any("FROM users" in statement for statement in statements)
+    assert view.email == user.email
+    assert view.profile.bio == "Likes tulips"
+    assert len(view.subscriptions) == subscriptions
+    assert all(subscription.bouquet.name == "Roses" for subscription in view.subscriptions)
+
+
+async def test_profile_view_lists_only_active_subscriptions(engine):
+    [user_id] = await seed_users(engine, 1, subscriptions_each=3)
+    async with AsyncSession(engine) as session:
+        cancelled = (await session.exec(select(Subscription.id))).first()
+        await session.exec(update(Subscription).where(Subscription.id == cancelled).values(active=False))
+        await session.commit()
+    user = await load_detached_user(engine, user_id)
+
+    async with AsyncSession(engine) as session:
+        view = await UserService().get_user_profile_view(user, session)
+
+    assert view.profile is None
+    assert {str(subscription.id) for subscription in view.subscriptions} == set(await active_ids(engine))
+    assert len(view.subscriptions) == 2
+
+
+async def active_ids(engine) -> list[str]:
+    async with AsyncSession(engine) as session:
+        return list((await session.exec(select(Subscription.id).where(Subscription.active == True))).all())
@@ -0,0 +1,60 @@
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Subscription, User
+from src.db.profiler import QueryProfiler, fingerprint
+from tests.factories import seed_users
+
+
+def test_fingerprint_ignores_literals_and_bind_values():
+    assert fingerprint("SELECT * FROM users WHERE id = 'a' AND age > 30") == \
+        fingerprint("SELECT *  FROM users\nWHERE id = 'b' AND age > 41")
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)") == "SELECT * FROM t WHERE id IN (...)"
+    assert fingerprint("SELECT * FROM t WHERE id = %(id_1)s") == "SELECT * FROM t WHERE id = ?"
+
+
+async def test_per_row_lookups_are_flagged_as_n_plus_one(engine):
+    user_ids = await seed_users(engine, 6, subscriptions_each=1)
+    profiler = QueryProfiler(n_plus_one_threshold=5)
+    profiler.install(engine)
+
+    token = profiler.begin("GET /subscriptions")
+    async with AsyncSession(engine) as session:
+        for user_id in user_ids:
+            await session.exec(select(Subscription).where(Subscription.user_id == user_id))
+    profile = profiler.end(token)
+
+    assert profile.query_count == 6
+    [(fp, stats)] = profile.repeated(5).items()
+    assert fp.startswith("SELECT") and "FROM subscriptions" in fp
+    assert stats.count == 6
+    assert profiler.flagged_requests == {"GET /subscriptions": 1}
+    assert profiler.summary()["statements"][0]["count"] == 6
+
+
+async def test_eager_loading_is_not_flagged(engine):
+    await seed_users(engine, 6, subscriptions_each=2)
+    profiler = QueryProfiler(n_plus_one_threshold=5)
+    profiler.install(engine)
+
+    token = profiler.begin("GET /users")
+    async with AsyncSession(engine) as session:
+        users = (await session.exec(select(User).options(selectinload(User.subscriptions)))).all()
+        assert sum(len(user.subscriptions) for user in users) == 12
+    profile = profiler.end(token)
+
+    assert profile.query_count == 2
+    assert profiler.flagged_requests == {}
+
+
+async def test_slow_queries_are_counted(engine):
+    profiler = QueryProfiler(slow_query_threshold=0.0)
+    profiler.install(engine)
+
+    async with AsyncSession(engine) as session:
+        await session.exec(select(User))
+
+    assert profiler.slow_queries == 1
+    [statement] = profiler.summary()["statements"]
+    assert statement["rows"] == 0 and statement["count"] == 1
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from benchmarks.standins import InMemoryRedis
+from src.config import Config
+from src.ratelimit import RateLimiter, RedisSlidingWindow
+
+
+def request(*forwarded_for: str, peer: str = "10.0.0.2") -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers, "client": (peer, 4321)})
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(Config, "RATE_LIMIT_TRUSTED_PROXIES", 0)
+    assert RateLimiter.client_ip(request("1.2.3.4")) == "10.0.0.2"
+
+
+@pytest.mark.parametrize(
+    "hops, headers, expected",
+    [
+        # the client forged the leftmost entry; our one proxy appended the real address
+        (1, ["6.6.6.6, 203.0.113.7"], "203.0.113.7"),
+        # CDN then load balancer: the CDN saw the client, the balancer saw the CDN
+        (2, ["6.6.6.6, 203.0.113.7, 198.51.100.1"], "203.0.113.7"),
+        (2, ["6.6.6.6", "203.0.113.7, 198.51.100.1"], "203.0.113.7"),
+        # fewer entries than proxies: misconfigured, so fall back to the peer
+        (2, ["203.0.113.7"], "10.0.0.2"),
+    ],
+)
+def test_client_is_counted_from_the_right(monkeypatch, hops, headers, expected):
+    monkeypatch.setattr(Config, "RATE_LIMIT_TRUSTED_PROXIES", hops)
+    assert RateLimiter.client_ip(request(*headers)) == expected
+
+
+async def test_rejected_attempts_do_not_extend_the_window():
+    redis = InMemoryRedis()
+    window = RedisSlidingWindow(redis, limit=2, period=0.3, prefix="test")
+
+    assert await window.hit("ip") == 0
+    assert await window.hit("ip") == 0
+    for _ in range(5):
+        assert await window.hit("ip") > 0
+    assert await redis.zcard("test:ip") == 2
+
+    await asyncio.sleep(0.35)
+    assert await window.hit("ip") == 0
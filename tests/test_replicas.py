@@ -0,0 +1,125 @@
+"""Read routing against a primary and two replicas, each its own SQLite file.
+
+Nothing copies rows between the files, so a replica that was seeded with the
+old data stands in for one that has not replayed the primary's writes yet.
+"""
+import time
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import select
+
+from src.auth import dependecies
+from src.auth.user_cache import UserCache
+from src.db.migrations import migrate
+from src.db.models import User
+from src.db.replicas import ReplicaRouter, from_primary
+from tests.factories import make_user
+
+
+@pytest.fixture
+async def databases(tmp_path):
+    engines = []
+    for name in ("primary", "replica-0", "replica-1"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        await migrate(engine)
+        engines.append(engine)
+    yield engines
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def user(databases):
+    """The same user on every database, then verified on the primary only."""
+    user = make_user(is_verified=False)
+    for engine in databases:
+        async with engine.begin() as conn:
+            await conn.execute(User.__table__.insert().values(**user.model_dump()))
+    async with databases[0].begin() as conn:
+        await conn.execute(update(User).where(User.id == user.id).values(is_verified=True))
+    return user
+
+
+def router_for(databases, **kwargs) -> ReplicaRouter:
+    primary, *replicas = databases
+    return ReplicaRouter(primary, replicas, **kwargs)
+
+
+async def is_verified(session, user_id: str, primary: bool = False) -> bool:
+    statement = select(User.is_verified).where(User.id == user_id)
+    return (await session.exec(from_primary(statement) if primary else statement)).one()
+
+
+async def test_plain_reads_go_to_the_replicas_in_turn(databases, user):
+    router = router_for(databases)
+    async with router.session() as session:
+        assert await is_verified(session, user.id) is False
+        assert await is_verified(session, user.id) is False
+    assert router.stats()["replica_reads"] == 2
+
+
+async def test_primary_reads_do_not_make_the_session_sticky(databases, user):
+    router = router_for(databases)
+    async with router.session() as session:
+        assert await is_verified(session, user.id, primary=True) is True
+        assert await is_verified(session, user.id) is False
+
+
+async def test_reads_after_a_write_stay_on_the_primary(databases, user):
+    router = router_for(databases)
+    async with router.session() as session:
+        await session.exec(update(User).where(User.id == user.id).values(first_name="Changed"))
+        assert (await session.exec(select(User.first_name).where(User.id == user.id))).one() == "Changed"
+        await session.commit()
+
+
+async def test_the_writing_user_is_pinned_to_the_primary_for_max_lag(databases, user, monkeypatch):
+    router = router_for(databases, max_lag=5.0)
+    async with router.session() as session:
+        session.info["user_id"] = user.id
+        await session.exec(update(User).where(User.id == user.id).values(first_name="Changed"))
+        await session.commit()
+
+    async with router.session() as session:
+        session.info["user_id"] = user.id
+        assert await is_verified(session, user.id) is True
+    async with router.session() as session:
+        session.info["user_id"] = "someone-else"
+        assert await is_verified(session, user.id) is False
+
+    later = time.monotonic() + 6.0
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    assert not router.is_pinned(user.id)
+
+
+async def test_cache_fill_reads_the_primary_not_a_lagging_replica(databases, user, monkeypatch):
+    cache = UserCache(ttl=60.0)
+    monkeypatch.setattr(dependecies, "user_cache", cache)
+    router = router_for(databases)
+
+    async with router.session() as session:
+        loaded = await dependecies.get_current_user({"user": {"email": user.email}}, session)
+        assert session.info["user_id"] == user.id
+
+    assert loaded.is_verified is True
+    assert cache.get_by_email(user.email).is_verified is True
+
+
+async def test_lagging_replicas_get_no_reads(databases, user):
+    lags = {}
+
+    async def probe(engine):
+        return lags[engine]
+
+    router = router_for(databases, max_lag=5.0, probe=probe)
+    replica_0, replica_1 = router.replicas
+    lags.update({replica_0: 30.0, replica_1: 0.5})
+    await router.check()
+    assert router.choose_replica() is replica_1
+
+    lags[replica_1] = None
+    await router.check()
+    assert router.choose_replica() is router.primary
+    assert router.stats()["fallback_reads"] == 1
@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Frequency, Subscription
+from src.subscriptions.scheduler import DeliveryScheduler, DueDelivery, add_month, advance_delivery
+from tests.factories import make_bouquet, make_subscription, make_user
+
+NOW = datetime(2025, 1, 8, 9, 0)
+
+
+def monthly_run(first: datetime, anchor_day: int, months: int) -> list[datetime]:
+    deliveries = [first]
+    for _ in range(months):
+        deliveries.append(add_month(deliveries[-1], anchor_day))
+    return deliveries
+
+
+def test_month_end_plan_returns_to_the_31st_after_short_months():
+    days = [d.day for d in monthly_run(datetime(2025, 1, 31, 9), 31, 4)]
+    assert days == [31, 28, 31, 30, 31]
+
+
+def test_plan_started_on_the_28th_stays_on_the_28th():
+    deliveries = monthly_run(datetime(2025, 2, 28, 9), 28, 3)
+    assert [d.day for d in deliveries] == [28, 28, 28, 28]
+
+
+def test_last_day_of_a_30_day_month_does_not_jump_to_the_31st():
+    assert add_month(datetime(2025, 4, 30), 30) == datetime(2025, 5, 30)
+
+
+def test_leap_february_and_year_rollover():
+    assert add_month(datetime(2024, 1, 30), 30) == datetime(2024, 2, 29)
+    assert add_month(datetime(2024, 12, 15, 8, 30), 15) == datetime(2025, 1, 15, 8, 30)
+
+
+def test_fixed_interval_frequencies_ignore_the_anchor():
+    assert advance_delivery(datetime(2025, 1, 31), Frequency.weekly, 31) == datetime(2025, 2, 7)
+    assert advance_delivery(datetime(2025, 1, 31), Frequency.bi_weekly) == datetime(2025, 2, 14)
+
+
+async def subscribe(engine, next_deliveries: list[datetime], **overrides) -> list[str]:
+    user, bouquet = make_user(), make_bouquet()
+    subscriptions = [make_subscription(user, bouquet, next_delivery=at, **overrides) for at in next_deliveries]
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([user, bouquet, *subscriptions])
+        await session.commit()
+    return [subscription.id for subscription in subscriptions]
+
+
+async def next_delivery_of(engine, subscription_id: str) -> datetime:
+    async with AsyncSession(engine) as session:
+        return (await session.exec(select(Subscription.next_delivery).where(Subscription.id == subscription_id))).one()
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.batches: list[list[DueDelivery]] = []
+
+    async def __call__(self, deliveries: list[DueDelivery]) -> None:
+        self.batches.append(deliveries)
+        await asyncio.sleep(0)
+
+    @property
+    def sent(self) -> list[tuple[str, datetime]]:
+        return [(d.subscription_id, d.delivery_at) for batch in self.batches for d in batch]
+
+
+def scheduler(engine, dispatch, clock, **kwargs) -> DeliveryScheduler:
+    return DeliveryScheduler(engine, dispatch, clock=lambda: clock[0], **kwargs)
+
+
+async def test_only_due_active_rows_are_dispatched_and_advanced(engine):
+    due, later = await subscribe(engine, [NOW - timedelta(hours=1), NOW + timedelta(hours=1)])
+    [paused] = await subscribe(engine, [NOW - timedelta(hours=1)], active=False)
+    clock, recorder = [NOW], Recorder()
+    service = scheduler(engine, recorder, clock)
+
+    assert await service.tick() == 1
+
+    assert recorder.sent == [(due, NOW - timedelta(hours=1))]
+    assert await next_delivery_of(engine, due) == NOW - timedelta(hours=1) + timedelta(weeks=1)
+    assert await next_delivery_of(engine, paused) == NOW - timedelta(hours=1)
+
+    clock[0] = NOW + timedelta(hours=1)
+    assert await service.tick() == 1
+    assert recorder.sent[-1] == (later, NOW + timedelta(hours=1))
+
+
+async def test_a_tick_dispatches_everything_due_in_batches(engine):
+    ids = await subscribe(engine, [NOW - timedelta(minutes=minute) for minute in range(10)])
+    clock, recorder = [NOW], Recorder()
+
+    assert await scheduler(engine, recorder, clock, batch_size=3).tick() == 10
+
+    assert [len(batch) for batch in recorder.batches] == [3, 3, 3, 1]
+    assert sorted(subscription_id for subscription_id, _ in recorder.sent) == sorted(ids)
+    # oldest first
+    assert [at for _, at in recorder.sent] == sorted(at for _, at in recorder.sent)
+
+
+async def test_a_restarted_scheduler_does_not_resend(engine):
+    await subscribe(engine, [NOW - timedelta(minutes=minute) for minute in range(5)])
+    clock, recorder = [NOW], Recorder()
+
+    assert await scheduler(engine, recorder, clock).tick() == 5
+    assert await scheduler(engine, recorder, clock).tick() == 0
+    assert len(recorder.sent) == 5
+
+
+async def test_a_stale_scheduler_skips_rows_another_one_advanced(engine):
+    await subscribe(engine, [NOW + timedelta(minutes=1)] * 4)
+    clock, recorder = [NOW], Recorder()
+    first, second = scheduler(engine, recorder, clock), scheduler(engine, recorder, clock)
+    # both load the same deliveries into their lookahead window
+    await first.tick()
+    await second.tick()
+
+    clock[0] = NOW + timedelta(minutes=1)
+    assert await first.tick() == 4
+    assert await second.tick() == 0
+    assert len(recorder.sent) == 4
+
+
+async def test_concurrent_schedulers_send_each_delivery_once(engine):
+    await subscribe(engine, [NOW - timedelta(minutes=minute) for minute in range(20)])
+    clock, recorder = [NOW], Recorder()
+    schedulers = [scheduler(engine, recorder, clock, batch_size=5) for _ in range(3)]
+
+    counts = await asyncio.gather(*(service.tick() for service in schedulers))
+
+    assert sum(counts) == 20
+    assert len(recorder.sent) == len(set(recorder.sent)) == 20
+
+
+async def test_a_failed_dispatch_is_retried(engine):
+    [subscription_id] = await subscribe(engine, [NOW - timedelta(hours=1)])
+    clock, recorder = [NOW], Recorder()
+    failing = True
+
+    async def dispatch(deliveries):
+        if failing:
+            raise ConnectionError("courier API down")
+        await recorder(deliveries)
+
+    service = scheduler(engine, dispatch, clock)
+    with pytest.raises(ConnectionError):
+        await service.tick()
+    assert await next_delivery_of(engine, subscription_id) == NOW - timedelta(hours=1)
+
+    failing = False
+    assert await service.tick() == 1
+    assert recorder.sent == [(subscription_id, NOW - timedelta(hours=1))]
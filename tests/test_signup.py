@@ -0,0 +1,89 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import src.auth.services as services
+from src.audit import AuditLog
+from src.auth import routes
+from src.auth.hashing import PasswordHasher
+from src.auth.user_cache import UserCache
+from src.db.main import get_session
+from src.db.models import User
+from src.errors import register_all_errors
+from tests.factories import make_user
+
+SIGNUP = {
+    "email": "Mallory@example.com",
+    "username": "mallory",
+    "first_name": "Mallory",
+    "last_name": "Doe",
+    "password": "testpass123",
+}
+
+
+@pytest.fixture
+def app(engine, monkeypatch):
+    hasher = PasswordHasher(kind="thread", workers=1)
+    monkeypatch.setattr(services, "password_hasher", hasher)
+    monkeypatch.setattr(services, "user_cache", UserCache())
+    monkeypatch.setattr(services, "audit_log", AuditLog("mongodb://unused", "flower", "audit", enabled=False))
+
+    app = FastAPI()
+    register_all_errors(app)
+    app.include_router(routes.auth_router, prefix="/api/v1/auth")
+
+    async def session():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = session
+    app.dependency_overrides[routes.admin_checker] = lambda: True
+    yield app
+    hasher.shutdown()
+
+
+def client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def stored(engine, user_id: str) -> User:
+    async with AsyncSession(engine) as session:
+        return await session.get(User, user_id)
+
+
+async def test_signup_ignores_a_client_supplied_role(engine, app):
+    async with client(app) as http:
+        response = await http.post(
+            "/api/v1/auth/signup", json={**SIGNUP, "role": "admin", "is_verified": True, "is_admin": True}
+        )
+
+    assert response.status_code == 201
+    user = await stored(engine, response.json()["user"]["id"])
+    assert (user.email, user.role, user.is_verified, user.is_admin) == ("mallory@example.com", "user", False, False)
+
+
+async def test_admins_set_roles(engine, app):
+    user = make_user(first_name="Ada", last_name="Lovelace")
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(user)
+        await session.commit()
+
+    async with client(app) as http:
+        promoted = await http.patch(f"/api/v1/auth/user/{user.id}/role", json={"role": "admin"})
+        invalid = await http.patch(f"/api/v1/auth/user/{user.id}/role", json={"role": "owner"})
+        missing = await http.patch("/api/v1/auth/user/nobody/role", json={"role": "admin"})
+
+    assert promoted.status_code == 200
+    assert (await stored(engine, user.id)).role == "admin"
+    assert invalid.status_code == 422
+    assert missing.status_code == 404
+
+
+async def test_setting_a_role_requires_an_admin(app):
+    del app.dependency_overrides[routes.admin_checker]
+
+    async with client(app) as http:
+        response = await http.patch("/api/v1/auth/user/anyone/role", json={"role": "admin"})
+
+    assert response.status_code in (401, 403)
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+import src.auth.token_cache as token_cache_module
+import src.db.redis as blocklist_store
+from benchmarks.standins import InMemoryRedis
+from src.auth.token_cache import VerifiedTokenCache
+from src.db.blocklist import RevokedTokenFilter
+from src.db.broadcast import Broadcaster
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [NOW]
+    monkeypatch.setattr(token_cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def payload(jti: str, exp: float) -> dict:
+    return {"jti": jti, "exp": exp, "user": {"email": f"{jti}@example.com"}}
+
+
+def test_entries_expire_at_the_tokens_exp(clock):
+    cache = VerifiedTokenCache(maxsize=10, max_ttl=300)
+    cache.put("token", payload("a", NOW + 30))
+
+    clock[0] = NOW + 29.9
+    assert cache.get("token")["jti"] == "a"
+    clock[0] = NOW + 30
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_max_ttl_caps_long_lived_tokens_and_expired_tokens_are_not_cached(clock):
+    cache = VerifiedTokenCache(maxsize=10, max_ttl=60)
+    cache.put("refresh", payload("long", NOW + 7 * 86400))
+    cache.put("stale", payload("stale", NOW - 1))
+
+    assert cache.get("stale") is None
+    clock[0] = NOW + 61
+    assert cache.get("refresh") is None
+
+
+def test_least_recently_used_entry_is_evicted_at_maxsize(clock):
+    cache = VerifiedTokenCache(maxsize=2, max_ttl=300)
+    cache.put("a", payload("a", NOW + 60))
+    cache.put("b", payload("b", NOW + 60))
+    assert cache.get("a") is not None  # "b" is now the least recently used
+
+    cache.put("c", payload("c", NOW + 60))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["size"] == 2
+
+
+@pytest.fixture
+def revoked_tokens(monkeypatch):
+    redis = InMemoryRedis()
+    monkeypatch.setattr(blocklist_store, "redis_client", redis)
+    return RevokedTokenFilter(
+        Broadcaster(redis),
+        lookup=blocklist_store.token_in_blocklist,
+        store=blocklist_store.add_jti_to_blocklist,
+        capacity=1000,
+        error_rate=0.001,
+        max_bytes=4096,
+        sync_interval=3600,
+    )
+
+
+async def test_revoking_a_jti_removes_its_tokens_at_once(revoked_tokens):
+    cache = VerifiedTokenCache(maxsize=10, max_ttl=300)
+    revoked_tokens.add_listener(cache.evict_jti)
+    exp = time.time() + 60
+    cache.put("access", payload("logged-out", exp))
+    cache.put("other", payload("still-valid", exp))
+
+    await revoked_tokens.revoke("logged-out", exp)
+
+    assert cache.get("access") is None
+    assert cache.get("other") is not None
+
+
+def test_revocations_from_other_workers_evict_too(revoked_tokens):
+    cache = VerifiedTokenCache(maxsize=10, max_ttl=300)
+    revoked_tokens.add_listener(cache.evict_jti)
+    cache.put("access", payload("elsewhere", time.time() + 60))
+
+    # what the broadcaster hands over when another worker revokes
+    revoked_tokens._on_message({"jti": "elsewhere"})
+
+    assert cache.get("access") is None
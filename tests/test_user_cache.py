@@ -0,0 +1,108 @@
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import src.auth.services as services
+import src.auth.user_cache as user_cache_module
+from src.audit import AuditLog
+from src.auth.services import UserService
+from src.auth.user_cache import UserCache, _create_user_cache
+from src.config import Config
+from src.db.models import User
+from tests.factories import make_user
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(user_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = UserCache(ttl=60.0)
+    monkeypatch.setattr(services, "user_cache", cache)
+    monkeypatch.setattr(services, "audit_log", AuditLog("mongodb://unused", "flower", "audit", enabled=False))
+    return cache
+
+
+async def stored_user(engine) -> User:
+    user = make_user()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(user)
+        await session.commit()
+    return user
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = UserCache(ttl=60.0)
+    user = make_user()
+    cache.put(user)
+
+    clock[0] += 59.9
+    assert cache.get_by_email(user.email).id == user.id
+    clock[0] += 0.1
+    assert cache.get_by_email(user.email) is None
+    assert cache.get_by_id(user.id) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_hits_are_detached_copies():
+    cache = UserCache()
+    user = make_user(first_name="Ada")
+    cache.put(user)
+
+    hit = cache.get_by_id(user.id)
+    hit.first_name = "Changed"
+
+    assert hit is not user
+    assert cache.get_by_id(user.id).first_name == "Ada"
+
+
+async def test_update_user_invalidates_both_keys(engine, cache):
+    user = await stored_user(engine)
+    cache.put(user)
+    old_email = user.email
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        loaded = await session.get(User, user.id)
+        await UserService().update_user(loaded, {"email": "renamed@example.com"}, session)
+
+    assert cache.get_by_id(user.id) is None
+    assert cache.get_by_email(old_email) is None
+    assert cache.get_by_email("renamed@example.com") is None
+
+
+async def test_delete_user_invalidates(engine, cache):
+    user = await stored_user(engine)
+    cache.put(user)
+
+    async with AsyncSession(engine) as session:
+        assert await UserService().delete_user(user.id, session)
+
+    assert cache.get_by_id(user.id) is None
+    assert cache.get_by_email(user.email) is None
+
+
+def test_invalidations_from_other_workers_are_applied():
+    cache = UserCache()
+    user = make_user()
+    cache.put(user)
+
+    # what the broadcaster hands over when another worker invalidates
+    cache._on_message({"id": user.id, "email": user.email})
+
+    assert cache.get_by_id(user.id) is None
+
+
+def test_disabled_cache_stores_nothing(monkeypatch):
+    monkeypatch.setattr(Config, "USER_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "USER_CACHE_BROADCAST", False)
+    cache = _create_user_cache()
+    user = make_user()
+
+    cache.put(user)
+
+    assert cache.get_by_id(user.id) is None
+    assert cache.get_by_email(user.email) is None
+    assert cache.stats() == {"enabled": False, "size": 0, "hits": 0, "misses": 0}
@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth import routes
+from src.db.main import get_session
+from tests.factories import make_user
+
+IMPORTED_AT = datetime(2025, 3, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def http(engine):
+    app = FastAPI()
+    app.include_router(routes.auth_router, prefix="/api/v1/auth")
+
+    async def session():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = session
+    app.dependency_overrides[routes.admin_checker] = lambda: True
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def add_users(engine, created_at: list[datetime]) -> list[str]:
+    users = [
+        make_user(first_name="Ada", last_name="Lovelace", created_at=moment, updated_at=moment)
+        for moment in created_at
+    ]
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all(users)
+        await session.commit()
+    # the order every listing must follow
+    return [user.id for user in sorted(users, key=lambda user: (user.created_at, user.id))]
+
+
+async def test_pages_neither_skip_nor_repeat_users_sharing_created_at(engine, http):
+    # one bulk-import chunk with a single timestamp, between two ordinary signups
+    expected = await add_users(
+        engine,
+        [IMPORTED_AT - timedelta(minutes=1)] + [IMPORTED_AT] * 23 + [IMPORTED_AT + timedelta(minutes=1)],
+    )
+
+    seen, cursor, pages = [], None, 0
+    async with http:
+        while True:
+            params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+            page = (await http.get("/api/v1/auth/all-users", params=params)).json()
+            seen += [user["id"] for user in page["users"]]
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    assert seen == expected
+    assert pages == 7
+
+
+async def test_last_page_has_no_cursor(engine, http):
+    await add_users(engine, [IMPORTED_AT] * 4)
+    async with http:
+        page = (await http.get("/api/v1/auth/all-users", params={"limit": 4})).json()
+    assert len(page["users"]) == 4 and page["next_cursor"] is None
+
+
+async def test_json_stream_of_no_users_is_an_empty_array(http):
+    async with http:
+        response = await http.get("/api/v1/auth/all-users/stream", params={"format": "json"})
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.text) == []
+
+
+async def test_streams_of_many_users_are_valid_and_ordered(engine, http, monkeypatch):
+    monkeypatch.setattr(routes, "USERS_STREAM_CHUNK_SIZE", 7)
+    expected = await add_users(engine, [IMPORTED_AT] * 30 + [IMPORTED_AT + timedelta(seconds=1)] * 5)
+
+    async with http:
+        as_json = await http.get("/api/v1/auth/all-users/stream", params={"format": "json"})
+        as_ndjson = await http.get("/api/v1/auth/all-users/stream")
+
+    assert [user["id"] for user in json.loads(as_json.text)] == expected
+    lines = as_ndjson.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == expected
+    assert "password_hash" not in as_json.text